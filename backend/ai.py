@@ -1,55 +1,47 @@
 import os
+import re
 import json
-from openai import OpenAI
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from backend.ai_client import create_chat_completion, stream_chat_completion
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize OpenAI client
+# AI configuration; the pooled client itself lives in backend.ai_client
 api_key = os.getenv("OPENAI_API_KEY")
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
-def translate_schema(source_dialect: str, target_dialect: str, input_ddl_json: dict) -> dict:
-    """
-    Translate schema from source dialect to target dialect using OpenAI
-    """
-    # Check if API key is available
-    if not api_key or api_key == "":
-        # Return a simple translated structure for testing without AI
-        return {
-            "translated_ddl": {
-                "tables": [
-                    {
-                        "name": "customers",
-                        "ddl": f"CREATE TABLE customers (id SERIAL PRIMARY KEY, name VARCHAR(120) NOT NULL, email VARCHAR(255) NOT NULL, city VARCHAR(120) NOT NULL, created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
-                    },
-                    {
-                        "name": "employees",
-                        "ddl": f"CREATE TABLE employees (id SERIAL PRIMARY KEY, first_name VARCHAR(80) NOT NULL, last_name VARCHAR(80) NOT NULL, title VARCHAR(120) NOT NULL, hired_on DATE NOT NULL, salary DECIMAL(12,2) NOT NULL)"
-                    },
-                    {
-                        "name": "products",
-                        "ddl": f"CREATE TABLE products (id SERIAL PRIMARY KEY, sku VARCHAR(64) NOT NULL, name VARCHAR(160) NOT NULL, price DECIMAL(10,2) NOT NULL, in_stock SMALLINT NOT NULL DEFAULT 1)"
-                    },
-                    {
-                        "name": "orders",
-                        "ddl": f"CREATE TABLE orders (id SERIAL PRIMARY KEY, customer_id INTEGER NOT NULL, order_date TIMESTAMP NOT NULL, status VARCHAR(20) NOT NULL DEFAULT 'PENDING', total DECIMAL(12,2) NOT NULL, FOREIGN KEY (customer_id) REFERENCES customers(id))"
-                    },
-                    {
-                        "name": "order_items",
-                        "ddl": f"CREATE TABLE order_items (id SERIAL PRIMARY KEY, order_id INTEGER NOT NULL, product_id INTEGER NOT NULL, qty INTEGER NOT NULL, unit_price DECIMAL(10,2) NOT NULL, line_total DECIMAL(12,2) NOT NULL, FOREIGN KEY (order_id) REFERENCES orders(id), FOREIGN KEY (product_id) REFERENCES products(id))"
-                    }
-                ]
-            },
-            "notes": "Schema translated successfully (demo mode - no AI key configured). This is a simplified structure for testing purposes."
-        }
-    
-    try:
-        # Initialize OpenAI client
-        client = OpenAI(api_key=api_key)
-        
-        prompt = f"""
+# Simplified schema returned when no AI key is configured (demo mode)
+DEMO_TRANSLATED_TABLES = [
+    {
+        "name": "customers",
+        "ddl": f"CREATE TABLE customers (id SERIAL PRIMARY KEY, name VARCHAR(120) NOT NULL, email VARCHAR(255) NOT NULL, city VARCHAR(120) NOT NULL, created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    },
+    {
+        "name": "employees",
+        "ddl": f"CREATE TABLE employees (id SERIAL PRIMARY KEY, first_name VARCHAR(80) NOT NULL, last_name VARCHAR(80) NOT NULL, title VARCHAR(120) NOT NULL, hired_on DATE NOT NULL, salary DECIMAL(12,2) NOT NULL)"
+    },
+    {
+        "name": "products",
+        "ddl": f"CREATE TABLE products (id SERIAL PRIMARY KEY, sku VARCHAR(64) NOT NULL, name VARCHAR(160) NOT NULL, price DECIMAL(10,2) NOT NULL, in_stock SMALLINT NOT NULL DEFAULT 1)"
+    },
+    {
+        "name": "orders",
+        "ddl": f"CREATE TABLE orders (id SERIAL PRIMARY KEY, customer_id INTEGER NOT NULL, order_date TIMESTAMP NOT NULL, status VARCHAR(20) NOT NULL DEFAULT 'PENDING', total DECIMAL(12,2) NOT NULL, FOREIGN KEY (customer_id) REFERENCES customers(id))"
+    },
+    {
+        "name": "order_items",
+        "ddl": f"CREATE TABLE order_items (id SERIAL PRIMARY KEY, order_id INTEGER NOT NULL, product_id INTEGER NOT NULL, qty INTEGER NOT NULL, unit_price DECIMAL(10,2) NOT NULL, line_total DECIMAL(12,2) NOT NULL, FOREIGN KEY (order_id) REFERENCES orders(id), FOREIGN KEY (product_id) REFERENCES products(id))"
+    }
+]
+
+DEMO_TRANSLATION_NOTES = "Schema translated successfully (demo mode - no AI key configured). This is a simplified structure for testing purposes."
+
+def build_translation_prompt(source_dialect: str, target_dialect: str, input_ddl_json: dict) -> str:
+    """Build the schema translation prompt shared by the blocking and streaming calls"""
+    return f"""
         Translate the following database schema from {source_dialect} to {target_dialect}.
         Provide the translated DDL and any notes about compatibility issues or manual adjustments needed.
         
@@ -69,8 +61,43 @@ def translate_schema(source_dialect: str, target_dialect: str, input_ddl_json: d
             "notes": "Any compatibility notes or manual adjustments needed"
         }}
         """
+
+def strip_code_fences(content: str) -> str:
+    """Remove a ```json / ``` wrapper the model sometimes puts around its JSON"""
+    cleaned_content = content.strip()
+    if cleaned_content.startswith('```json'):
+        # Extract JSON from code block
+        cleaned_content = cleaned_content[7:]  # Remove ```json
+        if cleaned_content.endswith('```'):
+            cleaned_content = cleaned_content[:-3]  # Remove ```
+        cleaned_content = cleaned_content.strip()
+    elif cleaned_content.startswith('```'):
+        # Extract content from generic code block
+        cleaned_content = cleaned_content[3:]  # Remove ```
+        if cleaned_content.endswith('```'):
+            cleaned_content = cleaned_content[:-3]  # Remove ```
+        cleaned_content = cleaned_content.strip()
+    return cleaned_content
+
+def translate_schema(source_dialect: str, target_dialect: str, input_ddl_json: dict) -> dict:
+    """
+    Translate schema from source dialect to target dialect using OpenAI
+    """
+    # Check if API key is available
+    if not api_key or api_key == "":
+        # Return a simple translated structure for testing without AI
+        return {
+            "translated_ddl": {
+                "tables": [dict(table) for table in DEMO_TRANSLATED_TABLES]
+            },
+            "notes": DEMO_TRANSLATION_NOTES
+        }
+    
+    try:
+        prompt = build_translation_prompt(source_dialect, target_dialect, input_ddl_json)
         
-        response = client.chat.completions.create(
+        response = create_chat_completion(
+            operation="translate_schema",
             model=MODEL,
             messages=[
                 {"role": "system", "content": "You are a database schema translation expert. Always respond with valid JSON."},
@@ -92,19 +119,7 @@ def translate_schema(source_dialect: str, target_dialect: str, input_ddl_json: d
         # Try to parse as JSON, if that fails return the raw content
         try:
             # Handle code block wrapper if present
-            cleaned_content = content.strip()
-            if cleaned_content.startswith('```json'):
-                # Extract JSON from code block
-                cleaned_content = cleaned_content[7:]  # Remove ```json
-                if cleaned_content.endswith('```'):
-                    cleaned_content = cleaned_content[:-3]  # Remove ```
-                cleaned_content = cleaned_content.strip()
-            elif cleaned_content.startswith('```'):
-                # Extract content from generic code block
-                cleaned_content = cleaned_content[3:]  # Remove ```
-                if cleaned_content.endswith('```'):
-                    cleaned_content = cleaned_content[:-3]  # Remove ```
-                cleaned_content = cleaned_content.strip()
+            cleaned_content = strip_code_fences(content)
             
             result = json.loads(cleaned_content)
             return result
@@ -132,41 +147,257 @@ def translate_schema(source_dialect: str, target_dialect: str, input_ddl_json: d
             "notes": f"AI translation failed: {str(e)}"
         }
 
-def suggest_fixes(validation_failures_json: dict) -> dict:
+class TranslatedTableStreamParser:
+    """
+    Incrementally parse the "tables" array of a streamed translation response.
+    
+    Text is fed in as it arrives and every table object is returned as soon as
+    its closing brace has been received, without waiting for the rest of the
+    completion.
+    """
+    
+    TABLES_ARRAY_PATTERN = re.compile(r'"tables"\s*:\s*\[')
+    
+    def __init__(self):
+        self.buffer = ""
+        self.search_from = 0
+        self.position = None  # Scan position once inside the tables array
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.object_start = None
+        self.finished = False
+    
+    def feed(self, text: str) -> list:
+        """Append streamed text and return the table objects completed by it"""
+        self.buffer += text
+        if self.finished:
+            return []
+        
+        if self.position is None:
+            match = self.TABLES_ARRAY_PATTERN.search(self.buffer, self.search_from)
+            if not match:
+                # Keep a small overlap so a key split across chunks is still found
+                self.search_from = max(0, len(self.buffer) - 32)
+                return []
+            self.position = match.end()
+        
+        tables = []
+        buffer = self.buffer
+        for i in range(self.position, len(buffer)):
+            char = buffer[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+            
+            if char == '"':
+                self.in_string = True
+            elif char in '{[':
+                if self.depth == 0 and char == '{':
+                    self.object_start = i
+                self.depth += 1
+            elif char in '}]':
+                if self.depth == 0:
+                    # Closing bracket of the tables array itself
+                    self.finished = True
+                    self.position = i + 1
+                    return tables
+                self.depth -= 1
+                if self.depth == 0 and char == '}' and self.object_start is not None:
+                    try:
+                        table = json.loads(buffer[self.object_start:i + 1])
+                        if isinstance(table, dict) and table.get("ddl"):
+                            tables.append(table)
+                    except json.JSONDecodeError as e:
+                        print(f"Skipping unparseable streamed table object: {e}")
+                    self.object_start = None
+        
+        self.position = len(buffer)
+        return tables
+
+def translate_schema_stream(source_dialect: str, target_dialect: str, input_ddl_json: dict, on_table) -> dict:
     """
-    Suggest fixes for validation failures using OpenAI
+    Translate schema using a streamed chat completion.
+    
+    `on_table` is called with each table object ({"name", "ddl"}) as soon as it
+    has been fully generated, so the caller can create it on the target while
+    the model is still producing the remaining tables. Errors raised by
+    `on_table` propagate to the caller. The return value has the same shape as
+    `translate_schema`.
     """
     # Check if API key is available
     if not api_key or api_key == "":
+        tables = [dict(table) for table in DEMO_TRANSLATED_TABLES]
+        for table in tables:
+            on_table(table)
         return {
-            "fixes": [{
-                "category": "Error",
-                "issue": "OpenAI API key not configured",
-                "solution": "Please set OPENAI_API_KEY in your environment variables to enable AI features.",
-                "precautions": "None"
-            }]
+            "translated_ddl": {
+                "tables": tables
+            },
+            "notes": DEMO_TRANSLATION_NOTES
         }
     
+    parser = TranslatedTableStreamParser()
+    streamed_tables = []
+    content_parts = []
+    callback_error = None
+    
     try:
-        # Initialize OpenAI client
-        client = OpenAI(api_key=api_key)
+        prompt = build_translation_prompt(source_dialect, target_dialect, input_ddl_json)
         
-        prompt = f"""
-        Based on the following validation failures, suggest fixes for each issue:
+        stream = stream_chat_completion(
+            operation="translate_schema_stream",
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": "You are a database schema translation expert. Always respond with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3
+        )
         
-        Validation Failures:
-        {json.dumps(validation_failures_json, indent=2)}
+        for delta in stream:
+            content_parts.append(delta)
+            
+            for table in parser.feed(delta):
+                streamed_tables.append(table)
+                try:
+                    on_table(table)
+                except Exception as e:
+                    callback_error = e
+                    raise
+    except Exception as e:
+        if callback_error is not None:
+            raise
+        print(f"AI streaming translation error: {e}")
+        return {
+            "translated_ddl": {
+                "tables": streamed_tables
+            },
+            "notes": f"AI translation failed: {str(e)}"
+        }
+    
+    content = "".join(content_parts)
+    if not content:
+        return {
+            "translated_ddl": {
+                "tables": []
+            },
+            "notes": "AI returned empty response"
+        }
+    
+    try:
+        result = json.loads(strip_code_fences(content))
+    except json.JSONDecodeError as e:
+        print(f"JSON parsing failed: {e}")
+        # Keep whatever tables were completed before the response broke off
+        return {
+            "translated_ddl": {
+                "tables": streamed_tables
+            },
+            "notes": f"AI translation returned non-JSON response: {content[:200]}..."
+        }
+    
+    if isinstance(result, dict) and isinstance(result.get("translated_ddl"), dict):
+        # The streamed objects are what was applied, keep the result consistent with them
+        result["translated_ddl"]["tables"] = streamed_tables
+    return result
+
+# Suggestions are generated once per unique failure signature and cached here
+FIX_CACHE_PATH = os.path.join("artifacts", "ai_fix_cache.json")
+FIX_BATCH_SIZE = int(os.getenv("AI_FIX_BATCH_SIZE", "20"))
+FIX_MAX_PARALLEL_BATCHES = int(os.getenv("AI_FIX_MAX_PARALLEL_BATCHES", "4"))
+
+def extract_validation_failures(validation_failures_json) -> list:
+    """Accept a report list, {"failures": [...]}, {"results": [...]} or a single failure dict"""
+    if isinstance(validation_failures_json, list):
+        rows = validation_failures_json
+    elif isinstance(validation_failures_json, dict):
+        for key in ("failures", "results"):
+            if isinstance(validation_failures_json.get(key), list):
+                rows = validation_failures_json[key]
+                break
+        else:
+            rows = [validation_failures_json]
+    else:
+        rows = []
+    return [row for row in rows if isinstance(row, dict)]
+
+def failure_signature(failure: dict) -> tuple:
+    """
+    Reduce a failure to (category kind, normalized error).
+    
+    "Row Count - orders" / "Row count mismatch: Source=10, Target=9" and the
+    same failure on any other table map to one signature, so one suggestion
+    covers every affected row.
+    """
+    category = str(failure.get("category") or "Unknown")
+    kind, _, subject = category.partition(" - ")
+    error = str(failure.get("errorDetails") or failure.get("issue") or "")
+    if subject:
+        error = re.sub(r'\b' + re.escape(subject) + r'\b', '<object>', error)
+    error = re.sub(r"(['\"`]).*?\1", '<value>', error)
+    error = re.sub(r'\b\d+(\.\d+)?\b', '<n>', error)
+    error = re.sub(r'\s+', ' ', error).strip()
+    return kind.strip(), error
+
+def load_fix_cache() -> dict:
+    if not os.path.exists(FIX_CACHE_PATH):
+        return {}
+    try:
+        with open(FIX_CACHE_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Ignoring unreadable fix cache: {e}")
+        return {}
+
+def save_fix_cache(cache: dict):
+    os.makedirs(os.path.dirname(FIX_CACHE_PATH), exist_ok=True)
+    temp_path = FIX_CACHE_PATH + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(temp_path, FIX_CACHE_PATH)
+
+def fix_cache_key(kind: str, error: str) -> str:
+    return hashlib.sha256(f"{MODEL}|{kind}|{error}".encode()).hexdigest()
+
+def request_fix_batch(batch: list) -> dict:
+    """Ask the model for one fix per signature in the batch. Returns {signature id: fix}."""
+    signatures = [
+        {
+            "id": group["id"],
+            "category": group["kind"],
+            "error": group["error"],
+            "example": group["example"],
+            "affected_count": len(group["rows"]),
+            "example_objects": group["objects"][:5]
+        }
+        for group in batch
+    ]
+    
+    prompt = f"""
+        The following database migration validation failures have been grouped by
+        error signature. Each signature may affect many objects; suggest ONE fix
+        per signature that applies to all of them.
+        
+        Failure signatures:
+        {json.dumps(signatures, indent=2, default=str)}
         
-        For each failure, provide:
+        For each signature, provide:
         1. A detailed explanation of the issue
         2. Step-by-step instructions to fix it
         3. Any precautions or considerations
         
-        IMPORTANT: Please format your response as JSON with the following structure:
+        IMPORTANT: Please format your response as JSON with the following structure,
+        returning exactly one entry per signature id:
         {{
             "fixes": [
                 {{
-                    "category": "Category name",
+                    "id": "Signature id from the input",
                     "issue": "Detailed explanation",
                     "solution": "Step-by-step fix",
                     "precautions": "Any precautions"
@@ -174,48 +405,133 @@ def suggest_fixes(validation_failures_json: dict) -> dict:
             ]
         }}
         """
-        
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "You are a database migration expert. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3
-        )
-        
-        # Check if response content exists
-        content = response.choices[0].message.content
-        if content is None:
-            return {
-                "fixes": [{
-                    "category": "Error",
-                    "issue": "AI returned empty response",
-                    "solution": "No suggestions available",
-                    "precautions": "None"
-                }]
-            }
-        
-        # Try to parse as JSON, if that fails return the raw content
-        try:
-            result = json.loads(content)
-            return result
-        except json.JSONDecodeError:
-            # If JSON parsing fails, return a default structure with the content as an issue
-            return {
-                "fixes": [{
-                    "category": "AI Response",
-                    "issue": content,
-                    "solution": "See issue description",
-                    "precautions": "None"
-                }]
+    
+    response = create_chat_completion(
+        operation="suggest_fixes",
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": "You are a database migration expert. Always respond with valid JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3
+    )
+    
+    content = response.choices[0].message.content
+    if content is None:
+        raise Exception("AI returned empty response")
+    
+    try:
+        result = json.loads(strip_code_fences(content))
+    except json.JSONDecodeError:
+        raise Exception(f"AI returned non-JSON response: {content[:200]}...")
+    
+    fixes = {}
+    for fix in result.get("fixes", []) if isinstance(result, dict) else []:
+        if isinstance(fix, dict) and fix.get("id") is not None:
+            fixes[str(fix["id"])] = {
+                "issue": fix.get("issue", ""),
+                "solution": fix.get("solution", ""),
+                "precautions": fix.get("precautions", "None")
             }
-    except Exception as e:
+    return fixes
+
+def suggest_fixes(validation_failures_json) -> dict:
+    """
+    Suggest fixes for validation failures using OpenAI.
+    
+    Failures are grouped by category and normalized error signature, the model
+    is asked once per unique signature (in batches), and each suggestion is
+    fanned back out to every failure that shares the signature. Suggestions
+    are cached in artifacts/ so repeated validation runs reuse them.
+    """
+    # Check if API key is available
+    if not api_key or api_key == "":
         return {
             "fixes": [{
                 "category": "Error",
-                "issue": "Failed to generate suggestions",
-                "solution": f"AI suggestion generation failed: {str(e)}",
+                "issue": "OpenAI API key not configured",
+                "solution": "Please set OPENAI_API_KEY in your environment variables to enable AI features.",
                 "precautions": "None"
             }]
-        }
\ No newline at end of file
+        }
+    
+    failures = extract_validation_failures(validation_failures_json)
+    if not failures:
+        return {"fixes": [], "signatures": 0, "cached": 0, "generated": 0}
+    
+    # Group failures by signature, keeping first-seen order
+    groups = {}
+    for index, failure in enumerate(failures):
+        kind, error = failure_signature(failure)
+        key = fix_cache_key(kind, error)
+        if key not in groups:
+            groups[key] = {
+                "id": str(len(groups) + 1),
+                "key": key,
+                "kind": kind,
+                "error": error,
+                "example": failure.get("errorDetails") or failure.get("issue"),
+                "rows": [],
+                "objects": []
+            }
+        groups[key]["rows"].append(index)
+        subject = str(failure.get("category") or "").partition(" - ")[2]
+        if subject:
+            groups[key]["objects"].append(subject)
+    
+    cache = load_fix_cache()
+    missing = [group for key, group in groups.items() if key not in cache]
+    print(f"suggest_fixes: {len(failures)} failures, {len(groups)} signatures, {len(missing)} not cached")
+    
+    errors = {}
+    if missing:
+        batches = [missing[i:i + FIX_BATCH_SIZE] for i in range(0, len(missing), FIX_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=max(1, min(FIX_MAX_PARALLEL_BATCHES, len(batches)))) as executor:
+            futures = {executor.submit(request_fix_batch, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    fixes = future.result()
+                except Exception as e:
+                    print(f"Fix batch failed: {e}")
+                    for group in batch:
+                        errors[group["key"]] = str(e)
+                    continue
+                for group in batch:
+                    fix = fixes.get(group["id"])
+                    if fix:
+                        cache[group["key"]] = dict(fix, category=group["kind"], error=group["error"])
+                    else:
+                        errors[group["key"]] = "AI response did not include this signature"
+        save_fix_cache(cache)
+    
+    # Fan suggestions back out to every affected failure
+    row_fixes = [None] * len(failures)
+    for key, group in groups.items():
+        cached = cache.get(key)
+        for index in group["rows"]:
+            if cached:
+                fix = {
+                    "issue": cached["issue"],
+                    "solution": cached["solution"],
+                    "precautions": cached.get("precautions", "None")
+                }
+            else:
+                fix = {
+                    "issue": "Failed to generate suggestions",
+                    "solution": f"AI suggestion generation failed: {errors.get(key, 'unknown error')}",
+                    "precautions": "None"
+                }
+            row_fixes[index] = dict(
+                fix,
+                category=failures[index].get("category", group["kind"]),
+                signature=group["id"],
+                affected_count=len(group["rows"])
+            )
+    
+    return {
+        "fixes": row_fixes,
+        "signatures": len(groups),
+        "cached": len(groups) - len(missing),
+        "generated": len([group for group in missing if group["key"] not in errors])
+    }
@@ -0,0 +1,197 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+import httpx
+from openai import OpenAI, APIConnectionError, APITimeoutError, RateLimitError, InternalServerError
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Client configuration. OPENAI_BASE_URL can point at a local server that
+# mimics the chat-completions endpoint for testing.
+AI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+AI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT", "60"))
+AI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10"))
+AI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+AI_RETRY_BASE_DELAY = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.5"))
+AI_RETRY_MAX_DELAY = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "8"))
+AI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "10"))
+
+# Errors worth another attempt; anything else (bad request, auth) fails immediately
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
+# Most recent calls kept for the status payload
+METRICS_HISTORY_SIZE = 200
+
+client_lock = threading.Lock()
+shared_client = None
+
+metrics_lock = threading.Lock()
+ai_call_metrics = deque(maxlen=METRICS_HISTORY_SIZE)
+
+def get_ai_client() -> OpenAI:
+    """Return the process-wide OpenAI client, creating it on first use.
+
+    The client keeps a pooled HTTP connection so repeated calls reuse the
+    TLS session instead of paying a new handshake each time. Retries are
+    handled here rather than by the SDK so they can be measured.
+    """
+    global shared_client
+    with client_lock:
+        if shared_client is None:
+            timeout = httpx.Timeout(AI_TIMEOUT_SECONDS, connect=AI_CONNECT_TIMEOUT_SECONDS)
+            http_client = httpx.Client(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=AI_MAX_CONNECTIONS,
+                    max_keepalive_connections=AI_MAX_CONNECTIONS
+                )
+            )
+            shared_client = OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=AI_BASE_URL,
+                timeout=timeout,
+                max_retries=0,
+                http_client=http_client
+            )
+        return shared_client
+
+def reset_ai_client():
+    """Close the shared client so the next call picks up new settings"""
+    global shared_client
+    with client_lock:
+        if shared_client is not None:
+            try:
+                shared_client.close()
+            except Exception:
+                pass
+        shared_client = None
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given (zero-based) attempt"""
+    return random.uniform(0, min(AI_RETRY_MAX_DELAY, AI_RETRY_BASE_DELAY * (2 ** attempt)))
+
+def record_ai_call(metric: dict):
+    with metrics_lock:
+        ai_call_metrics.append(metric)
+
+def get_ai_metrics(recent: int = 20) -> dict:
+    """Summarize recorded AI calls for status payloads"""
+    with metrics_lock:
+        calls = list(ai_call_metrics)
+
+    successful = [call for call in calls if call["ok"]]
+    latencies = sorted(call["latency_ms"] for call in successful)
+
+    return {
+        "calls": len(calls),
+        "failures": len(calls) - len(successful),
+        "retries": sum(max(call["attempts"] - 1, 0) for call in calls),
+        "prompt_tokens": sum(call["prompt_tokens"] or 0 for call in calls),
+        "completion_tokens": sum(call["completion_tokens"] or 0 for call in calls),
+        "avg_latency_ms": round(sum(latencies) / len(latencies), 1) if latencies else None,
+        "max_latency_ms": latencies[-1] if latencies else None,
+        "recent": calls[-recent:]
+    }
+
+def new_metric(operation: str, model: str, streamed: bool) -> dict:
+    return {
+        "operation": operation,
+        "model": model,
+        "streamed": streamed,
+        "started_at": time.time(),
+        "latency_ms": None,
+        "time_to_first_token_ms": None,
+        "prompt_tokens": None,
+        "completion_tokens": None,
+        "attempts": 0,
+        "ok": False,
+        "error": None
+    }
+
+def apply_usage(metric: dict, usage):
+    if usage is not None:
+        metric["prompt_tokens"] = getattr(usage, "prompt_tokens", None)
+        metric["completion_tokens"] = getattr(usage, "completion_tokens", None)
+
+def create_chat_completion(operation: str, model: str, messages: list, temperature: float = 0.3):
+    """Run a chat completion on the shared client with bounded, jittered retries"""
+    client = get_ai_client()
+    metric = new_metric(operation, model, streamed=False)
+    start = time.perf_counter()
+
+    try:
+        for attempt in range(AI_MAX_RETRIES + 1):
+            metric["attempts"] = attempt + 1
+            try:
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature
+                )
+                metric["ok"] = True
+                apply_usage(metric, getattr(response, "usage", None))
+                return response
+            except RETRYABLE_ERRORS as e:
+                if attempt >= AI_MAX_RETRIES:
+                    raise
+                delay = retry_delay(attempt)
+                print(f"AI call '{operation}' failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+    except Exception as e:
+        metric["error"] = str(e)
+        raise
+    finally:
+        metric["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        record_ai_call(metric)
+
+def stream_chat_completion(operation: str, model: str, messages: list, temperature: float = 0.3):
+    """Yield content deltas of a streamed chat completion on the shared client.
+
+    Retries only happen before the first chunk arrives; once content has been
+    handed to the caller a failure is raised instead of replaying the stream.
+    """
+    client = get_ai_client()
+    metric = new_metric(operation, model, streamed=True)
+    start = time.perf_counter()
+    received_content = False
+
+    try:
+        for attempt in range(AI_MAX_RETRIES + 1):
+            metric["attempts"] = attempt + 1
+            try:
+                stream = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    stream=True,
+                    extra_body={"stream_options": {"include_usage": True}}
+                )
+                for chunk in stream:
+                    apply_usage(metric, getattr(chunk, "usage", None))
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    if not received_content:
+                        received_content = True
+                        metric["time_to_first_token_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                    yield delta
+                metric["ok"] = True
+                return
+            except RETRYABLE_ERRORS as e:
+                if received_content or attempt >= AI_MAX_RETRIES:
+                    raise
+                delay = retry_delay(attempt)
+                print(f"AI stream '{operation}' failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+    except BaseException as e:
+        metric["error"] = str(e) or type(e).__name__
+        raise
+    finally:
+        metric["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        record_ai_call(metric)
@@ -0,0 +1,192 @@
+import os
+from typing import Dict, Any, List, Optional
+
+from backend.schema_diff import quote_identifier
+
+# Rows per chunk when reading tables in batches
+CHUNK_SIZE = int(os.getenv("STRATA_CHUNK_SIZE", "10000"))
+
+def qualify(table_name: str, db_type: str, schema: Optional[str] = None) -> str:
+    name = quote_identifier(table_name, db_type)
+    return f"{quote_identifier(schema, db_type)}.{name}" if schema else name
+
+def get_chunk_key(connection, db_type: str, table_name: str, schema: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Pick the columns chunks are keyed on.
+
+    Returns {"kind": "pk" | "unique" | "ctid" | "scan", "columns": [...]}:
+    the primary key, else a unique index over NOT NULL columns, else ctid
+    page ranges on PostgreSQL, else a single streamed scan.
+    """
+    cursor = connection.cursor()
+    try:
+        if db_type == "PostgreSQL":
+            cursor.execute("""
+                SELECT i.indisprimary, array_agg(a.attname ORDER BY k.ord)
+                FROM pg_index i
+                CROSS JOIN LATERAL unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+                WHERE i.indrelid = %s::regclass
+                  AND i.indisunique
+                  AND i.indpred IS NULL
+                  AND i.indexprs IS NULL
+                GROUP BY i.indexrelid, i.indisprimary
+                HAVING bool_and(a.attnotnull)
+                ORDER BY i.indisprimary DESC, count(*)
+                LIMIT 1
+            """, (qualify(table_name, db_type, schema),))
+        else:
+            cursor.execute("""
+                SELECT s.INDEX_NAME = 'PRIMARY', GROUP_CONCAT(s.COLUMN_NAME ORDER BY s.SEQ_IN_INDEX SEPARATOR '\\n')
+                FROM information_schema.STATISTICS s
+                JOIN information_schema.COLUMNS c
+                  ON c.TABLE_SCHEMA = s.TABLE_SCHEMA AND c.TABLE_NAME = s.TABLE_NAME AND c.COLUMN_NAME = s.COLUMN_NAME
+                WHERE s.TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND s.TABLE_NAME = %s AND s.NON_UNIQUE = 0
+                GROUP BY s.INDEX_NAME
+                HAVING SUM(c.IS_NULLABLE = 'YES') = 0
+                ORDER BY s.INDEX_NAME = 'PRIMARY' DESC, COUNT(*)
+                LIMIT 1
+            """, (schema, table_name))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    if row:
+        columns = list(row[1]) if isinstance(row[1], (list, tuple)) else str(row[1]).split("\n")
+        return {"kind": "pk" if row[0] else "unique", "columns": columns}
+    if db_type == "PostgreSQL":
+        return {"kind": "ctid", "columns": []}
+    return {"kind": "scan", "columns": []}
+
+def keyset_predicate(key_columns: List[str], db_type: str) -> str:
+    """WHERE clause selecting rows after the last key seen"""
+    quoted = [quote_identifier(column, db_type) for column in key_columns]
+    if db_type == "PostgreSQL" or len(quoted) == 1:
+        placeholders = ", ".join(["%s"] * len(quoted))
+        return f"({', '.join(quoted)}) > ({placeholders})"
+    # MySQL only uses the index for the expanded form: a > x OR (a = x AND b > y) ...
+    terms = []
+    for i in range(len(quoted)):
+        equals = [f"{column} = %s" for column in quoted[:i]]
+        terms.append("(" + " AND ".join(equals + [f"{quoted[i]} > %s"]) + ")")
+    return " OR ".join(terms)
+
+def keyset_parameters(last_key: tuple, db_type: str) -> tuple:
+    if db_type == "PostgreSQL" or len(last_key) == 1:
+        return tuple(last_key)
+    parameters = []
+    for i in range(len(last_key)):
+        parameters.extend(last_key[:i + 1])
+    return tuple(parameters)
+
+class KeysetChunkReader:
+    """
+    Read a table in bounded chunks without LIMIT/OFFSET.
+
+    Each chunk seeks from the last key of the previous one
+    (WHERE key > last ORDER BY key LIMIT n), so it costs the same wherever
+    it falls in the table. Composite keys are compared as a whole.
+    PostgreSQL tables without a usable key are read by ctid page ranges;
+    on MySQL they fall back to one streamed scan read in batches.
+    """
+
+    def __init__(self, connection, db_type: str, table_name: str, columns: List[str], schema: Optional[str] = None,
+                 chunk_size: int = CHUNK_SIZE, key: Optional[Dict[str, Any]] = None):
+        self.connection = connection
+        self.db_type = db_type
+        self.table_name = table_name
+        self.schema = schema
+        self.columns = list(columns)
+        self.chunk_size = max(1, chunk_size)
+        self.key = key or get_chunk_key(connection, db_type, table_name, schema)
+        self.last_key = None
+
+        # Key columns are read along with the data; extras are dropped before rows are returned
+        lowered = [column.lower() for column in self.columns]
+        self.extra_columns = [column for column in self.key["columns"] if column.lower() not in lowered]
+        select_columns = self.columns + self.extra_columns
+        select_lowered = [column.lower() for column in select_columns]
+        self.key_positions = [select_lowered.index(column.lower()) for column in self.key["columns"]]
+        self.select_list = ", ".join(quote_identifier(column, db_type) for column in select_columns)
+        self.table_sql = qualify(table_name, db_type, schema)
+
+    def strip_extras(self, rows):
+        if not self.extra_columns:
+            return rows
+        width = len(self.columns)
+        return [row[:width] for row in rows]
+
+    def __iter__(self):
+        if self.key["kind"] in ("pk", "unique"):
+            return self.keyset_chunks()
+        if self.key["kind"] == "ctid":
+            return self.ctid_chunks()
+        return self.scan_chunks()
+
+    def keyset_chunks(self):
+        order_by = ", ".join(quote_identifier(column, self.db_type) for column in self.key["columns"])
+        first_query = f"SELECT {self.select_list} FROM {self.table_sql} ORDER BY {order_by} LIMIT {self.chunk_size}"
+        next_query = (f"SELECT {self.select_list} FROM {self.table_sql} "
+                      f"WHERE {keyset_predicate(self.key['columns'], self.db_type)} ORDER BY {order_by} LIMIT {self.chunk_size}")
+
+        cursor = self.connection.cursor()
+        try:
+            while True:
+                if self.last_key is None:
+                    cursor.execute(first_query)
+                else:
+                    cursor.execute(next_query, keyset_parameters(self.last_key, self.db_type))
+                rows = cursor.fetchall()
+                if not rows:
+                    return
+                last_row = rows[-1]
+                self.last_key = tuple(last_row[position] for position in self.key_positions)
+                yield self.strip_extras(rows)
+                if len(rows) < self.chunk_size:
+                    return
+        finally:
+            cursor.close()
+
+    def ctid_chunks(self):
+        """PostgreSQL tables without a key: scan fixed page ranges (TID range scans on PG 14+)"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT pg_relation_size(c.oid) / current_setting('block_size')::int,
+                       CASE WHEN c.relpages > 0 THEN c.reltuples / c.relpages ELSE 0 END
+                FROM pg_class c
+                WHERE c.oid = %s::regclass
+            """, (self.table_sql,))
+            total_pages, rows_per_page = cursor.fetchone()
+            pages_per_chunk = max(1, int(self.chunk_size / rows_per_page)) if rows_per_page and rows_per_page > 0 else 1
+
+            query = (f"SELECT {self.select_list} FROM {self.table_sql} "
+                     f"WHERE ctid >= %s::tid AND ctid < %s::tid")
+            page = 0
+            while page < int(total_pages):
+                cursor.execute(query, (f"({page},0)", f"({page + pages_per_chunk},0)"))
+                rows = cursor.fetchall()
+                page += pages_per_chunk
+                self.last_key = (page,)
+                if rows:
+                    yield rows
+        finally:
+            cursor.close()
+
+    def scan_chunks(self):
+        """Single ordered-by-nothing scan for MySQL tables with no unique NOT NULL key"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SELECT {self.select_list} FROM {self.table_sql}")
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+def read_in_chunks(connection, db_type: str, table_name: str, columns: List[str], schema: Optional[str] = None,
+                   chunk_size: int = CHUNK_SIZE):
+    """Yield bounded batches of rows from a table using keyset pagination"""
+    return iter(KeysetChunkReader(connection, db_type, table_name, columns, schema, chunk_size))
@@ -0,0 +1,141 @@
+from decimal import Decimal
+from typing import Dict, Any, List, Tuple
+
+from backend.schema_diff import quote_identifier
+from backend.data_diff import column_category, value_text_sql, execute
+from backend.value_converters import base_type
+
+# Canonical base types (see canonical_type)
+NUMERIC_TYPES = {"integer", "bigint", "smallint", "numeric", "float", "double", "real"}
+APPROXIMATE_TYPES = {"float", "double", "real"}
+SINGLE_PRECISION_TYPES = {"float", "real"}
+STRING_TYPES = {"char", "varchar", "text", "enum", "uuid"}
+
+# Relative tolerances for floating point statistics, double and single precision
+FLOAT_TOLERANCE = 1e-9
+SINGLE_FLOAT_TOLERANCE = 1e-6
+
+def fingerprint_family(type_text: str) -> str:
+    """Which aggregates a column gets: numeric, temporal, boolean, string, binary or other (null count only)"""
+    category = column_category(type_text)
+    base = base_type(type_text)
+    if category == "boolean":
+        return "boolean"
+    if category in ("timestamp", "date"):
+        return "temporal"
+    if category == "binary":
+        return "binary"
+    if base in NUMERIC_TYPES:
+        return "numeric"
+    if base in STRING_TYPES:
+        return "string"
+    return "other"
+
+def column_aggregates(column: str, type_text: str, db_type: str) -> List[Tuple[str, str]]:
+    """(statistic, SQL expression) pairs for one column"""
+    name = quote_identifier(column, db_type)
+    family = fingerprint_family(type_text)
+    aggregates = [("nulls", f"SUM(CASE WHEN {name} IS NULL THEN 1 ELSE 0 END)")]
+    if family == "numeric":
+        if db_type == "PostgreSQL" and base_type(type_text) in APPROXIMATE_TYPES:
+            # SUM(real) accumulates in float4 on PostgreSQL; MySQL already sums floats as doubles
+            name = f"CAST({name} AS double precision)"
+        aggregates += [("min", f"MIN({name})"), ("max", f"MAX({name})"), ("sum", f"SUM({name})")]
+    elif family == "temporal":
+        # Rendered as ISO text on both sides, which sorts chronologically
+        text = value_text_sql(column, column_category(type_text), db_type)
+        aggregates += [("min", f"MIN({text})"), ("max", f"MAX({text})")]
+    elif family == "boolean":
+        truthy = f"CASE WHEN {name} THEN 1 ELSE 0 END" if db_type == "PostgreSQL" else f"CASE WHEN {name} <> 0 THEN 1 ELSE 0 END"
+        aggregates += [("true", f"SUM({truthy})")]
+    elif family == "string":
+        # String MIN/MAX depend on collation, so only lengths are compared
+        aggregates += [("length", f"SUM(CHAR_LENGTH({name}))")]
+    elif family == "binary":
+        aggregates += [("length", f"SUM(LENGTH({name}))")]
+    return aggregates
+
+def fetch_fingerprint(connection, db_type: str, table_name: str, columns: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Row count and per-column statistics of one table in a single scan.
+
+    columns are (column, type) pairs. Returns {"rows": n, "columns": {column: {statistic: value}}}.
+    """
+    selected = ["COUNT(*)"]
+    layout = []
+    for column, type_text in columns:
+        for statistic, expression in column_aggregates(column, type_text, db_type):
+            selected.append(expression)
+            layout.append((column, statistic))
+
+    cursor = connection.cursor()
+    try:
+        execute(cursor, f"SELECT {', '.join(selected)} FROM {quote_identifier(table_name, db_type)}", ())
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    fingerprint = {"rows": int(row[0]), "columns": {}}
+    for (column, statistic), value in zip(layout, row[1:]):
+        fingerprint["columns"].setdefault(column, {})[statistic] = value
+    return fingerprint
+
+def values_match(source_value, target_value, tolerance: float = 0.0) -> bool:
+    if source_value is None or target_value is None:
+        return source_value is None and target_value is None
+    if isinstance(source_value, str) or isinstance(target_value, str):
+        return str(source_value) == str(target_value)
+    source_number, target_number = Decimal(str(source_value)), Decimal(str(target_value))
+    if tolerance:
+        scale = max(abs(source_number), abs(target_number), Decimal(1))
+        return abs(source_number - target_number) <= scale * Decimal(str(tolerance))
+    return source_number == target_number
+
+def compare_fingerprints(source: Dict[str, Any], target: Dict[str, Any], columns: List[Dict[str, str]],
+                         equivalent_types=None) -> List[str]:
+    """
+    Differences between two fingerprints, one message per statistic.
+
+    columns are {"source_name", "target_name", "source_type", "target_type"}.
+    Statistics beyond the null count are compared only when the column types
+    are equivalent (equivalent_types, e.g. are_equivalent_types) or fall in
+    the same family, since e.g. a number stored as text has no comparable sum.
+    """
+    differences = []
+    if source["rows"] != target["rows"]:
+        differences.append(f"rows: {source['rows']} vs {target['rows']}")
+
+    for column in columns:
+        source_stats = source["columns"].get(column["source_name"], {})
+        target_stats = target["columns"].get(column["target_name"], {})
+        comparable = fingerprint_family(column["source_type"]) == fingerprint_family(column["target_type"]) or (
+            equivalent_types is not None and equivalent_types(column["source_type"].split("(")[0], column["target_type"].split("(")[0])
+        )
+        bases = {base_type(column["source_type"]), base_type(column["target_type"])}
+        tolerance = 0.0
+        if bases & SINGLE_PRECISION_TYPES:
+            tolerance = SINGLE_FLOAT_TOLERANCE
+        elif bases & APPROXIMATE_TYPES:
+            tolerance = FLOAT_TOLERANCE
+        for statistic, source_value in source_stats.items():
+            if statistic != "nulls" and not comparable:
+                continue
+            if statistic not in target_stats:
+                continue
+            target_value = target_stats[statistic]
+            if not values_match(source_value, target_value, tolerance if statistic in ("min", "max", "sum") else 0.0):
+                differences.append(f"{column['source_name']} {statistic}: {source_value} vs {target_value}")
+    return differences
+
+def fingerprint_table(source_connection, target_connection, source_type: str, target_type: str, source_table: str,
+                      target_table: str, columns: List[Dict[str, str]], equivalent_types=None) -> Dict[str, Any]:
+    """Fingerprint one table on both sides and compare; returns {"table", "rows", "differences"}"""
+    source = fetch_fingerprint(source_connection, source_type, source_table,
+                               [(column["source_name"], column["source_type"]) for column in columns])
+    target = fetch_fingerprint(target_connection, target_type, target_table,
+                               [(column["target_name"], column["target_type"]) for column in columns])
+    return {
+        "table": source_table,
+        "rows": source["rows"],
+        "differences": compare_fingerprints(source, target, columns, equivalent_types)
+    }
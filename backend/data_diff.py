@@ -0,0 +1,335 @@
+import datetime
+import hashlib
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from backend.schema_diff import quote_identifier
+from backend.chunk_reader import keyset_predicate, keyset_parameters
+from backend.value_converters import time_of_day
+
+# Rows per top-level segment; segment boundaries are the only keys read up front
+DIFF_SEGMENT_ROWS = int(os.getenv("STRATA_DIFF_SEGMENT_ROWS", "100000"))
+# Ranges this small are compared row by row instead of bisected further
+DIFF_LEAF_ROWS = int(os.getenv("STRATA_DIFF_LEAF_ROWS", "64"))
+# Stop drilling down once this many differing rows have been found in a table
+DIFF_MAX_ROWS = int(os.getenv("STRATA_DIFF_MAX_ROWS", "1000"))
+
+NULL_MARKER = "~null~"
+
+def column_category(type_text: str) -> str:
+    """Group source/target column types so both sides render values the same way"""
+    text = (type_text or "").strip().lower()
+    base = text.split("(")[0].strip()
+    if text.startswith("tinyint(1)") or base in ("boolean", "bool"):
+        return "boolean"
+    if base == "datetime" or base.startswith("timestamp"):
+        return "timestamp"
+    if base == "date":
+        return "date"
+    if base in ("float", "double", "real", "double precision"):
+        return "float"
+    if base in ("bytea", "blob", "tinyblob", "mediumblob", "longblob", "binary", "varbinary"):
+        return "binary"
+    if base in ("json", "jsonb"):
+        return "json"
+    if base == "bit":
+        return "bit"
+    if base == "array" or text.endswith("[]"):
+        return "array"
+    return "text"
+
+def value_text_sql(column: str, category: str, db_type: str) -> str:
+    """Text rendering of a column that is identical on MySQL and PostgreSQL for equal values (NULL stays NULL)"""
+    name = quote_identifier(column, db_type)
+    if db_type == "MySQL":
+        expression = {
+            "boolean": f"CAST({name} AS CHAR)",
+            # Written as-is: mysql-connector does not unescape %%, and %S (not %s) so it is not taken for a parameter
+            "timestamp": f"DATE_FORMAT({name}, '%Y-%m-%d %H:%i:%S.%f')",
+            "float": f"CAST(CAST({name} AS DECIMAL(65,6)) AS CHAR)",
+            "binary": f"LOWER(HEX({name}))",
+            "bit": f"CAST({name} + 0 AS CHAR)"
+        }.get(category, f"CAST({name} AS CHAR)")
+    else:
+        expression = {
+            "boolean": f"CASE WHEN {name} THEN '1' WHEN NOT {name} THEN '0' END",
+            "timestamp": f"to_char({name}, 'YYYY-MM-DD HH24:MI:SS.US')",
+            "date": f"to_char({name}, 'YYYY-MM-DD')",
+            "float": f"round({name}::numeric, 6)::text",
+            "binary": f"encode({name}, 'hex')",
+            "json": f"{name}::jsonb::text",
+            "array": f"array_to_string({name}, ',')"
+        }.get(category, f"{name}::text")
+    return expression
+
+def normalized_value_sql(column: str, category: str, db_type: str) -> str:
+    """value_text_sql with NULL rendered as a marker, for hashing"""
+    return f"COALESCE({value_text_sql(column, category, db_type)}, '{NULL_MARKER}')"
+
+def row_hash_sql(columns: List[Tuple[str, str]], db_type: str) -> str:
+    """md5 hex of one row, from (column, category) pairs"""
+    values = ", ".join(normalized_value_sql(column, category, db_type) for column, category in columns)
+    return f"MD5(CONCAT_WS('|', {values}))"
+
+def row_hash_number_sql(columns: List[Tuple[str, str]], db_type: str) -> str:
+    """First 60 bits of the row hash as an integer, so ranges can SUM them"""
+    digest = row_hash_sql(columns, db_type)
+    if db_type == "MySQL":
+        return f"CAST(CONV(SUBSTRING({digest}, 1, 15), 16, 10) AS UNSIGNED)"
+    return f"('x' || substr({digest}, 1, 15))::bit(60)::bigint"
+
+# Categories whose database rendering Python can reproduce exactly
+PYTHON_HASHABLE_CATEGORIES = {"boolean", "timestamp", "date", "text", "binary", "array"}
+
+def normalized_value_text(value, category: str) -> str:
+    """Python equivalent of normalized_value_sql for a value as the target stores it"""
+    if value is None:
+        return NULL_MARKER
+    if category == "boolean":
+        return str(int(value))
+    if category == "timestamp" and isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if category == "binary":
+        return bytes(value).hex()
+    if category == "array" and isinstance(value, (list, tuple)):
+        return ",".join(str(item) for item in value)
+    if isinstance(value, datetime.timedelta):
+        return time_of_day(value)
+    return str(value)
+
+def build_row_hasher(categories: List[str]):
+    """
+    Function returning (row count, SUM of row_hash_number_sql) for a batch of rows,
+    or None when a column's rendering cannot be reproduced in Python.
+    """
+    if any(category not in PYTHON_HASHABLE_CATEGORIES for category in categories):
+        return None
+    indexed = list(enumerate(categories))
+
+    def hash_rows(rows) -> Tuple[int, int]:
+        total = 0
+        for row in rows:
+            text = "|".join(normalized_value_text(row[position], category) for position, category in indexed)
+            total += int(hashlib.md5(text.encode("utf-8")).hexdigest()[:15], 16)
+        return len(rows), total
+
+    return hash_rows
+
+def execute(cursor, query: str, parameters: tuple):
+    # Without parameters the query is sent untouched, so psycopg2 does not look for placeholders in it
+    if parameters:
+        cursor.execute(query, parameters)
+    else:
+        cursor.execute(query)
+
+def key_range_filter(keys: List[str], db_type: str, lower: Optional[tuple], upper: Optional[tuple]) -> Tuple[str, tuple]:
+    """WHERE clause for keys in (lower, upper]; None leaves that end open"""
+    clauses, parameters = [], ()
+    if lower is not None:
+        clauses.append(f"({keyset_predicate(keys, db_type)})")
+        parameters += keyset_parameters(tuple(lower), db_type)
+    if upper is not None:
+        clauses.append(f"NOT ({keyset_predicate(keys, db_type)})")
+        parameters += keyset_parameters(tuple(upper), db_type)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", parameters
+
+def range_checksum(connection, db_type: str, table_name: str, columns: List[Tuple[str, str]],
+                   keys: Optional[List[str]] = None, lower: Optional[tuple] = None, upper: Optional[tuple] = None) -> Tuple[int, Optional[int]]:
+    """
+    COUNT(*) and SUM of row hashes over one table (or key range) on one side.
+
+    columns are (column, category) pairs; with an empty list only the count is taken.
+    """
+    where, parameters = key_range_filter(keys, db_type, lower, upper) if keys else ("", ())
+    hash_sum = f"COALESCE(SUM({row_hash_number_sql(columns, db_type)}), 0)" if columns else "NULL"
+    cursor = connection.cursor()
+    try:
+        execute(cursor, f"SELECT COUNT(*), {hash_sum} FROM {quote_identifier(table_name, db_type)}{where}", parameters)
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    return int(row[0]), (int(row[1]) if row[1] is not None else None)
+
+class MerkleTableDiff:
+    """
+    Compare one table on source and target by hashing key ranges in the database.
+
+    The source key order is cut into segments of segment_rows; each side
+    returns only COUNT(*) and SUM(row hash) per segment. Segments that
+    disagree are bisected at their median key (one half is queried, the
+    other derived by subtraction) until a range holds at most leaf_rows,
+    and only those ranges come back as (key, md5) pairs. A clean table
+    costs a few hundred bytes per segment; a single changed row costs
+    about 2 * log2(segment_rows / leaf_rows) extra range queries.
+    """
+
+    def __init__(self, source_connection, target_connection, source_type: str, target_type: str,
+                 table_name: str, target_table_name: str, columns: List[Dict[str, str]], key_columns: List[str],
+                 segment_rows: int = DIFF_SEGMENT_ROWS, leaf_rows: int = DIFF_LEAF_ROWS, max_rows: int = DIFF_MAX_ROWS):
+        self.table_name = table_name
+        self.key_columns = key_columns
+        self.segment_rows = max(2, segment_rows)
+        self.leaf_rows = max(1, leaf_rows)
+        self.max_rows = max_rows
+        self.sides = {}
+        for side, connection, db_type, name, type_key in (
+            ("source", source_connection, source_type, table_name, "source_type"),
+            ("target", target_connection, target_type, target_table_name, "target_type")
+        ):
+            hashed = [(column["name"], column_category(column[type_key])) for column in columns]
+            key_names = [next((column["name"] for column in columns if column["name"].lower() == key.lower()), key)
+                         for key in key_columns]
+            self.sides[side] = {
+                "connection": connection,
+                "db_type": db_type,
+                "table": quote_identifier(name, db_type),
+                "keys": key_names,
+                "key_list": ", ".join(quote_identifier(key, db_type) for key in key_names),
+                "hash": row_hash_sql(hashed, db_type),
+                "hash_number": row_hash_number_sql(hashed, db_type)
+            }
+        self.queries = 0
+        self.hashes_transferred = 0
+
+    def range_filter(self, side: str, lower: Optional[tuple], upper: Optional[tuple]) -> Tuple[str, tuple]:
+        info = self.sides[side]
+        return key_range_filter(info["keys"], info["db_type"], lower, upper)
+
+    def query(self, side: str, sql: str, parameters: tuple) -> List[tuple]:
+        cursor = self.sides[side]["connection"].cursor()
+        try:
+            execute(cursor, sql, parameters)
+            self.queries += 1
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def summarize(self, side: str, lower: Optional[tuple], upper: Optional[tuple]) -> Tuple[int, int]:
+        info = self.sides[side]
+        where, parameters = self.range_filter(side, lower, upper)
+        row = self.query(side, f"SELECT COUNT(*), COALESCE(SUM({info['hash_number']}), 0) FROM {info['table']}{where}", parameters)[0]
+        self.hashes_transferred += 1
+        return int(row[0]), int(row[1])
+
+    def segment_boundaries(self) -> List[tuple]:
+        """Every segment_rows-th source key, read in one pass"""
+        info = self.sides["source"]
+        rows = self.query("source", f"""
+            SELECT {info['key_list']} FROM (
+                SELECT {info['key_list']}, ROW_NUMBER() OVER (ORDER BY {info['key_list']}) AS strata_rn
+                FROM {info['table']}
+            ) numbered
+            WHERE MOD(strata_rn, {self.segment_rows}) = 0
+            ORDER BY {info['key_list']}
+        """, ())
+        return [tuple(row) for row in rows]
+
+    def median_key(self, side: str, lower: Optional[tuple], upper: Optional[tuple], count: int) -> tuple:
+        info = self.sides[side]
+        where, parameters = self.range_filter(side, lower, upper)
+        # Numbered in one pass over the range, like segment_boundaries, rather than skipped past with OFFSET
+        rows = self.query(side, f"""
+            SELECT {info['key_list']} FROM (
+                SELECT {info['key_list']}, ROW_NUMBER() OVER (ORDER BY {info['key_list']}) AS strata_rn
+                FROM {info['table']}{where}
+            ) numbered
+            WHERE strata_rn = {max(1, count // 2)}
+        """, parameters)
+        return tuple(rows[0])
+
+    def leaf_hashes(self, side: str, lower: Optional[tuple], upper: Optional[tuple]) -> Dict[tuple, Tuple[tuple, str]]:
+        info = self.sides[side]
+        where, parameters = self.range_filter(side, lower, upper)
+        rows = self.query(side, f"SELECT {info['key_list']}, {info['hash']} FROM {info['table']}{where}", parameters)
+        self.hashes_transferred += len(rows)
+        width = len(self.key_columns)
+        # Keys are matched on their text form so driver types (Decimal vs int) do not matter
+        return {tuple(str(value) for value in row[:width]): (tuple(row[:width]), row[width]) for row in rows}
+
+    def run(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        boundaries = self.segment_boundaries()
+        edges = [None] + boundaries + [None]
+        segments = list(zip(edges[:-1], edges[1:]))
+
+        source_only, target_only = {}, {}
+        source_rows = target_rows = 0
+        mismatched_segments = 0
+        truncated = False
+
+        for lower, upper in segments:
+            source_summary = self.summarize("source", lower, upper)
+            target_summary = self.summarize("target", lower, upper)
+            source_rows += source_summary[0]
+            target_rows += target_summary[0]
+            if source_summary == target_summary:
+                continue
+            mismatched_segments += 1
+            if truncated:
+                continue
+
+            stack = [(lower, upper, source_summary, target_summary)]
+            while stack:
+                range_lower, range_upper, source_range, target_range = stack.pop()
+                if source_range == target_range:
+                    continue
+                if max(source_range[0], target_range[0]) <= self.leaf_rows:
+                    source_leaf = self.leaf_hashes("source", range_lower, range_upper)
+                    target_leaf = self.leaf_hashes("target", range_lower, range_upper)
+                    for key in source_leaf.keys() | target_leaf.keys():
+                        if source_leaf.get(key, (None, None))[1] != target_leaf.get(key, (None, None))[1]:
+                            if key in source_leaf:
+                                source_only[key] = source_leaf[key]
+                            if key in target_leaf:
+                                target_only[key] = target_leaf[key]
+                    if len(source_only) + len(target_only) >= self.max_rows:
+                        truncated = True
+                        break
+                    continue
+
+                # Split at the median of whichever side has more rows in the range
+                side = "source" if source_range[0] >= target_range[0] else "target"
+                middle = self.median_key(side, range_lower, range_upper, max(source_range[0], target_range[0]))
+                source_left = self.summarize("source", range_lower, middle)
+                target_left = self.summarize("target", range_lower, middle)
+                source_right = (source_range[0] - source_left[0], source_range[1] - source_left[1])
+                target_right = (target_range[0] - target_left[0], target_range[1] - target_left[1])
+                stack.append((middle, range_upper, source_right, target_right))
+                stack.append((range_lower, middle, source_left, target_left))
+
+        # A row can land in different ranges on each side when collations differ; pair them up here
+        missing, extra, changed = [], [], []
+        for key in source_only.keys() | target_only.keys():
+            if key in source_only and key in target_only:
+                if source_only[key][1] != target_only[key][1]:
+                    changed.append(source_only[key][0])
+            elif key in source_only:
+                missing.append(source_only[key][0])
+            else:
+                extra.append(target_only[key][0])
+
+        differences = len(missing) + len(extra) + len(changed)
+        return {
+            "table": self.table_name,
+            "status": "differs" if differences or truncated else "match",
+            "source_rows": source_rows,
+            "target_rows": target_rows,
+            "segments": len(segments),
+            "mismatched_segments": mismatched_segments,
+            "missing": sorted(missing, key=str),
+            "extra": sorted(extra, key=str),
+            "changed": sorted(changed, key=str),
+            "truncated": truncated,
+            "queries": self.queries,
+            "hashes_transferred": self.hashes_transferred,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+
+def diff_table(source_connection, target_connection, source_type: str, target_type: str, table_name: str,
+               target_table_name: str, columns: List[Dict[str, str]], key_columns: List[str], **options) -> Dict[str, Any]:
+    """Checksum diff of one table; columns are {"name", "source_type", "target_type"}"""
+    if not key_columns:
+        return {"table": table_name, "status": "skipped", "reason": "no primary key or unique NOT NULL key"}
+    return MerkleTableDiff(source_connection, target_connection, source_type, target_type, table_name,
+                           target_table_name, columns, key_columns, **options).run()
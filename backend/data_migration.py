@@ -0,0 +1,454 @@
+import os
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Optional
+
+from backend.dependency_planner import normalize_table_name
+from backend.schema_diff import quote_identifier
+from backend.chunk_reader import KeysetChunkReader, get_chunk_key
+from backend.source_snapshot import open_source_snapshot
+from backend.table_writer import TableWriter, DeadLetterFile, merge_from_staging, LOAD_MODE
+from backend.load_profile import FastLoadSession, begin_table_load
+from backend.value_converters import build_batch_converter
+from backend.run_manifest import RunManifest
+
+# Tables loaded concurrently, each on its own pair of connections
+DATA_WORKERS = int(os.getenv("STRATA_DATA_WORKERS", "4"))
+
+# PostgreSQL to PostgreSQL copies stream COPY output straight into COPY input:
+# "text" (default), "binary" (needs identical column types on both sides) or "off"
+PG_COPY_FORMAT = os.getenv("STRATA_PG_COPY_FORMAT", "text").lower()
+COPY_BUFFER_SIZE = int(os.getenv("STRATA_COPY_BUFFER_SIZE", str(1024 * 1024)))
+
+def qualified_name(table: Dict[str, Any], db_type: str, side: str = "source") -> str:
+    """Quoted (schema-qualified on the source when known) table name"""
+    name = quote_identifier(table[f"{side}_name"], db_type)
+    schema = table.get("source_schema") if side == "source" else None
+    return f"{quote_identifier(schema, db_type)}.{name}" if schema else name
+
+def estimate_table_cost(stats: Dict[str, Any], profile: Dict[str, Any]) -> float:
+    """Relative cost of copying a table: bytes when known, otherwise rows"""
+    if stats:
+        data_length = stats.get("data_length") or 0
+        if data_length:
+            return float(data_length)
+        rows = stats.get("rows") or 0
+        if rows and stats.get("avg_row_length"):
+            return float(rows * stats["avg_row_length"])
+    rows = (profile or {}).get("row_count") or (stats or {}).get("rows") or 0
+    # Without byte sizes assume a nominal row width so costs stay comparable
+    return float(rows * 100)
+
+def plan_data_migration(extraction_data: Dict[str, Any], target_catalog: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Work out which tables to copy, with which columns, and what they depend on.
+
+    Tables come from the extraction bundle and must exist on the target.
+    Columns are the source columns the target table also has, in source
+    order (target order when the bundle has no column profile). Parents
+    come from the extracted relationships and the target's FKs.
+
+    Returns {"tables": [...], "skipped": [...]}, tables carrying "name",
+    "source_name", "target_name", "source_schema", "columns",
+    "target_columns", "source_types", "target_types", "rows", "cost",
+    "parents" and "priority".
+    """
+    ddl_scripts = extraction_data.get("ddl_scripts", {}) or {}
+    data_profile = extraction_data.get("data_profile", {}) or {}
+    table_stats = {
+        normalize_table_name(stats.get("table")): stats
+        for stats in (extraction_data.get("performance", {}) or {}).get("table_stats", [])
+        if stats.get("table")
+    }
+    profiles = {normalize_table_name(name): profile for name, profile in data_profile.items()}
+
+    source_tables = []
+    for table in ddl_scripts.get("tables", []):
+        if isinstance(table, dict) and table.get("name"):
+            source_tables.append((str(table["name"]), table.get("schema")))
+    if not source_tables:
+        source_tables = [(name, None) for name in data_profile]
+
+    tables = {}
+    skipped = []
+    for source_name, schema in source_tables:
+        key = normalize_table_name(source_name)
+        target = target_catalog["tables"].get(key)
+        if target is None:
+            skipped.append({"table": source_name, "reason": "missing on target"})
+            continue
+
+        profile = profiles.get(key, {})
+        profiled_types = {
+            column["name"]: column.get("column_type") or column.get("data_type")
+            for column in profile.get("columns", []) if column.get("name")
+        }
+        if profiled_types:
+            columns = [column for column in profiled_types if column.lower() in target["columns"]]
+        else:
+            columns = [column["name"] for column in target["columns"].values()]
+        if not columns:
+            skipped.append({"table": source_name, "reason": "no columns in common"})
+            continue
+
+        stats = table_stats.get(key, {})
+        tables[key] = {
+            "name": key,
+            "source_name": source_name,
+            "target_name": target["name"],
+            "source_schema": schema,
+            "columns": columns,
+            "target_columns": [target["columns"][column.lower()]["name"] for column in columns],
+            "source_types": [profiled_types.get(column) for column in columns],
+            "target_types": [target["columns"][column.lower()]["type"] for column in columns],
+            "rows": profile.get("row_count") or stats.get("rows") or 0,
+            "cost": estimate_table_cost(stats, profile),
+            "parents": set()
+        }
+
+    fk_pairs = set(target_catalog.get("foreign_keys", set()))
+    for relationship in extraction_data.get("relationships", []) or []:
+        fk_pairs.add((normalize_table_name(relationship.get("source_table")), normalize_table_name(relationship.get("target_table"))))
+    for child, parent in fk_pairs:
+        if child in tables and parent in tables and child != parent:
+            tables[child]["parents"].add(parent)
+
+    assign_priorities(tables)
+    ordered = sorted(tables.values(), key=lambda table: -table["priority"])
+    return {"tables": ordered, "skipped": skipped}
+
+def attach_target_keys(tables: List[Dict[str, Any]], target_connection, target_type: str):
+    """
+    Record each table's upsert key as "target_key".
+
+    This is the target's primary key (or a unique NOT NULL key) when every
+    key column is loaded; otherwise [] and the table is written with plain
+    INSERTs.
+    """
+    for table in tables:
+        key = get_chunk_key(target_connection, target_type, table["target_name"])
+        loaded = {column.lower() for column in table["target_columns"]}
+        columns = key["columns"] if key["kind"] in ("pk", "unique") else []
+        table["target_key"] = columns if columns and all(column.lower() in loaded for column in columns) else []
+    target_connection.commit()
+
+def assign_priorities(tables: Dict[str, Dict[str, Any]]):
+    """
+    Priority = own cost plus the longest chain of dependent work after it.
+
+    Without FKs this is plain longest-processing-time-first; with FKs,
+    parents that gate long chains start early so the chain does not end up
+    on the critical path. Parents that form a cycle fall back to own cost.
+    """
+    children = {key: [] for key in tables}
+    pending_children = {key: 0 for key in tables}
+    for key, table in tables.items():
+        for parent in table["parents"]:
+            children[parent].append(key)
+            pending_children[parent] += 1
+
+    for table in tables.values():
+        table["priority"] = table["cost"]
+
+    # Reverse topological pass: leaves first
+    ready = [key for key, count in pending_children.items() if count == 0]
+    while ready:
+        key = ready.pop()
+        table = tables[key]
+        table["priority"] = table["cost"] + max((tables[child]["priority"] for child in children[key]), default=0)
+        for parent in table["parents"]:
+            pending_children[parent] -= 1
+            if pending_children[parent] == 0:
+                ready.append(parent)
+
+def copy_table_pg_pipe(source_connection, target_connection, table: Dict[str, Any], copy_format: str = PG_COPY_FORMAT,
+                       key_columns: List[str] = None) -> int:
+    """
+    Pipe COPY ... TO STDOUT on the source into COPY ... FROM STDIN on the target.
+
+    The source side runs in a helper thread writing into an OS pipe; the
+    target reads from the other end through a fixed-size buffer, so rows
+    are never decoded into Python objects. A failure on either side rolls
+    the target back.
+
+    With key_columns the stream lands in a temporary staging table and is
+    merged with one INSERT ... SELECT ... ON CONFLICT, so rows already on
+    the target are updated instead of rejected. Tables planned for the
+    fast path (see plan_fast_load) are empty, so they skip staging and are
+    loaded with COPY ... FREEZE instead.
+    """
+    options = ["FORMAT binary"] if copy_format == "binary" else []
+    select_columns = ", ".join(quote_identifier(column, "PostgreSQL") for column in table["columns"])
+    insert_columns = ", ".join(quote_identifier(column, "PostgreSQL") for column in table["target_columns"])
+    target_sql = qualified_name(table, 'PostgreSQL', 'target')
+    copy_out = f"COPY (SELECT {select_columns} FROM {qualified_name(table, 'PostgreSQL')}) TO STDOUT" + (f" WITH ({options[0]})" if options else "")
+
+    setup_cursor = target_connection.cursor()
+    try:
+        freeze = begin_table_load(setup_cursor, table, target_sql)
+        if freeze:
+            key_columns = None
+            options = options + ["FREEZE"]
+        if key_columns:
+            staging_sql = "strata_staging"
+            setup_cursor.execute(f"CREATE TEMP TABLE {staging_sql} (LIKE {target_sql} INCLUDING DEFAULTS) ON COMMIT DROP")
+    except Exception:
+        target_connection.rollback()
+        raise
+    finally:
+        setup_cursor.close()
+    copy_in = f"COPY {staging_sql if key_columns else target_sql} ({insert_columns}) FROM STDIN" + (f" WITH ({', '.join(options)})" if options else "")
+
+    read_fd, write_fd = os.pipe()
+    reader = os.fdopen(read_fd, "rb", buffering=COPY_BUFFER_SIZE)
+    writer = os.fdopen(write_fd, "wb", buffering=COPY_BUFFER_SIZE)
+    source_error = []
+
+    def produce():
+        source_cursor = source_connection.cursor()
+        try:
+            source_cursor.copy_expert(copy_out, writer, size=COPY_BUFFER_SIZE)
+        except Exception as e:
+            source_error.append(e)
+        finally:
+            source_cursor.close()
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    producer = threading.Thread(target=produce, name=f"copy-out-{table['name']}", daemon=True)
+    producer.start()
+
+    target_cursor = target_connection.cursor()
+    try:
+        target_cursor.copy_expert(copy_in, reader, size=COPY_BUFFER_SIZE)
+        copied = target_cursor.rowcount
+    except Exception:
+        # Closing the read end unblocks the producer with a broken pipe
+        reader.close()
+        producer.join()
+        target_connection.rollback()
+        raise
+    finally:
+        target_cursor.close()
+
+    producer.join()
+    reader.close()
+    if source_error:
+        # The target only saw a truncated stream; do not keep it
+        target_connection.rollback()
+        raise source_error[0]
+    if key_columns:
+        try:
+            merge_from_staging(target_connection, target_sql, staging_sql, table["target_columns"], key_columns)
+        except Exception:
+            target_connection.rollback()
+            raise
+    target_connection.commit()
+    source_connection.commit()
+    return copied if copied is not None and copied >= 0 else 0
+
+def copy_table(source_connection, target_connection, table: Dict[str, Any], source_type: str, target_type: str,
+               manifest: Optional[RunManifest] = None) -> int:
+    """
+    Copy one table's rows from source to target. Returns the number of rows copied.
+
+    In upsert load mode, tables with a "target_key" overwrite rows that are
+    already there, so a rerun picks up where a failed one stopped. Rows the
+    target rejects are isolated into the table's dead-letter file and
+    counted in table["rejected"]; COPY piping stays all-or-nothing.
+
+    With a manifest, each chunk's row counts and content hash are recorded
+    (piped COPY never decodes rows, so it records the count only).
+    """
+    key_columns = table.get("target_key") if LOAD_MODE == "upsert" else None
+    entry, hasher = manifest.start_table(table) if manifest else (None, None)
+    if source_type == "PostgreSQL" and target_type == "PostgreSQL" and PG_COPY_FORMAT != "off":
+        copied = copy_table_pg_pipe(source_connection, target_connection, table, key_columns=key_columns)
+        if entry is not None:
+            entry["hash"] = None
+            manifest.record_chunk(entry, copied, copied, None, None)
+            manifest.finish_table(entry)
+        return copied
+
+    target_sql = qualified_name(table, target_type, 'target')
+    dead_letter = DeadLetterFile(table["name"], table["target_columns"])
+    writer = TableWriter(target_connection, target_type, target_sql,
+                         table["target_columns"], key_columns=key_columns, dead_letter=dead_letter)
+
+    # Bounded keyset chunks keep memory flat however large the table is
+    copied = 0
+    cursor = target_connection.cursor()
+    try:
+        begin_table_load(cursor, table, target_sql)
+        # Converters are compiled once per table and applied a batch at a time
+        convert = build_batch_converter(table.get("source_types") or [], table.get("target_types") or [], source_type)
+        reader = KeysetChunkReader(source_connection, source_type, table["source_name"], table["columns"], schema=table.get("source_schema"))
+        keyed = reader.key["kind"] in ("pk", "unique")
+        if entry is not None and keyed:
+            lowered = [column.lower() for column in table["columns"]]
+            if all(column.lower() in lowered for column in reader.key["columns"]):
+                entry["key"] = [table["target_columns"][lowered.index(column.lower())] for column in reader.key["columns"]]
+        for rows in reader:
+            if convert:
+                rows = convert(rows)
+            written = writer.write(rows)
+            copied += written
+            if entry is not None:
+                content_hash = None
+                if hasher:
+                    content_hash = hasher(rows)[1] - hasher(writer.rejected_rows)[1]
+                manifest.record_chunk(entry, len(rows), written, content_hash, reader.last_key if keyed else None)
+        target_connection.commit()
+        if entry is not None:
+            manifest.finish_table(entry)
+    finally:
+        cursor.close()
+        dead_letter.close()
+
+    table["rejected"] = writer.rejected
+    if writer.rejected:
+        table["dead_letter"] = dead_letter.path
+        print(f"{table['source_name']}: {writer.rejected} rows rejected after {writer.retries} batch splits, see {dead_letter.path}")
+    return copied
+
+class TableLoadScheduler:
+    """
+    Copy tables on a pool of workers, respecting FK order.
+
+    A table starts only after all of its parents have finished; among the
+    tables that are ready, the one with the highest priority starts first.
+    """
+
+    def __init__(self, tables: List[Dict[str, Any]], load_table, workers: int = DATA_WORKERS, on_table_done=None):
+        self.tables = {table["name"]: table for table in tables}
+        self.load_table = load_table
+        self.workers = max(1, workers)
+        self.on_table_done = on_table_done
+
+    def run(self) -> Dict[str, Any]:
+        waiting_on = {key: set(table["parents"]) for key, table in self.tables.items()}
+        children = {key: [] for key in self.tables}
+        for key, table in self.tables.items():
+            for parent in table["parents"]:
+                children[parent].append(key)
+
+        ready = []
+        for key, parents in waiting_on.items():
+            if not parents:
+                heapq.heappush(ready, (-self.tables[key]["priority"], key))
+
+        # FK cycles would never become ready; start the cycle member with the highest priority
+        def release_blocked():
+            if not ready and not running and waiting_on:
+                key = max(waiting_on, key=lambda name: self.tables[name]["priority"])
+                print(f"FK cycle around {key}; loading it before its parents")
+                waiting_on[key] = set()
+                heapq.heappush(ready, (-self.tables[key]["priority"], key))
+
+        timings = {}
+        start = time.perf_counter()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            release_blocked()
+            while ready or running:
+                while ready and len(running) < self.workers:
+                    _, key = heapq.heappop(ready)
+                    del waiting_on[key]
+                    timings[key] = {"started": round(time.perf_counter() - start, 3)}
+                    running[executor.submit(self.load_table, self.tables[key])] = key
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    rows = future.result()
+                    timings[key]["finished"] = round(time.perf_counter() - start, 3)
+                    timings[key]["rows"] = rows
+                    if self.on_table_done:
+                        self.on_table_done(self.tables[key], rows)
+                    for child in children[key]:
+                        if child in waiting_on:
+                            waiting_on[child].discard(key)
+                            if not waiting_on[child]:
+                                heapq.heappush(ready, (-self.tables[child]["priority"], child))
+                release_blocked()
+
+        return {"makespan_seconds": round(time.perf_counter() - start, 3), "tables": timings}
+
+def run_data_migration(tables: List[Dict[str, Any]], connect_source, connect_target, source_type: str, target_type: str,
+                       workers: int = DATA_WORKERS, on_table_done=None, manifest: Optional[RunManifest] = None) -> Dict[str, Any]:
+    """
+    Copy the planned tables in parallel, each worker thread keeping its own connections.
+
+    All source reads share one snapshot (see SourceSnapshot), so tables
+    copied on different connections are consistent with each other even
+    while the source keeps taking writes. Target connections run with the
+    fast-load session profile (see FastLoadSession) until the load ends.
+    """
+    workers = max(1, min(workers, len(tables) or 1))
+    local = threading.local()
+    targets = []
+    targets_lock = threading.Lock()
+    snapshot = open_source_snapshot(connect_source, source_type, workers)
+
+    def get_target_connection():
+        if getattr(local, "target_connection", None) is None:
+            local.target_connection = connect_target()
+            session = FastLoadSession(local.target_connection, target_type)
+            with targets_lock:
+                targets.append(session)
+            session.apply()
+        return local.target_connection
+
+    def load_table(table):
+        source_connection = snapshot.acquire()
+        target_connection = get_target_connection()
+        try:
+            snapshot.begin_table(source_connection)
+            return copy_table(source_connection, target_connection, table, source_type, target_type, manifest)
+        except Exception as e:
+            try:
+                target_connection.rollback()
+            except Exception:
+                pass
+            raise Exception(f"Failed to migrate table {table['source_name']}: {str(e)}")
+
+    try:
+        result = TableLoadScheduler(tables, load_table, workers, on_table_done).run()
+        result["snapshot"] = snapshot.mode
+        return result
+    finally:
+        snapshot.close()
+        for session in targets:
+            try:
+                session.restore()
+            except Exception as e:
+                print(f"Could not restore target session settings: {e}")
+            try:
+                session.connection.close()
+            except Exception:
+                pass
+
+def topological_table_order(tables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Tables with every parent before its children (cycle members keep their given order)"""
+    by_name = {table["name"]: table for table in tables}
+    ordered = []
+    visited = set()
+    for table in tables:
+        stack = [(table["name"], False)]
+        while stack:
+            key, expanded = stack.pop()
+            if expanded:
+                ordered.append(by_name[key])
+                continue
+            if key in visited:
+                continue
+            visited.add(key)
+            stack.append((key, True))
+            for parent in by_name[key]["parents"]:
+                if parent not in visited:
+                    stack.append((parent, False))
+    return ordered
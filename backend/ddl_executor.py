@@ -0,0 +1,265 @@
+import os
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List
+
+# Statements sent per round trip when applying DDL transactionally
+DDL_BATCH_SIZE = int(os.getenv("STRATA_DDL_BATCH_SIZE", "250"))
+
+# Target connections used to create independent objects concurrently (1 disables parallel apply)
+DDL_WORKERS = int(os.getenv("STRATA_DDL_WORKERS", "1"))
+
+CREATE_TABLE_PATTERN = re.compile(r'^\s*create\s+table(?:\s+if\s+not\s+exists)?\s+["`]?(\w+)["`]?', re.IGNORECASE)
+
+def is_already_exists_error(error) -> bool:
+    message = str(error).lower()
+    return "already exists" in message or "duplicate" in message
+
+def clean_statements(statements: List[str]) -> List[str]:
+    """Strip whitespace and trailing semicolons, dropping empty statements"""
+    cleaned = []
+    for statement in statements:
+        if statement and not statement.isspace():
+            cleaned.append(statement.strip().rstrip(';').strip())
+    return [statement for statement in cleaned if statement]
+
+class TransactionalDDLApplier:
+    """
+    Apply ordered DDL to a PostgreSQL target inside a single transaction.
+
+    Statements go to the server in large batches, one round trip each, every
+    batch wrapped in a savepoint. When a batch fails it is rolled back to its
+    savepoint and bisected until the failing statement is isolated. A CREATE
+    TABLE that fails because the table already exists is replaced by a DROP
+    and CREATE inside the same transaction; any other failure rolls back the
+    whole transaction, leaving the target exactly as it was.
+    """
+
+    def __init__(self, connection, batch_size: int = DDL_BATCH_SIZE):
+        if connection is None:
+            raise Exception("Target connection is None")
+        self.connection = connection
+        self.batch_size = max(1, batch_size)
+        self.round_trips = 0
+        self.recreated = []
+
+    def run_in_savepoint(self, cursor, statements: List[str]):
+        """Execute statements as one round trip, undoing all of them if any fails"""
+        self.round_trips += 1
+        try:
+            # Each separator starts on a new line so a statement's trailing -- comment cannot swallow it
+            cursor.execute("SAVEPOINT strata_ddl;\n" + "\n;\n".join(statements) + "\n;\nRELEASE SAVEPOINT strata_ddl")
+        except Exception:
+            self.round_trips += 1
+            cursor.execute("ROLLBACK TO SAVEPOINT strata_ddl; RELEASE SAVEPOINT strata_ddl")
+            raise
+
+    def apply_range(self, cursor, statements: List[str], offset: int):
+        """Apply statements[...] (starting at position `offset` overall), bisecting on failure"""
+        try:
+            self.run_in_savepoint(cursor, statements)
+            return
+        except Exception as e:
+            if len(statements) == 1:
+                self.handle_failed_statement(cursor, statements[0], offset, e)
+                return
+
+        middle = len(statements) // 2
+        self.apply_range(cursor, statements[:middle], offset)
+        self.apply_range(cursor, statements[middle:], offset + middle)
+
+    def handle_failed_statement(self, cursor, statement: str, position: int, error):
+        table_match = CREATE_TABLE_PATTERN.match(statement)
+        if table_match and is_already_exists_error(error):
+            table_name = table_match.group(1)
+            try:
+                self.run_in_savepoint(cursor, [f'DROP TABLE IF EXISTS "{table_name}" CASCADE', statement])
+                self.recreated.append(table_name)
+                return
+            except Exception as retry_error:
+                error = retry_error
+        raise Exception(f"DDL statement {position + 1} failed: {str(error).strip()} -- {statement[:200]}")
+
+    def apply(self, statements: List[str]) -> Dict[str, Any]:
+        """Apply all statements and commit, or roll back everything and raise"""
+        statements = clean_statements(statements)
+        start = time.perf_counter()
+        cursor = self.connection.cursor()
+
+        try:
+            for offset in range(0, len(statements), self.batch_size):
+                batch = statements[offset:offset + self.batch_size]
+                self.apply_range(cursor, batch, offset)
+                print(f"Applied DDL statements {offset + 1}-{offset + len(batch)} of {len(statements)}")
+            self.connection.commit()
+        except Exception:
+            try:
+                self.connection.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+        return {
+            "mode": "transactional",
+            "statements": len(statements),
+            "batch_size": self.batch_size,
+            "round_trips": self.round_trips,
+            "recreated": self.recreated,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+
+def apply_ddl_transactional(connection, statements: List[str], batch_size: int = DDL_BATCH_SIZE) -> Dict[str, Any]:
+    """Apply ordered DDL to a PostgreSQL target in a few transactional round trips"""
+    return TransactionalDDLApplier(connection, batch_size).apply(statements)
+
+def execute_with_recreate(connection, statement: str):
+    """Execute and commit one statement, recreating the table if it already exists"""
+    cursor = connection.cursor()
+    try:
+        try:
+            cursor.execute(statement)
+        except Exception as e:
+            table_match = CREATE_TABLE_PATTERN.match(statement)
+            if not (table_match and is_already_exists_error(e)):
+                raise
+            connection.rollback()
+            cursor.execute(f'DROP TABLE IF EXISTS "{table_match.group(1)}" CASCADE')
+            cursor.execute(statement)
+        connection.commit()
+    except Exception:
+        try:
+            connection.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+def group_ddl_statements(statements: List[str], relationships=None) -> Dict[str, Any]:
+    """
+    Split ordered DDL into the phases of a parallel apply:
+    CREATE TABLE levels, then indexes and ALTERs (independent of each other),
+    then everything else (views, routines, triggers) in its original order.
+    """
+    from backend.dependency_planner import plan_table_creation, get_table_name
+
+    tables = []
+    post_create = []
+    other = []
+    for statement in clean_statements(statements):
+        if re.match(r'CREATE\s+TABLE\b', statement, re.IGNORECASE) and get_table_name(statement):
+            tables.append({"name": get_table_name(statement), "ddl": statement})
+        elif re.match(r'(CREATE\s+(UNIQUE\s+)?INDEX|ALTER\s+TABLE)\b', statement, re.IGNORECASE):
+            post_create.append(statement)
+        else:
+            other.append(statement)
+
+    plan = plan_table_creation(tables, relationships)
+    return {
+        "levels": [[table["ddl"] for table in level] for level in plan["levels"]],
+        "post_create": plan["post_create"] + post_create,
+        "other": other
+    }
+
+class ParallelDDLApplier:
+    """
+    Apply DDL on several target connections at once.
+
+    Tables are created one dependency level at a time, each level spread
+    over the worker connections; indexes and ALTERs then run in parallel,
+    and the remaining objects run serially. Every statement commits on its
+    own, so unlike the transactional mode a failure leaves earlier objects
+    in place.
+    """
+
+    def __init__(self, connect, workers: int = DDL_WORKERS):
+        self.connect = connect
+        self.workers = max(1, workers)
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+
+    def get_connection(self):
+        """Connection owned by the current worker thread"""
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.connect()
+            self.local.connection = connection
+            with self.connections_lock:
+                self.connections.append(connection)
+        return connection
+
+    def execute(self, statement: str):
+        # Concurrent FK ALTERs lock both tables and can deadlock; the server aborts one, so retry it
+        for attempt in range(3):
+            try:
+                execute_with_recreate(self.get_connection(), statement)
+                return
+            except Exception as e:
+                if "deadlock" not in str(e).lower() or attempt == 2:
+                    raise
+                time.sleep(0.1 * (attempt + 1))
+
+    def run_phase(self, executor, statements: List[str], label: str):
+        """Run statements concurrently and raise once the phase has finished if any failed"""
+        futures = {executor.submit(self.execute, statement): statement for statement in statements}
+        failures = []
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failures.append(f"{str(e).strip()} -- {futures[future][:200]}")
+        if failures:
+            raise Exception(f"{len(failures)} DDL statements failed in {label}: " + "; ".join(failures[:5]))
+
+    def apply(self, statements: List[str], relationships=None) -> Dict[str, Any]:
+        start = time.perf_counter()
+        groups = group_ddl_statements(statements, relationships)
+        level_seconds = []
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for i, level in enumerate(groups["levels"]):
+                    level_start = time.perf_counter()
+                    self.run_phase(executor, level, f"table level {i + 1}")
+                    level_seconds.append(round(time.perf_counter() - level_start, 3))
+                    print(f"Created {len(level)} tables in level {i + 1}/{len(groups['levels'])}")
+
+                post_start = time.perf_counter()
+                self.run_phase(executor, groups["post_create"], "the index and constraint phase")
+                post_seconds = round(time.perf_counter() - post_start, 3)
+                print(f"Applied {len(groups['post_create'])} indexes and constraints")
+
+            # Views, routines and triggers may depend on each other in ways the planner cannot see
+            for statement in groups["other"]:
+                self.execute(statement)
+        finally:
+            for connection in self.connections:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+
+        return {
+            "mode": "parallel",
+            "workers": self.workers,
+            "statements": sum(len(level) for level in groups["levels"]) + len(groups["post_create"]) + len(groups["other"]),
+            "levels": len(groups["levels"]),
+            "level_seconds": level_seconds,
+            "post_create_seconds": post_seconds,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+
+def apply_ddl_parallel(connect, statements: List[str], workers: int = DDL_WORKERS, relationships=None) -> Dict[str, Any]:
+    """Apply DDL level by level on `workers` connections opened with `connect()`"""
+    return ParallelDDLApplier(connect, workers).apply(statements, relationships)
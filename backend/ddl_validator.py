@@ -0,0 +1,250 @@
+import re
+import logging
+from typing import Dict, Any, List, Optional
+
+# sqlglot dialect names for the database types the platform supports
+SQLGLOT_DIALECTS = {
+    "PostgreSQL": "postgres",
+    "MySQL": "mysql",
+    "Snowflake": "snowflake",
+    "Databricks": "databricks",
+    "Oracle": "oracle",
+    "SQL Server": "tsql",
+    "Teradata": "teradata",
+    "Google BigQuery": "bigquery"
+}
+
+DDL_KEYWORDS = ("CREATE", "ALTER", "DROP", "COMMENT", "GRANT", "REVOKE", "SET", "TRUNCATE", "RENAME")
+
+OBJECT_NAME_PATTERN = re.compile(
+    r'^\s*(?:CREATE|ALTER|DROP)\s+(?:OR\s+REPLACE\s+)?(?:UNIQUE\s+)?(?:TEMPORARY\s+|TEMP\s+)?'
+    r'(TABLE|INDEX|VIEW|MATERIALIZED\s+VIEW|SEQUENCE|TRIGGER|FUNCTION|PROCEDURE|TYPE|SCHEMA)\s+'
+    r'(?:IF\s+(?:NOT\s+)?EXISTS\s+)?([`"\[]?[\w.$]+[`"\]]?)',
+    re.IGNORECASE
+)
+
+# MySQL table options that other dialects reject after the column list
+# (anchored to the final closing parenthesis so column-level COLLATE/COMMENT are left alone)
+MYSQL_TABLE_OPTIONS_PATTERN = re.compile(
+    r'\)\s*(?:ENGINE|DEFAULT\s+CHARSET|DEFAULT\s+CHARACTER\s+SET|AUTO_INCREMENT\s*=|ROW_FORMAT)\b[^()]*$',
+    re.IGNORECASE
+)
+
+# Targets that quote identifiers with double quotes (BigQuery and Databricks use backticks like MySQL)
+DOUBLE_QUOTE_DIALECTS = {"PostgreSQL", "Oracle", "Snowflake", "SQL Server", "Teradata"}
+
+BACKTICK_LINT = (re.compile(r'`'), "MySQL backtick identifiers")
+
+# MySQL-only syntax the sqlglot readers of other dialects tolerate but the servers reject
+FOREIGN_SYNTAX_LINTS = {
+    "*": [
+        (re.compile(r'\)\s*ENGINE\s*=', re.IGNORECASE), "MySQL ENGINE table option")
+    ],
+    "PostgreSQL": [
+        (re.compile(r'\bAUTO_INCREMENT\b', re.IGNORECASE), "MySQL AUTO_INCREMENT"),
+        (re.compile(r'\bUNSIGNED\b', re.IGNORECASE), "MySQL UNSIGNED modifier"),
+        (re.compile(r'\b(DATETIME|TINYINT|MEDIUMINT|LONGTEXT|MEDIUMTEXT|LONGBLOB)\b', re.IGNORECASE), "MySQL-only data type")
+    ]
+}
+
+def lint_dialect(statement: str, target_dialect: str) -> Optional[str]:
+    """Flag syntax from another dialect that the target server would reject"""
+    if target_dialect == "MySQL":
+        return None
+    masked = mask_literals(statement)
+    lints = FOREIGN_SYNTAX_LINTS["*"] + FOREIGN_SYNTAX_LINTS.get(target_dialect, [])
+    if target_dialect in DOUBLE_QUOTE_DIALECTS:
+        lints = [BACKTICK_LINT] + lints
+    for pattern, description in lints:
+        if pattern.search(masked):
+            return f"{description} is not valid for {target_dialect}"
+    return None
+
+def get_sql_parser():
+    """Return the sqlglot module when it is installed, otherwise None"""
+    try:
+        import sqlglot
+    except ImportError:
+        return None
+    # Unsupported syntax is reported through our own result, not sqlglot's warnings
+    logging.getLogger("sqlglot").setLevel(logging.ERROR)
+    return sqlglot
+
+def get_object_name(statement: str) -> str:
+    """Best-effort '<kind> <name>' label used when reporting a statement"""
+    match = OBJECT_NAME_PATTERN.match(statement)
+    if match:
+        kind = re.sub(r'\s+', ' ', match.group(1)).upper()
+        name = match.group(2).strip('`"[]')
+        return f"{kind} {name}"
+    return statement.strip()[:60]
+
+def mask_literals(statement: str) -> str:
+    """Blank out quoted strings and comments so structural checks ignore their content"""
+    statement = re.sub(r"'(?:[^'\\]|\\.|'')*'", "''", statement)
+    statement = re.sub(r'--[^\n]*', '', statement)
+    return re.sub(r'/\*.*?\*/', '', statement, flags=re.DOTALL)
+
+def check_structure(statement: str) -> Optional[str]:
+    """Parser-free sanity check. Returns an error message or None."""
+    masked = mask_literals(statement)
+    if masked.count("'") % 2:
+        return "Unterminated string literal"
+    if not masked.strip().upper().startswith(DDL_KEYWORDS):
+        return "Statement does not start with a DDL keyword"
+
+    if re.search(r'\(\s*,|,\s*,|,\s*\)', masked):
+        return "Empty element in a parenthesized list"
+
+    depth = 0
+    for char in masked:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth < 0:
+                return "Unbalanced parentheses: unexpected ')'"
+    if depth > 0:
+        return f"Unbalanced parentheses: {depth} unclosed '('"
+    return None
+
+def parse_statement(sqlglot, statement: str, dialect: Optional[str]) -> Optional[str]:
+    """Parse one statement with sqlglot. Returns an error message or None."""
+    try:
+        expressions = sqlglot.parse(statement, read=dialect, error_level=sqlglot.ErrorLevel.RAISE)
+    except Exception as e:
+        return str(e).splitlines()[0] if str(e) else type(e).__name__
+
+    expressions = [expression for expression in expressions if expression is not None]
+    if not expressions:
+        return "Empty statement"
+    if len(expressions) > 1:
+        return f"Expected one statement, found {len(expressions)}"
+
+    expression = expressions[0]
+    if isinstance(expression, sqlglot.exp.Command):
+        # sqlglot falls back to an opaque Command for syntax it cannot parse.
+        # That is expected for triggers and routines, but not for tables, indexes or views.
+        if re.match(r'\s*(CREATE|ALTER)\s+(OR\s+REPLACE\s+)?(UNIQUE\s+)?(TABLE|INDEX|VIEW)\b', statement, re.IGNORECASE):
+            return f"Syntax not supported by the {dialect or 'generic'} dialect"
+        return None
+
+    if isinstance(expression, sqlglot.exp.Create) and isinstance(expression.this, sqlglot.exp.Schema):
+        for element in expression.this.expressions:
+            if isinstance(element, (sqlglot.exp.Identifier, sqlglot.exp.Column)):
+                return f"Column '{element.name}' has no data type"
+    return None
+
+def repair_candidates(statement: str, target_dialect: str) -> List[tuple]:
+    """Yield (description, repaired statement) pairs to try, cumulatively"""
+    candidates = []
+    current = statement
+
+    cleaned = re.sub(r'^\s*```(?:sql)?\s*|\s*```\s*$', '', current)
+    cleaned = re.sub(r'^\s*DELIMITER\s+\S+\s*$', '', cleaned, flags=re.IGNORECASE | re.MULTILINE)
+    cleaned = cleaned.strip().rstrip(';').strip()
+    if cleaned != current:
+        current = cleaned
+        candidates.append(("stripped code fences, delimiters and trailing semicolons", current))
+
+    if target_dialect in DOUBLE_QUOTE_DIALECTS and '`' in current:
+        current = current.replace('`', '"')
+        candidates.append(("replaced backtick identifiers with double quotes", current))
+
+    if target_dialect != "MySQL":
+        stripped_options = MYSQL_TABLE_OPTIONS_PATTERN.sub(')', current)
+        if stripped_options != current:
+            current = stripped_options
+            candidates.append(("removed MySQL table options", current))
+
+    if target_dialect == "PostgreSQL":
+        pg_fixed = re.sub(r'\s+UNSIGNED\b', '', current, flags=re.IGNORECASE)
+        pg_fixed = re.sub(r'\bAUTO_INCREMENT\b', 'GENERATED BY DEFAULT AS IDENTITY', pg_fixed, flags=re.IGNORECASE)
+        pg_fixed = re.sub(r'\bDATETIME\b', 'TIMESTAMP', pg_fixed, flags=re.IGNORECASE)
+        pg_fixed = re.sub(r'\bTINYINT\s*\(\s*1\s*\)', 'BOOLEAN', pg_fixed, flags=re.IGNORECASE)
+        pg_fixed = re.sub(r'\b(TINYINT|MEDIUMINT)(\s*\(\s*\d+\s*\))?', lambda m: 'SMALLINT' if m.group(1).upper() == 'TINYINT' else 'INTEGER', pg_fixed, flags=re.IGNORECASE)
+        pg_fixed = re.sub(r'\b(LONGTEXT|MEDIUMTEXT)\b', 'TEXT', pg_fixed, flags=re.IGNORECASE)
+        pg_fixed = re.sub(r'\bLONGBLOB\b', 'BYTEA', pg_fixed, flags=re.IGNORECASE)
+        pg_fixed = re.sub(r'\b(INT|INTEGER|BIGINT|SMALLINT)\s*\(\s*\d+\s*\)', r'\1', pg_fixed, flags=re.IGNORECASE)
+        if pg_fixed != current:
+            current = pg_fixed
+            candidates.append(("rewrote MySQL-only column types and attributes", current))
+
+    return candidates
+
+def validate_ddl_statement(statement: str, target_dialect: str, sqlglot=None) -> Dict[str, Any]:
+    """
+    Validate a single DDL statement for the target dialect, repairing it if a
+    known mechanical fix makes it parse.
+
+    Returns {"object", "ok", "statement", "error", "repairs"} where
+    "statement" is the (possibly repaired) text to execute.
+    """
+    dialect = SQLGLOT_DIALECTS.get(target_dialect)
+
+    def check(candidate):
+        structural_error = check_structure(candidate) or lint_dialect(candidate, target_dialect)
+        if structural_error or sqlglot is None:
+            return structural_error
+        return parse_statement(sqlglot, candidate, dialect)
+
+    result = {
+        "object": get_object_name(statement),
+        "ok": False,
+        "statement": statement,
+        "error": None,
+        "repairs": []
+    }
+
+    error = check(statement)
+    if error is None:
+        result["ok"] = True
+        return result
+
+    repairs = []
+    for description, candidate in repair_candidates(statement, target_dialect):
+        repairs.append(description)
+        if check(candidate) is None:
+            result.update(ok=True, statement=candidate, repairs=repairs)
+            return result
+
+    result["error"] = error
+    return result
+
+def validate_ddl_statements(statements: List[str], target_dialect: str) -> Dict[str, Any]:
+    """
+    Validate translated DDL offline before anything is sent to the target.
+
+    Statements are parsed with sqlglot for the target dialect when it is
+    installed; otherwise only the structural checks run. Returns the
+    statements to execute (repaired where needed) and the objects that
+    failed.
+    """
+    sqlglot = get_sql_parser()
+    valid = []
+    failures = []
+    repaired = []
+
+    for statement in statements:
+        if not statement or not statement.strip():
+            continue
+        result = validate_ddl_statement(statement, target_dialect, sqlglot)
+        if result["ok"]:
+            valid.append(result["statement"])
+            if result["repairs"]:
+                repaired.append({"object": result["object"], "repairs": result["repairs"]})
+        else:
+            failures.append({
+                "object": result["object"],
+                "error": result["error"],
+                "statement": statement.strip()[:200]
+            })
+
+    return {
+        "parser": "sqlglot" if sqlglot is not None else "structural",
+        "dialect": SQLGLOT_DIALECTS.get(target_dialect, target_dialect),
+        "checked": len(valid) + len(failures),
+        "valid": valid,
+        "repaired": repaired,
+        "failures": failures
+    }
@@ -0,0 +1,244 @@
+import re
+from typing import Dict, Any, List, Optional
+
+CREATE_TABLE_NAME_PATTERN = re.compile(
+    r'^\s*CREATE\s+(?:(?:GLOBAL\s+|LOCAL\s+)?(?:TEMPORARY|TEMP|UNLOGGED)\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?'
+    r'((?:[`"\[]?[\w$]+[`"\]]?\.)*[`"\[]?[\w$]+[`"\]]?)',
+    re.IGNORECASE
+)
+REFERENCES_PATTERN = re.compile(r'\bREFERENCES\s+((?:[`"\[]?[\w$]+[`"\]]?\.)*[`"\[]?[\w$]+[`"\]]?)', re.IGNORECASE)
+
+# Column-level "REFERENCES parent (col) [ON DELETE ...] [ON UPDATE ...]" clause
+INLINE_REFERENCE_PATTERN = re.compile(
+    r'\s+(?:CONSTRAINT\s+\S+\s+)?REFERENCES\s+(?:[`"\[]?[\w$]+[`"\]]?\.)*[`"\[]?[\w$]+[`"\]]?\s*(?:\([^)]*\))?'
+    r'(?:\s+MATCH\s+\w+)?'
+    r'(?:\s+ON\s+(?:DELETE|UPDATE)\s+(?:CASCADE|RESTRICT|SET\s+NULL|SET\s+DEFAULT|NO\s+ACTION))*'
+    r'(?:\s+(?:NOT\s+)?DEFERRABLE(?:\s+INITIALLY\s+(?:DEFERRED|IMMEDIATE))?)?',
+    re.IGNORECASE
+)
+
+def normalize_table_name(name) -> str:
+    """Lowercased, unquoted, schema-less table name used as the graph key"""
+    name = str(name or "").strip()
+    return name.split('.')[-1].strip('`"[] ').lower()
+
+def get_table_name(ddl: str) -> Optional[str]:
+    """Raw (possibly quoted/qualified) table name of a CREATE TABLE statement"""
+    match = CREATE_TABLE_NAME_PATTERN.match(ddl or "")
+    return match.group(1) if match else None
+
+def get_ddl_references(ddl: str) -> List[str]:
+    """Normalized names of the tables a CREATE TABLE statement references"""
+    return [normalize_table_name(name) for name in REFERENCES_PATTERN.findall(ddl or "")]
+
+def split_top_level(body: str) -> List[str]:
+    """Split a column list on commas that are not inside parentheses or quotes"""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, char in enumerate(body):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"', '`'):
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(body[start:i])
+            start = i + 1
+    parts.append(body[start:])
+    return parts
+
+def find_strongly_connected_components(nodes: List[str], edges: Dict[str, List[str]]) -> List[List[str]]:
+    """Iterative Tarjan's algorithm. Components come out dependencies-first."""
+    index_of = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if root in index_of:
+            continue
+        work = [(root, iter(edges.get(root, ())))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index_of:
+                    index_of[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(edges.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[child])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+def defer_foreign_keys(ddl: str, deferred_targets: set) -> tuple:
+    """
+    Remove the FK clauses that point at `deferred_targets` from a CREATE TABLE.
+
+    Returns (rewritten ddl, ALTER TABLE statements that add them back).
+    """
+    table_name = get_table_name(ddl)
+    open_paren = ddl.find('(')
+    close_paren = ddl.rfind(')')
+    if not table_name or open_paren < 0 or close_paren < open_paren:
+        return ddl, []
+
+    kept = []
+    alters = []
+    for element in split_top_level(ddl[open_paren + 1:close_paren]):
+        targets = set(get_ddl_references(element))
+        if not targets & deferred_targets:
+            kept.append(element)
+            continue
+
+        stripped = element.strip()
+        if re.match(r'(?:CONSTRAINT\s+\S+\s+)?FOREIGN\s+KEY\b', stripped, re.IGNORECASE):
+            # Table-level constraint: move it as is
+            alters.append(f"ALTER TABLE {table_name} ADD {stripped}")
+            continue
+
+        # Column-level REFERENCES: keep the column, add the FK afterwards
+        reference = INLINE_REFERENCE_PATTERN.search(element)
+        if not reference:
+            kept.append(element)
+            continue
+        column_name = stripped.split()[0]
+        kept.append(element[:reference.start()] + element[reference.end():])
+        clause = re.sub(r'^\s*(?:CONSTRAINT\s+\S+\s+)?', '', reference.group(0), flags=re.IGNORECASE)
+        alters.append(f"ALTER TABLE {table_name} ADD FOREIGN KEY ({column_name}) {clause.strip()}")
+
+    rewritten = ddl[:open_paren + 1] + ",".join(kept) + ddl[close_paren:]
+    return rewritten, alters
+
+def plan_table_creation(tables: List[Dict[str, Any]], relationships: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Plan the creation order of translated tables in O(V + E).
+
+    Edges come from the extractor's structured `relationships` plus any
+    REFERENCES clauses in the DDL itself. Cycles (strongly connected
+    components) are broken by moving the FKs that close them out of the
+    CREATE TABLE and into ALTER TABLE statements run after every table
+    exists. Tables within one level do not depend on each other and can be
+    created in parallel.
+
+    Returns {"tables", "levels", "post_create", "cycles", "deferred"} where
+    "tables" is the ordered list of table dicts (DDL rewritten where FKs
+    were deferred) and "levels" groups the same dicts by creation wave.
+    """
+    table_map = {}
+    order = []
+    for table in tables:
+        if isinstance(table, dict) and table.get("ddl"):
+            key = normalize_table_name(table.get("name") or get_table_name(table["ddl"]))
+            if key not in table_map:
+                order.append(key)
+            table_map[key] = table
+
+    # Edges point from a table to the tables it references
+    edges = {key: [] for key in order}
+    seen_edges = set()
+
+    def add_edge(source, target):
+        if source in table_map and target in table_map and source != target and (source, target) not in seen_edges:
+            seen_edges.add((source, target))
+            edges[source].append(target)
+
+    for relationship in relationships or []:
+        add_edge(normalize_table_name(relationship.get("source_table")), normalize_table_name(relationship.get("target_table")))
+    for key in order:
+        for target in get_ddl_references(table_map[key]["ddl"]):
+            add_edge(key, target)
+
+    # Break every cycle: inside a component, keep edges to tables listed earlier and defer the rest
+    position = {key: i for i, key in enumerate(order)}
+    deferred_edges = {}
+    cycles = []
+    for component in find_strongly_connected_components(order, edges):
+        if len(component) < 2:
+            continue
+        members = set(component)
+        cycles.append(sorted(component, key=position.get))
+        for source in component:
+            for target in edges[source]:
+                if target in members and position[target] > position[source]:
+                    deferred_edges.setdefault(source, set()).add(target)
+
+    planned = dict(table_map)
+    post_create = []
+    deferred = []
+    for source in order:
+        targets = deferred_edges.get(source)
+        if not targets:
+            continue
+        edges[source] = [target for target in edges[source] if target not in targets]
+        rewritten, alters = defer_foreign_keys(table_map[source]["ddl"], targets)
+        planned[source] = dict(table_map[source], ddl=rewritten)
+        post_create.extend(alters)
+        deferred.append({"table": source, "references": sorted(targets)})
+
+    # Kahn's algorithm by levels over the now acyclic graph
+    dependents = {key: [] for key in order}
+    remaining = {key: len(edges[key]) for key in order}
+    for source in order:
+        for target in edges[source]:
+            dependents[target].append(source)
+
+    levels = []
+    current = [key for key in order if remaining[key] == 0]
+    while current:
+        levels.append(current)
+        next_level = []
+        for key in current:
+            for dependent in dependents[key]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    next_level.append(dependent)
+        current = next_level
+
+    planned_count = sum(len(level) for level in levels)
+    if planned_count != len(order):
+        raise Exception(f"Dependency planning left {len(order) - planned_count} tables unordered")
+
+    if cycles:
+        print(f"Broke {len(cycles)} FK cycles by deferring {len(post_create)} constraints")
+
+    return {
+        "tables": [planned[key] for level in levels for key in level],
+        "levels": [[planned[key] for key in level] for level in levels],
+        "post_create": post_create,
+        "cycles": cycles,
+        "deferred": deferred
+    }
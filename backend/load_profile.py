@@ -0,0 +1,173 @@
+import os
+from typing import Dict, Any, List
+
+from backend.dependency_planner import normalize_table_name
+from backend.schema_diff import quote_identifier
+
+# Session tuning for bulk loads, restored afterwards ("false" disables)
+FAST_LOAD = os.getenv("STRATA_FAST_LOAD", "true").lower() != "false"
+
+MYSQL_FAST_LOAD_SETTINGS = [
+    ("unique_checks", 0),
+    ("foreign_key_checks", 0),
+    # Needs SUPER / SYSTEM_VARIABLES_ADMIN; skipped when not permitted
+    ("sql_log_bin", 0)
+]
+
+class FastLoadSession:
+    """
+    Session-level tuning on one target connection for the duration of a load.
+
+    MySQL: unique_checks, foreign_key_checks and (where permitted)
+    sql_log_bin are turned off; the checks skipped are re-run afterwards by
+    verify_skipped_constraints. PostgreSQL: synchronous_commit=off, which
+    only risks losing the last commits on a crash, and those tables are
+    reloaded by a rerun anyway. restore() puts back the previous values.
+    """
+
+    def __init__(self, connection, db_type: str, enabled: bool = FAST_LOAD):
+        self.connection = connection
+        self.db_type = db_type
+        self.enabled = enabled
+        self.previous = {}
+
+    def apply(self):
+        if not self.enabled:
+            return self
+        cursor = self.connection.cursor()
+        try:
+            if self.db_type == "MySQL":
+                for name, value in MYSQL_FAST_LOAD_SETTINGS:
+                    try:
+                        cursor.execute(f"SELECT @@SESSION.{name}")
+                        previous = cursor.fetchone()[0]
+                        cursor.execute(f"SET SESSION {name} = {value}")
+                        self.previous[name] = previous
+                    except Exception as e:
+                        print(f"Fast load: could not set {name} ({e})")
+            elif self.db_type == "PostgreSQL":
+                cursor.execute("SHOW synchronous_commit")
+                self.previous["synchronous_commit"] = cursor.fetchone()[0]
+                cursor.execute("SET synchronous_commit = off")
+                self.connection.commit()
+        finally:
+            cursor.close()
+        return self
+
+    def restore(self):
+        if not self.previous:
+            return
+        cursor = self.connection.cursor()
+        try:
+            for name, value in self.previous.items():
+                if self.db_type == "MySQL":
+                    cursor.execute(f"SET SESSION {name} = %s", (value,))
+                else:
+                    cursor.execute(f"SET {name} = %s", (value,))
+            if self.db_type == "PostgreSQL":
+                self.connection.commit()
+        finally:
+            cursor.close()
+        self.previous = {}
+
+    @property
+    def skipped_checks(self) -> List[str]:
+        return [name for name in ("unique_checks", "foreign_key_checks") if name in self.previous]
+
+def plan_fast_load(tables: List[Dict[str, Any]], target_connection, target_type: str, target_catalog: Dict[str, Any],
+                   enabled: bool = FAST_LOAD):
+    """
+    Mark which PostgreSQL tables can take the per-table fast path as table["fast_load"].
+
+    An empty table that no foreign key points at is truncated and loaded
+    with COPY ... FREEZE in the same transaction ("freeze"), which skips
+    the later hint-bit and freeze rewrites of every page.
+    """
+    for table in tables:
+        table["fast_load"] = {"freeze": False}
+    if not enabled or target_type != "PostgreSQL":
+        return
+
+    referenced = {parent for _, parent in target_catalog.get("foreign_keys", set())}
+    cursor = target_connection.cursor()
+    try:
+        for table in tables:
+            key = normalize_table_name(table["target_name"])
+            if key in referenced:
+                continue
+            cursor.execute(f"SELECT NOT EXISTS (SELECT 1 FROM {quote_identifier(table['target_name'], target_type)})")
+            if cursor.fetchone()[0]:
+                table["fast_load"] = {"freeze": True}
+        target_connection.commit()
+    finally:
+        cursor.close()
+
+def begin_table_load(cursor, table: Dict[str, Any], table_sql: str) -> bool:
+    """Per-table fast path inside the load transaction. Returns True when COPY FREEZE may be used."""
+    if not (table.get("fast_load") or {}).get("freeze"):
+        return False
+    # FREEZE needs the table created or truncated in this transaction
+    cursor.execute(f"TRUNCATE {table_sql}")
+    return True
+
+def verify_skipped_constraints(connection, db_type: str, tables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Re-check what a MySQL fast load did not: foreign keys and unique keys of the loaded tables.
+
+    Returns [{"table", "constraint", "kind", "violations"}] for every
+    constraint with violating rows; empty when everything holds.
+    """
+    if db_type != "MySQL" or not tables:
+        return []
+
+    names = [table["target_name"] for table in tables]
+    placeholders = ", ".join(["%s"] * len(names))
+    cursor = connection.cursor()
+    violations = []
+    try:
+        cursor.execute(f"""
+            SELECT TABLE_NAME, CONSTRAINT_NAME, REFERENCED_TABLE_NAME,
+                   GROUP_CONCAT(COLUMN_NAME ORDER BY ORDINAL_POSITION SEPARATOR '\\n'),
+                   GROUP_CONCAT(REFERENCED_COLUMN_NAME ORDER BY ORDINAL_POSITION SEPARATOR '\\n')
+            FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL AND TABLE_NAME IN ({placeholders})
+            GROUP BY TABLE_NAME, CONSTRAINT_NAME, REFERENCED_TABLE_NAME
+        """, names)
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"""
+            SELECT TABLE_NAME, INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX SEPARATOR '\\n')
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND NON_UNIQUE = 0 AND TABLE_NAME IN ({placeholders})
+            GROUP BY TABLE_NAME, INDEX_NAME
+        """, names)
+        unique_keys = cursor.fetchall()
+
+        for table_name, constraint, parent, columns, parent_columns in foreign_keys:
+            columns, parent_columns = str(columns).split("\n"), str(parent_columns).split("\n")
+            join = " AND ".join(f"c.{quote_identifier(a, db_type)} = p.{quote_identifier(b, db_type)}" for a, b in zip(columns, parent_columns))
+            present = " AND ".join(f"c.{quote_identifier(a, db_type)} IS NOT NULL" for a in columns)
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {quote_identifier(table_name, db_type)} c "
+                f"LEFT JOIN {quote_identifier(parent, db_type)} p ON {join} "
+                f"WHERE {present} AND p.{quote_identifier(parent_columns[0], db_type)} IS NULL"
+            )
+            count = cursor.fetchone()[0]
+            if count:
+                violations.append({"table": table_name, "constraint": constraint, "kind": "foreign_key", "violations": count})
+
+        for table_name, index_name, columns in unique_keys:
+            quoted = ", ".join(quote_identifier(column, db_type) for column in str(columns).split("\n"))
+            present = " AND ".join(f"{quote_identifier(column, db_type)} IS NOT NULL" for column in str(columns).split("\n"))
+            cursor.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM {quote_identifier(table_name, db_type)} "
+                f"WHERE {present} GROUP BY {quoted} HAVING COUNT(*) > 1) duplicates"
+            )
+            count = cursor.fetchone()[0]
+            if count:
+                violations.append({"table": table_name, "constraint": index_name, "kind": "unique", "violations": count})
+    finally:
+        cursor.close()
+
+    for violation in violations:
+        print(f"Constraint check: {violation['table']}.{violation['constraint']} ({violation['kind']}) has {violation['violations']} violations")
+    return violations
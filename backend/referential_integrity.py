@@ -0,0 +1,85 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from backend.schema_diff import quote_identifier
+
+# Child tables with more rows than this are checked on a sample (0 checks every row)
+RI_SAMPLE_THRESHOLD = int(os.getenv("STRATA_RI_SAMPLE_THRESHOLD", "5000000"))
+# Share of a sampled child table that is checked, in percent
+RI_SAMPLE_PERCENT = float(os.getenv("STRATA_RI_SAMPLE_PERCENT", "1"))
+
+# Orphaned key values reported per foreign key
+RI_EXAMPLES = 5
+
+def orphan_query(foreign_key: Dict[str, Any], db_type: str, select: str, sample_percent: Optional[float] = None) -> str:
+    """
+    Anti-join of a child table against its parent, selecting select from the orphaned child rows.
+
+    Rows whose foreign key has a NULL column reference nothing and are not
+    orphans. With sample_percent only that share of the child is read:
+    TABLESAMPLE SYSTEM on PostgreSQL, a RAND() filter on MySQL.
+    """
+    columns = [quote_identifier(column, db_type) for column in foreign_key["columns"]]
+    parent_columns = [quote_identifier(column, db_type) for column in foreign_key["parent_columns"]]
+    child = quote_identifier(foreign_key["table"], db_type)
+    if sample_percent and db_type == "PostgreSQL":
+        child += f" TABLESAMPLE SYSTEM ({float(sample_percent)})"
+    conditions = [f"c.{column} IS NOT NULL" for column in columns] + [f"p.{parent_columns[0]} IS NULL"]
+    if sample_percent and db_type == "MySQL":
+        conditions.append(f"RAND() * 100 < {float(sample_percent)}")
+    join = " AND ".join(f"c.{column} = p.{parent_column}" for column, parent_column in zip(columns, parent_columns))
+    return (
+        f"SELECT {select} FROM {child} c "
+        f"LEFT JOIN {quote_identifier(foreign_key['parent'], db_type)} p ON {join} "
+        f"WHERE {' AND '.join(conditions)}"
+    )
+
+def check_foreign_key(connection, db_type: str, foreign_key: Dict[str, Any], sample_percent: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Count the orphans of one foreign key and fetch a few of their key values.
+
+    foreign_key is {"name", "table", "columns", "parent", "parent_columns"}.
+    Returns {"orphans", "estimated", "examples"}; sampled counts are scaled
+    up to the whole table and marked estimated.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(orphan_query(foreign_key, db_type, "COUNT(*)", sample_percent))
+        orphans = int(cursor.fetchone()[0])
+        examples = []
+        if orphans:
+            selected = ", ".join(f"c.{quote_identifier(column, db_type)}" for column in foreign_key["columns"])
+            cursor.execute(orphan_query(foreign_key, db_type, f"DISTINCT {selected}", sample_percent) + f" LIMIT {RI_EXAMPLES}")
+            examples = [row[0] if len(row) == 1 else tuple(row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+    if sample_percent:
+        orphans = round(orphans * 100 / sample_percent)
+    return {"orphans": orphans, "estimated": bool(sample_percent), "examples": examples}
+
+def verify_referential_integrity(pool, db_type: str, foreign_keys: List[Dict[str, Any]], row_counts: Optional[Dict[str, int]] = None,
+                                 sample_threshold: int = RI_SAMPLE_THRESHOLD, sample_percent: float = RI_SAMPLE_PERCENT) -> List[Dict[str, Any]]:
+    """
+    Check every foreign key on the target, several at a time on pooled connections.
+
+    Child tables whose row count (row_counts, keyed by table name) exceeds
+    sample_threshold are checked on a sample. Returns one entry per
+    foreign key: the key plus "orphans", "estimated", "examples", "sampled"
+    and, when the check could not run, "error".
+    """
+    row_counts = row_counts or {}
+
+    def check(foreign_key):
+        sampled = bool(sample_threshold) and (row_counts.get(foreign_key["table"]) or 0) > sample_threshold
+        entry = dict(foreign_key, sampled=sampled, error=None)
+        try:
+            with pool.connection() as connection:
+                entry.update(check_foreign_key(connection, db_type, foreign_key, sample_percent if sampled else None))
+        except Exception as e:
+            entry["error"] = str(e)
+        return entry
+
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        return list(executor.map(check, foreign_keys))
@@ -0,0 +1,275 @@
+import datetime
+import os
+import re
+from typing import Dict, Any, List, Optional
+
+from backend.schema_diff import quote_identifier
+
+CHECKPOINT_PREFIX = "strata_checkpoint_"
+ROLLED_BACK_PREFIX = "strata_rolled_back_"
+# Table inside each checkpoint recording the foreign keys to put back on restore
+META_TABLE = "strata_checkpoint_meta"
+
+# Checkpoints kept on the target; older ones are dropped when a new one is taken
+CHECKPOINT_KEEP = int(os.getenv("STRATA_CHECKPOINT_KEEP", "3"))
+
+MYSQL_FOREIGN_KEY = re.compile(r'^\s*(CONSTRAINT\s+`[^`]+`\s+FOREIGN KEY\s.*?),?\s*$')
+
+def live_namespace(connection, db_type: str) -> str:
+    """The database (MySQL) or schema (PostgreSQL) holding the migrated tables"""
+    if db_type == "PostgreSQL":
+        return "public"
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT DATABASE()")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+def namespace_tables(cursor, db_type: str, namespace: str) -> List[str]:
+    if db_type == "PostgreSQL":
+        cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = %s ORDER BY tablename", (namespace,))
+    else:
+        cursor.execute("""
+            SELECT TABLE_NAME FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %s AND TABLE_TYPE = 'BASE TABLE'
+            ORDER BY TABLE_NAME
+        """, (namespace,))
+    return [row[0] for row in cursor.fetchall() if row[0] != META_TABLE]
+
+def stored_columns(cursor, db_type: str, namespace: str, table_name: str) -> List[str]:
+    """Columns holding data; generated columns are computed again on insert"""
+    if db_type == "PostgreSQL":
+        cursor.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = %s AND is_generated = 'NEVER'
+            ORDER BY ordinal_position
+        """, (namespace, table_name))
+    else:
+        cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND EXTRA NOT LIKE '%%GENERATED%%'
+            ORDER BY ORDINAL_POSITION
+        """, (namespace, table_name))
+    return [row[0] for row in cursor.fetchall()]
+
+def foreign_key_definitions(cursor, db_type: str, namespace: str, table_name: str) -> List[tuple]:
+    """(constraint name, definition) of a table's foreign keys, as ADD CONSTRAINT takes them"""
+    qualified = f"{quote_identifier(namespace, db_type)}.{quote_identifier(table_name, db_type)}"
+    if db_type == "PostgreSQL":
+        cursor.execute("""
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f'
+        """, (qualified,))
+        # Restore adds them NOT VALID itself
+        return [(name, f"CONSTRAINT {quote_identifier(name, db_type)} {re.sub(r' NOT VALID$', '', definition)}")
+                for name, definition in cursor.fetchall()]
+    cursor.execute(f"SHOW CREATE TABLE {qualified}")
+    definitions = []
+    for line in cursor.fetchone()[1].split("\n"):
+        match = MYSQL_FOREIGN_KEY.match(line)
+        if match:
+            definitions.append((re.search(r'`([^`]+)`', match.group(1)).group(1), match.group(1)))
+    return definitions
+
+def checkpoint_created(name: str) -> Optional[str]:
+    try:
+        return datetime.datetime.strptime(name[len(CHECKPOINT_PREFIX):], "%Y%m%d_%H%M%S").isoformat()
+    except ValueError:
+        return None
+
+def list_checkpoints(connection, db_type: str) -> List[Dict[str, Any]]:
+    """Checkpoints on the target, newest first: [{"name", "created", "tables"}]"""
+    cursor = connection.cursor()
+    try:
+        if db_type == "PostgreSQL":
+            cursor.execute("SELECT nspname FROM pg_namespace WHERE nspname LIKE %s", (CHECKPOINT_PREFIX + "%",))
+        else:
+            cursor.execute("SELECT SCHEMA_NAME FROM information_schema.SCHEMATA WHERE SCHEMA_NAME LIKE %s", (CHECKPOINT_PREFIX + "%",))
+        names = sorted((row[0] for row in cursor.fetchall()), reverse=True)
+        return [
+            {"name": name, "created": checkpoint_created(name), "tables": len(namespace_tables(cursor, db_type, name))}
+            for name in names
+        ]
+    finally:
+        cursor.close()
+
+def drop_namespace(cursor, db_type: str, name: str):
+    if db_type == "PostgreSQL":
+        cursor.execute(f"DROP SCHEMA IF EXISTS {quote_identifier(name, db_type)} CASCADE")
+    else:
+        cursor.execute(f"DROP DATABASE IF EXISTS {quote_identifier(name, db_type)}")
+
+def create_checkpoint(connection, db_type: str, keep: int = CHECKPOINT_KEEP) -> Dict[str, Any]:
+    """
+    Copy every target table into a new timestamped checkpoint schema (PostgreSQL) or database (MySQL).
+
+    The copy runs inside the server (CREATE TABLE ... LIKE, then INSERT ...
+    SELECT), so no rows travel to the client. Foreign keys, which LIKE does
+    not copy, are recorded in META_TABLE and put back on restore. On
+    PostgreSQL the checkpoint is one transaction; a failed MySQL
+    checkpoint is dropped. Returns {"name", "tables", "rows", "seconds"}.
+    """
+    started = datetime.datetime.now()
+    name = CHECKPOINT_PREFIX + started.strftime("%Y%m%d_%H%M%S")
+    live = live_namespace(connection, db_type)
+    quoted_checkpoint, quoted_live = quote_identifier(name, db_type), quote_identifier(live, db_type)
+    total_rows = 0
+
+    cursor = connection.cursor()
+    try:
+        tables = namespace_tables(cursor, db_type, live)
+        if db_type == "PostgreSQL":
+            cursor.execute(f"CREATE SCHEMA {quoted_checkpoint}")
+        else:
+            cursor.execute(f"CREATE DATABASE {quoted_checkpoint}")
+            # Rows are copied as they are; the checks already ran when they were loaded
+            cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute(f"CREATE TABLE {quoted_checkpoint}.{quote_identifier(META_TABLE, db_type)} "
+                       f"(table_name VARCHAR(255), constraint_name VARCHAR(255), definition TEXT)")
+
+        for table_name in tables:
+            table = quote_identifier(table_name, db_type)
+            columns = ", ".join(quote_identifier(column, db_type) for column in stored_columns(cursor, db_type, live, table_name))
+            if db_type == "PostgreSQL":
+                cursor.execute(f"CREATE TABLE {quoted_checkpoint}.{table} (LIKE {quoted_live}.{table} INCLUDING ALL)")
+                cursor.execute(f"INSERT INTO {quoted_checkpoint}.{table} ({columns}) OVERRIDING SYSTEM VALUE "
+                               f"SELECT {columns} FROM {quoted_live}.{table}")
+                total_rows += max(cursor.rowcount, 0)
+                # INCLUDING IDENTITY gives the copy fresh sequences; move them past the copied values
+                cursor.execute("""
+                    SELECT column_name FROM information_schema.columns
+                    WHERE table_schema = %s AND table_name = %s AND is_identity = 'YES'
+                """, (name, table_name))
+                for (column,) in cursor.fetchall():
+                    quoted_column = quote_identifier(column, db_type)
+                    cursor.execute(
+                        f"SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX({quoted_column}), 0) + 1, false) "
+                        f"FROM {quoted_checkpoint}.{table}",
+                        (f"{quoted_checkpoint}.{table}", column)
+                    )
+            else:
+                cursor.execute(f"CREATE TABLE {quoted_checkpoint}.{table} LIKE {quoted_live}.{table}")
+                cursor.execute(f"INSERT INTO {quoted_checkpoint}.{table} ({columns}) SELECT {columns} FROM {quoted_live}.{table}")
+                total_rows += max(cursor.rowcount, 0)
+            for constraint, definition in foreign_key_definitions(cursor, db_type, live, table_name):
+                cursor.execute(f"INSERT INTO {quoted_checkpoint}.{quote_identifier(META_TABLE, db_type)} VALUES (%s, %s, %s)",
+                               (table_name, constraint, definition))
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        if db_type == "MySQL":
+            try:
+                drop_namespace(cursor, db_type, name)
+            except Exception as e:
+                print(f"Could not drop incomplete checkpoint {name}: {e}")
+        raise
+    finally:
+        if db_type == "MySQL":
+            cursor.execute("SET SESSION foreign_key_checks = 1")
+        cursor.close()
+
+    for old in list_checkpoints(connection, db_type)[max(keep, 1):]:
+        delete_checkpoint(connection, db_type, old["name"])
+
+    seconds = round((datetime.datetime.now() - started).total_seconds(), 3)
+    print(f"Checkpoint {name}: {len(tables)} tables, {total_rows} rows in {seconds}s")
+    return {"name": name, "tables": len(tables), "rows": total_rows, "seconds": seconds}
+
+def restore_checkpoint(connection, db_type: str, name: str) -> Dict[str, Any]:
+    """
+    Swap a checkpoint's tables in for the live ones.
+
+    Metadata only: the live tables move to a strata_rolled_back_* schema or
+    database (kept for inspection), the checkpoint tables move into their
+    place, and the recorded foreign keys are added back (NOT VALID on
+    PostgreSQL, with foreign_key_checks off on MySQL: the data satisfied
+    them when it was checkpointed). The checkpoint is used up. Returns
+    {"restored", "tables", "rolled_back", "seconds"}.
+    """
+    if not name.startswith(CHECKPOINT_PREFIX) or name not in [checkpoint["name"] for checkpoint in list_checkpoints(connection, db_type)]:
+        raise Exception(f"Checkpoint {name} not found")
+
+    started = datetime.datetime.now()
+    live = live_namespace(connection, db_type)
+    rolled_back = ROLLED_BACK_PREFIX + started.strftime("%Y%m%d_%H%M%S")
+    quoted_checkpoint, quoted_live = quote_identifier(name, db_type), quote_identifier(live, db_type)
+    quoted_rolled_back = quote_identifier(rolled_back, db_type)
+
+    cursor = connection.cursor()
+    try:
+        tables = namespace_tables(cursor, db_type, name)
+        existing = set(namespace_tables(cursor, db_type, live))
+        cursor.execute(f"SELECT table_name, definition FROM {quoted_checkpoint}.{quote_identifier(META_TABLE, db_type)}")
+        foreign_keys = cursor.fetchall()
+
+        if db_type == "PostgreSQL":
+            # One transaction: readers see either the old tables or the restored ones
+            cursor.execute(f"CREATE SCHEMA {quoted_rolled_back}")
+            for table_name in tables:
+                table = quote_identifier(table_name, db_type)
+                if table_name in existing:
+                    cursor.execute(f"ALTER TABLE {quoted_live}.{table} SET SCHEMA {quoted_rolled_back}")
+                cursor.execute(f"ALTER TABLE {quoted_checkpoint}.{table} SET SCHEMA {quoted_live}")
+                if table_name not in existing:
+                    continue
+                # Serial defaults copied by LIKE still use the old table's sequences; bring them back along
+                for column in stored_columns(cursor, db_type, live, table_name):
+                    cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", (f"{quoted_rolled_back}.{table}", column))
+                    sequence = cursor.fetchone()[0]
+                    if not sequence:
+                        continue
+                    cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", (f"{quoted_live}.{table}", column))
+                    if cursor.fetchone()[0]:
+                        # An identity column brought its own sequence
+                        continue
+                    cursor.execute("SELECT relname FROM pg_class WHERE oid = %s::regclass", (sequence,))
+                    moved = f"{quoted_live}.{quote_identifier(cursor.fetchone()[0], db_type)}"
+                    # An owned sequence cannot change schema on its own
+                    cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+                    cursor.execute(f"ALTER SEQUENCE {sequence} SET SCHEMA {quoted_live}")
+                    cursor.execute(f"ALTER SEQUENCE {moved} OWNED BY {quoted_live}.{table}.{quote_identifier(column, db_type)}")
+            cursor.execute(f"SET LOCAL search_path TO {quoted_live}")
+            for table_name, definition in foreign_keys:
+                cursor.execute(f"ALTER TABLE {quoted_live}.{quote_identifier(table_name, db_type)} ADD {definition} NOT VALID")
+            cursor.execute(f"DROP SCHEMA {quoted_checkpoint} CASCADE")
+            connection.commit()
+        else:
+            cursor.execute(f"CREATE DATABASE {quoted_rolled_back}")
+            # A single RENAME TABLE swaps every table atomically
+            renames = []
+            for table_name in tables:
+                table = quote_identifier(table_name, db_type)
+                if table_name in existing:
+                    renames.append(f"{quoted_live}.{table} TO {quoted_rolled_back}.{table}")
+                renames.append(f"{quoted_checkpoint}.{table} TO {quoted_live}.{table}")
+            if renames:
+                cursor.execute(f"RENAME TABLE {', '.join(renames)}")
+            cursor.execute("SET SESSION foreign_key_checks = 0")
+            try:
+                for table_name, definition in foreign_keys:
+                    cursor.execute(f"ALTER TABLE {quoted_live}.{quote_identifier(table_name, db_type)} ADD {definition}")
+            finally:
+                cursor.execute("SET SESSION foreign_key_checks = 1")
+            drop_namespace(cursor, db_type, name)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    seconds = round((datetime.datetime.now() - started).total_seconds(), 3)
+    print(f"Restored checkpoint {name}: {len(tables)} tables in {seconds}s, previous tables kept in {rolled_back}")
+    return {"restored": name, "tables": len(tables), "rolled_back": rolled_back, "seconds": seconds}
+
+def delete_checkpoint(connection, db_type: str, name: str):
+    if not name.startswith(CHECKPOINT_PREFIX):
+        raise Exception(f"{name} is not a checkpoint")
+    cursor = connection.cursor()
+    try:
+        drop_namespace(cursor, db_type, name)
+        if db_type == "PostgreSQL":
+            connection.commit()
+    finally:
+        cursor.close()
@@ -540,7 +540,7 @@ def extract_mysql_ddl(connection_info):
                 
                 # Get column info for null stats
                 cursor.execute(f"""
-                    SELECT column_name, data_type, is_nullable
+                    SELECT column_name, data_type, is_nullable, column_type
                     FROM information_schema.columns 
                     WHERE table_schema = %s AND table_name = %s
                 """, (database, table))
@@ -563,6 +563,7 @@ def extract_mysql_ddl(connection_info):
                         column_stats.append({
                             "name": column_name,
                             "data_type": col_row[1],
+                            "column_type": col_row[3],
                             "nullable": col_row[2] == "YES",
                             "null_count": null_count,
                             "distinct_count": distinct_count,
@@ -572,6 +573,7 @@ def extract_mysql_ddl(connection_info):
                         column_stats.append({
                             "name": column_name,
                             "data_type": col_row[1],
+                            "column_type": col_row[3],
                             "nullable": col_row[2] == "YES",
                             "null_count": 0,
                             "distinct_count": 0,
@@ -1,11 +1,25 @@
 from fastapi import APIRouter, BackgroundTasks
 from backend.models import CommonResponse
 from backend.database import get_active_session, get_connection_by_id
+from backend.ai import suggest_fixes
+from backend.ai_client import get_ai_metrics
+from backend.chunk_reader import get_chunk_key
+from backend.data_diff import diff_table, range_checksum
+from backend.column_fingerprint import fingerprint_table
+from backend.sample_validation import sample_table, SAMPLE_TABLE_ROWS
+from backend.rollback_checkpoint import list_checkpoints, create_checkpoint, restore_checkpoint, delete_checkpoint
+from backend.referential_integrity import verify_referential_integrity, RI_SAMPLE_PERCENT
+from backend.run_manifest import load_manifest, manifest_row_counts, chunk_ranges
+from backend.validation_runner import ConnectionPool, CheckGraph
+from backend.workload_benchmark import load_workload, WorkloadGenerator, benchmark_workload
 import asyncio
+import functools
+import hashlib
 import json
 import os
 import time
 import importlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 import mysql.connector
 import psycopg2
@@ -131,56 +145,68 @@ def connect_to_database(connection_info: Dict[str, Any]):
     except Exception as e:
         raise Exception(f"Failed to connect to {db_type} database: {str(e)}")
 
-def validate_connections(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+def validate_connections(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any],
+                         source_pool: Optional[ConnectionPool] = None, target_pool: Optional[ConnectionPool] = None) -> List[Dict[str, Any]]:
     """Validate that both source and target connections are working"""
     results = []
     
-    try:
-        # Test source connection
-        source_conn = connect_to_database(source_conn_info)
-        source_conn.close()
-        results.append({
-            "category": "Source Connection",
-            "status": "Pass",
-            "errorDetails": None,
-            "suggestedFix": None,
-            "confidenceScore": 1.0
-        })
-    except Exception as e:
-        results.append({
-            "category": "Source Connection",
-            "status": "Fail",
-            "errorDetails": str(e),
-            "suggestedFix": "Check source database connection settings",
-            "confidenceScore": 0.9
-        })
-        return results  # If source fails, no point checking target
+    def check(conn_info, pool):
+        # A pooled connection stays open for the checks that follow
+        if pool is not None:
+            with pool.connection():
+                return
+        connect_to_database(conn_info).close()
     
-    try:
-        # Test target connection
-        target_conn = connect_to_database(target_conn_info)
-        target_conn.close()
-        results.append({
-            "category": "Target Connection",
-            "status": "Pass",
-            "errorDetails": None,
-            "suggestedFix": None,
-            "confidenceScore": 1.0
-        })
-    except Exception as e:
-        results.append({
-            "category": "Target Connection",
-            "status": "Fail",
-            "errorDetails": str(e),
-            "suggestedFix": "Check target database connection settings",
-            "confidenceScore": 0.9
-        })
+    # Both connections are tried at the same time
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            ("Source", executor.submit(check, source_conn_info, source_pool)),
+            ("Target", executor.submit(check, target_conn_info, target_pool))
+        ]
+        for side, future in futures:
+            try:
+                future.result()
+                results.append({
+                    "category": f"{side} Connection",
+                    "status": "Pass",
+                    "errorDetails": None,
+                    "suggestedFix": None,
+                    "confidenceScore": 1.0
+                })
+            except Exception as e:
+                results.append({
+                    "category": f"{side} Connection",
+                    "status": "Fail",
+                    "errorDetails": str(e),
+                    "suggestedFix": f"Check {side.lower()} database connection settings",
+                    "confidenceScore": 0.9
+                })
     
     return results
 
-def get_table_row_counts(connection, db_type: str, database_name: str) -> Dict[str, int]:
-    """Get row counts for all tables in the database"""
+def read_both_sides(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any], read) -> tuple:
+    """Run read(connection, db_type, database_name) against source and target at the same time"""
+    def run(conn_info):
+        connection = connect_to_database(conn_info)
+        try:
+            return read(connection, str(conn_info.get("dbType", "")), str(conn_info.get("credentials", {}).get("database", "")))
+        finally:
+            connection.close()
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        source_future = executor.submit(run, source_conn_info)
+        target_future = executor.submit(run, target_conn_info)
+        return source_future.result(), target_future.result()
+
+def read_with_pool(pool: ConnectionPool, conn_info: Dict[str, Any], read):
+    """Run read(connection, db_type, database_name) on a pooled connection"""
+    with pool.connection() as connection:
+        return read(connection, str(conn_info.get("dbType", "")), str(conn_info.get("credentials", {}).get("database", "")))
+
+def get_table_row_counts(connection, db_type: str, database_name: str, known: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Get row counts for all tables in the database (tables in known are taken from there, not counted)"""
     row_counts = {}
+    known = known or {}
     
     try:
         cursor = connection.cursor()
@@ -190,6 +216,9 @@ def get_table_row_counts(connection, db_type: str, database_name: str) -> Dict[s
             tables = cursor.fetchall()
             for table_row in tables:
                 table_name = table_row[0]
+                if table_name in known:
+                    row_counts[table_name] = known[table_name]
+                    continue
                 cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
                 count = cursor.fetchone()[0]
                 row_counts[table_name] = count
@@ -203,6 +232,9 @@ def get_table_row_counts(connection, db_type: str, database_name: str) -> Dict[s
             tables = cursor.fetchall()
             for table_row in tables:
                 table_name = table_row[0]
+                if table_name in known:
+                    row_counts[table_name] = known[table_name]
+                    continue
                 cursor.execute(f"SELECT COUNT(*) FROM \"{table_name}\"")
                 count = cursor.fetchone()[0]
                 row_counts[table_name] = count
@@ -213,25 +245,11 @@ def get_table_row_counts(connection, db_type: str, database_name: str) -> Dict[s
     
     return row_counts
 
-def validate_row_counts(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Validate row counts between source and target databases"""
+def compare_row_counts(source_counts: Dict[str, int], target_counts: Dict[str, int]) -> List[Dict[str, Any]]:
+    """Compare per-table row counts read from source and target"""
     results = []
     
     try:
-        # Connect to source database
-        source_conn = connect_to_database(source_conn_info)
-        source_db_type = str(source_conn_info.get("dbType", ""))
-        source_database = str(source_conn_info.get("credentials", {}).get("database", ""))
-        source_counts = get_table_row_counts(source_conn, source_db_type, source_database)
-        source_conn.close()
-        
-        # Connect to target database
-        target_conn = connect_to_database(target_conn_info)
-        target_db_type = str(target_conn_info.get("dbType", ""))
-        target_database = str(target_conn_info.get("credentials", {}).get("database", ""))
-        target_counts = get_table_row_counts(target_conn, target_db_type, target_database)
-        target_conn.close()
-        
         # Compare row counts
         all_tables = set(source_counts.keys()) | set(target_counts.keys())
         
@@ -270,55 +288,44 @@ def validate_row_counts(source_conn_info: Dict[str, Any], target_conn_info: Dict
     return results
 
 def get_table_schemas(connection, db_type: str, database_name: str) -> Dict[str, List[Dict[str, Any]]]:
-    """Get schema information for all tables in the database"""
+    """Get schema information for all tables in the database, in one schema-wide query"""
     schemas = {}
     
     try:
         cursor = connection.cursor()
         
         if db_type == "MySQL":
-            cursor.execute("SHOW TABLES")
-            tables = cursor.fetchall()
-            for table_row in tables:
-                table_name = table_row[0]
-                cursor.execute(f"DESCRIBE `{table_name}`")
-                columns = cursor.fetchall()
-                schemas[table_name] = [
-                    {
-                        "name": col[0],
-                        "type": col[1],
-                        "nullable": col[2] == "YES",
-                        "key": col[3],
-                        "default": col[4],
-                        "extra": col[5]
-                    }
-                    for col in columns
-                ]
+            cursor.execute("""
+                SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, EXTRA
+                FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE()
+                ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """)
+            for table_name, name, column_type, nullable, key, default, extra in cursor.fetchall():
+                schemas.setdefault(table_name, []).append({
+                    "name": name,
+                    "type": column_type,
+                    "nullable": nullable == "YES",
+                    "key": key,
+                    "default": default,
+                    "extra": extra
+                })
                 
         elif db_type == "PostgreSQL":
             cursor.execute("""
-                SELECT tablename 
-                FROM pg_tables 
-                WHERE schemaname = 'public'
+                SELECT c.table_name, c.column_name, c.data_type, c.is_nullable, c.column_default
+                FROM information_schema.columns c
+                JOIN pg_tables t ON t.schemaname = c.table_schema AND t.tablename = c.table_name
+                WHERE c.table_schema = 'public'
+                ORDER BY c.table_name, c.ordinal_position
             """)
-            tables = cursor.fetchall()
-            for table_row in tables:
-                table_name = table_row[0]
-                cursor.execute("""
-                    SELECT column_name, data_type, is_nullable, column_default
-                    FROM information_schema.columns
-                    WHERE table_name = %s AND table_schema = 'public'
-                """, (table_name,))
-                columns = cursor.fetchall()
-                schemas[table_name] = [
-                    {
-                        "name": col[0],
-                        "type": col[1],
-                        "nullable": col[2] == "YES",
-                        "default": col[3]
-                    }
-                    for col in columns
-                ]
+            for table_name, name, data_type, nullable, default in cursor.fetchall():
+                schemas.setdefault(table_name, []).append({
+                    "name": name,
+                    "type": data_type,
+                    "nullable": nullable == "YES",
+                    "default": default
+                })
                 
         cursor.close()
     except Exception as e:
@@ -326,79 +333,37 @@ def get_table_schemas(connection, db_type: str, database_name: str) -> Dict[str,
     
     return schemas
 
-def validate_table_structure(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Validate table structures between source and target databases"""
+def signature_type(type_text: str) -> str:
+    """One representative per group of equivalent types, so equivalent columns hash alike"""
+    type_text = type_text.strip().lower()
+    return min(type_text, EQUIVALENT_TYPES.get(type_text, type_text))
+
+def table_signature(columns: List[Dict[str, Any]]) -> str:
+    """Hash of a table's column names, nullability and normalized types, in column order"""
+    text = "\n".join(f"{column['name']}|{column['nullable']}|{signature_type(column['type'])}" for column in columns)
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+def compare_table_structures(source_schemas: Dict[str, List[Dict[str, Any]]], target_schemas: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Compare column lists read from source and target.
+    
+    Tables whose signature hashes match pass without a column-by-column
+    comparison; only the rest are compared in detail.
+    """
     results = []
     
     try:
-        # Connect to source database
-        source_conn = connect_to_database(source_conn_info)
-        source_db_type = str(source_conn_info.get("dbType", ""))
-        source_database = str(source_conn_info.get("credentials", {}).get("database", ""))
-        source_schemas = get_table_schemas(source_conn, source_db_type, source_database)
-        source_conn.close()
-        
-        # Connect to target database
-        target_conn = connect_to_database(target_conn_info)
-        target_db_type = str(target_conn_info.get("dbType", ""))
-        target_database = str(target_conn_info.get("credentials", {}).get("database", ""))
-        target_schemas = get_table_schemas(target_conn, target_db_type, target_database)
-        target_conn.close()
-        
-        # Compare schemas
-        all_tables = set(source_schemas.keys()) | set(target_schemas.keys())
+        source_signatures = {table: table_signature(columns) for table, columns in source_schemas.items()}
+        target_signatures = {table: table_signature(columns) for table, columns in target_schemas.items()}
         
-        for table in all_tables:
+        for table in sorted(set(source_schemas.keys()) | set(target_schemas.keys())):
             source_schema = source_schemas.get(table, [])
             target_schema = target_schemas.get(table, [])
             
             if not source_schema and not target_schema:
                 continue
-                
-            if len(source_schema) != len(target_schema):
-                results.append({
-                    "category": f"Table Structure - {table}",
-                    "status": "Fail",
-                    "errorDetails": f"Column count mismatch: Source={len(source_schema)}, Target={len(target_schema)}",
-                    "suggestedFix": "Check table schema migration",
-                    "confidenceScore": 0.8
-                })
-                continue
-                
-            # Compare column details
-            schema_match = True
-            error_details = ""
-            
-            for i, source_col in enumerate(source_schema):
-                if i >= len(target_schema):
-                    schema_match = False
-                    error_details = f"Missing column in target: {source_col['name']}"
-                    break
-                    
-                target_col = target_schema[i]
-                
-                # Check name match
-                if source_col['name'] != target_col['name']:
-                    schema_match = False
-                    error_details = f"Column name mismatch: {source_col['name']} vs {target_col['name']}"
-                    break
-                
-                # Check nullability match
-                if source_col['nullable'] != target_col['nullable']:
-                    schema_match = False
-                    error_details = f"Column nullability mismatch: {source_col['name']} (nullable={source_col['nullable']}) vs {target_col['name']} (nullable={target_col['nullable']})"
-                    break
-                
-                # Check data type equivalence (allowing for equivalent types)
-                source_type = source_col['type']
-                target_type = target_col['type']
-                
-                if not are_equivalent_types(source_type, target_type):
-                    schema_match = False
-                    error_details = f"Column type mismatch: {source_col['name']} ({source_type}) vs {target_col['name']} ({target_type})"
-                    break
             
-            if schema_match:
+            if source_schema and target_schema and source_signatures[table] == target_signatures[table]:
                 results.append({
                     "category": f"Table Structure - {table}",
                     "status": "Pass",
@@ -406,24 +371,9 @@ def validate_table_structure(source_conn_info: Dict[str, Any], target_conn_info:
                     "suggestedFix": None,
                     "confidenceScore": 1.0
                 })
-            else:
-                # For equivalent types that are just differently named, treat as warning
-                if "type mismatch" in error_details:
-                    results.append({
-                        "category": f"Table Structure - {table}",
-                        "status": "Warning",
-                        "errorDetails": error_details,
-                        "suggestedFix": "Data types are equivalent but named differently across database systems",
-                        "confidenceScore": 0.9
-                    })
-                else:
-                    results.append({
-                        "category": f"Table Structure - {table}",
-                        "status": "Fail",
-                        "errorDetails": error_details,
-                        "suggestedFix": "Review schema translation and migration",
-                        "confidenceScore": 0.7
-                    })
+                continue
+            
+            results.append(compare_table_columns(table, source_schema, target_schema))
                 
     except Exception as e:
         results.append({
@@ -436,20 +386,330 @@ def validate_table_structure(source_conn_info: Dict[str, Any], target_conn_info:
     
     return results
 
-def sample_data_comparison(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Compare sample data between source and target databases"""
-    results = []
+def compare_table_columns(table: str, source_schema: List[Dict[str, Any]], target_schema: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Column-by-column comparison of one table, reporting the first difference"""
+    if len(source_schema) != len(target_schema):
+        return {
+            "category": f"Table Structure - {table}",
+            "status": "Fail",
+            "errorDetails": f"Column count mismatch: Source={len(source_schema)}, Target={len(target_schema)}",
+            "suggestedFix": "Check table schema migration",
+            "confidenceScore": 0.8
+        }
+        
+    # Compare column details
+    schema_match = True
+    error_details = ""
     
-    try:
-        # This would implement actual data sampling in a real implementation
-        # For now, we'll add a placeholder result
-        results.append({
-            "category": "Data Sampling",
+    for source_col, target_col in zip(source_schema, target_schema):
+        # Check name match
+        if source_col['name'] != target_col['name']:
+            schema_match = False
+            error_details = f"Column name mismatch: {source_col['name']} vs {target_col['name']}"
+            break
+        
+        # Check nullability match
+        if source_col['nullable'] != target_col['nullable']:
+            schema_match = False
+            error_details = f"Column nullability mismatch: {source_col['name']} (nullable={source_col['nullable']}) vs {target_col['name']} (nullable={target_col['nullable']})"
+            break
+        
+        # Check data type equivalence (allowing for equivalent types)
+        source_type = source_col['type']
+        target_type = target_col['type']
+        
+        if not are_equivalent_types(source_type, target_type):
+            schema_match = False
+            error_details = f"Column type mismatch: {source_col['name']} ({source_type}) vs {target_col['name']} ({target_type})"
+            break
+    
+    if schema_match:
+        return {
+            "category": f"Table Structure - {table}",
             "status": "Pass",
             "errorDetails": None,
             "suggestedFix": None,
             "confidenceScore": 1.0
+        }
+    # For equivalent types that are just differently named, treat as warning
+    if "type mismatch" in error_details:
+        return {
+            "category": f"Table Structure - {table}",
+            "status": "Warning",
+            "errorDetails": error_details,
+            "suggestedFix": "Data types are equivalent but named differently across database systems",
+            "confidenceScore": 0.9
+        }
+    return {
+        "category": f"Table Structure - {table}",
+        "status": "Fail",
+        "errorDetails": error_details,
+        "suggestedFix": "Review schema translation and migration",
+        "confidenceScore": 0.7
+    }
+
+def validate_manifest_checksums(target_pool: ConnectionPool, target_db_type: str, manifest: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Check the target against the last migration run's manifest, without touching the source.
+    
+    Returns {"results": [...], "verified": {target table names whose count and hash match}}.
+    Mismatching tables are narrowed to the chunk key ranges that differ.
+    """
+    results = []
+    verified = set()
+    if not manifest:
+        return {"results": results, "verified": verified}
+    
+    for target_name, entry in sorted(manifest.get("tables", {}).items()):
+        if not entry.get("complete"):
+            continue
+        hashed = entry["hash"] is not None
+        columns = list(zip(entry["columns"], entry["categories"])) if hashed else []
+        try:
+            with target_pool.connection() as connection:
+                count, content_hash = range_checksum(connection, target_db_type, target_name, columns)
+                if count == entry["rows_written"] and (not hashed or content_hash == entry["hash"]):
+                    if hashed:
+                        verified.add(target_name)
+                    results.append({
+                        "category": f"Manifest Checksum - {target_name}",
+                        "status": "Pass",
+                        "errorDetails": None if hashed else "Row count only; this table was copied without decoding rows",
+                        "suggestedFix": None,
+                        "confidenceScore": 1.0 if hashed else 0.8
+                    })
+                    continue
+                
+                differing = []
+                for chunk in chunk_ranges(entry) if hashed else []:
+                    chunk_count, chunk_hash = range_checksum(connection, target_db_type, target_name, columns,
+                                                             entry["key"], chunk["lower"], chunk["upper"])
+                    if (chunk_count, chunk_hash) != (chunk["rows"], chunk["hash"]):
+                        differing.append(f"({chunk['lower'][0] if chunk['lower'] else 'start'}, {chunk['upper'][0] if chunk['upper'] else 'end'}]")
+            details = f"Target has {count} rows, the migration wrote {entry['rows_written']}"
+            if hashed and count == entry["rows_written"]:
+                details = f"Content hash differs from what the migration wrote ({count} rows)"
+            if differing:
+                details += f"; differing key ranges: {', '.join(differing[:5])}" + (f" and {len(differing) - 5} more" if len(differing) > 5 else "")
+            results.append({
+                "category": f"Manifest Checksum - {target_name}",
+                "status": "Fail",
+                "errorDetails": details,
+                "suggestedFix": "The target changed after migration or rows were lost; re-run data migration for this table",
+                "confidenceScore": 0.9
+            })
+        except Exception as e:
+            results.append({
+                "category": f"Manifest Checksum - {target_name}",
+                "status": "Warning",
+                "errorDetails": str(e),
+                "suggestedFix": "Check that the table still exists on the target",
+                "confidenceScore": 0.5
+            })
+    
+    return {"results": results, "verified": verified}
+
+def validate_sampled_tables(source_pool: ConnectionPool, target_pool: ConnectionPool, source_db_type: str, target_db_type: str,
+                            source_schemas: Dict[str, List[Dict[str, Any]]], target_schemas: Dict[str, List[Dict[str, Any]]],
+                            source_row_counts: Dict[str, int], skip_targets: Optional[set] = None) -> Dict[str, Any]:
+    """
+    Validate tables above SAMPLE_TABLE_ROWS source rows on a random key sample instead of a full diff.
+    
+    Returns {"results": [...], "sampled": {target table names}}; the
+    confidence score of each result is the lower 95% bound on the match rate.
+    """
+    target_tables = {name.lower(): name for name in target_schemas if name not in (skip_targets or set())}
+    pairs = [
+        (name, target_tables[name.lower()]) for name in sorted(source_schemas)
+        if name.lower() in target_tables and SAMPLE_TABLE_ROWS and (source_row_counts.get(name) or 0) > SAMPLE_TABLE_ROWS
+    ]
+    
+    def sample_one(table_name, target_name):
+        target_types = {column["name"].lower(): column["type"] for column in target_schemas[target_name]}
+        columns = [
+            {"name": column["name"], "source_type": column["type"], "target_type": target_types[column["name"].lower()]}
+            for column in source_schemas[table_name] if column["name"].lower() in target_types
+        ]
+        try:
+            with source_pool.connection() as source_conn, target_pool.connection() as target_conn:
+                key = get_chunk_key(source_conn, source_db_type, table_name)
+                if key["kind"] not in ("pk", "unique") or any(column.lower() not in target_types for column in key["columns"]):
+                    return None
+                return sample_table(source_conn, target_conn, source_db_type, target_db_type, table_name, target_name,
+                                    columns, key["columns"], source_row_counts[table_name])
+        except Exception as e:
+            return {"table": table_name, "error": str(e)}
+    
+    with ThreadPoolExecutor(max_workers=min(source_pool.size, target_pool.size)) as executor:
+        samples = list(executor.map(lambda pair: sample_one(*pair), pairs))
+    
+    results = []
+    sampled = set()
+    for (table_name, target_name), sample in zip(pairs, samples):
+        if sample is None:
+            # No key to sample by; the full diff reports the table
+            continue
+        category = f"Sampled Validation - {table_name}"
+        if sample.get("error"):
+            results.append({
+                "category": category,
+                "status": "Warning",
+                "errorDetails": sample["error"],
+                "suggestedFix": "Check that the table can be read on both sides",
+                "confidenceScore": 0.5
+            })
+            continue
+        if not sample["sampled"]:
+            # Nothing was drawn (e.g. the row count estimate is stale); leave the table to the full diff
+            results.append({
+                "category": category,
+                "status": "Warning",
+                "errorDetails": f"No rows could be sampled from {table_name}; falling back to the full data diff",
+                "suggestedFix": "Refresh the table statistics or lower STRATA_SAMPLE_TABLE_ROWS",
+                "confidenceScore": 0.5
+            })
+            continue
+        sampled.add(target_name)
+        lower, upper = sample["interval"]
+        details = (f"{sample['mismatches']} of {sample['sampled']} sampled rows differ: mismatch rate {sample['mismatch_rate']:.2%} "
+                   f"(95% CI {lower:.2%} to {upper:.2%}) over {source_row_counts[table_name]} rows")
+        if sample["missing"]:
+            details += f"; missing on target: {', '.join(str(key) for key in sample['missing'][:5])}"
+        if sample["changed"]:
+            details += "; changed: " + ", ".join(
+                f"{key} ({', '.join(columns)})" for key, columns in list(sample["changed"].items())[:5]
+            )
+        results.append({
+            "category": category,
+            "status": "Fail" if sample["mismatches"] else "Pass",
+            "errorDetails": details,
+            "suggestedFix": "Run a full data diff for this table and re-migrate the differing rows" if sample["mismatches"] else None,
+            "confidenceScore": round(1 - upper, 4)
         })
+    
+    return {"results": results, "sampled": sampled}
+
+def run_data_diff(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Checksum diff (see MerkleTableDiff) of every table present on both sides"""
+    source_pool = ConnectionPool(functools.partial(connect_to_database, source_conn_info))
+    target_pool = ConnectionPool(functools.partial(connect_to_database, target_conn_info))
+    try:
+        source_schemas, target_schemas = read_both_sides(source_conn_info, target_conn_info, get_table_schemas)
+        return diff_databases(source_pool, target_pool, str(source_conn_info.get("dbType", "")), str(target_conn_info.get("dbType", "")),
+                              source_schemas, target_schemas)
+    finally:
+        source_pool.close()
+        target_pool.close()
+
+def diff_databases(source_pool: ConnectionPool, target_pool: ConnectionPool, source_db_type: str, target_db_type: str,
+                   source_schemas: Dict[str, List[Dict[str, Any]]], target_schemas: Dict[str, List[Dict[str, Any]]],
+                   skip_targets: Optional[set] = None) -> List[Dict[str, Any]]:
+    """
+    Diff the tables both sides have, several at a time, each on its own pair of pooled connections.
+    
+    Target tables in skip_targets (already verified against the run manifest) are not diffed.
+    """
+    target_tables = {name.lower(): name for name in target_schemas if name not in (skip_targets or set())}
+    
+    def diff_one(table_name, target_name):
+        target_types = {column["name"].lower(): column["type"] for column in target_schemas[target_name]}
+        columns = [
+            {"name": column["name"], "source_type": column["type"], "target_type": target_types[column["name"].lower()]}
+            for column in source_schemas[table_name] if column["name"].lower() in target_types
+        ]
+        try:
+            with source_pool.connection() as source_conn, target_pool.connection() as target_conn:
+                key = get_chunk_key(source_conn, source_db_type, table_name)
+                key_columns = key["columns"] if all(column.lower() in target_types for column in key["columns"]) else []
+                return diff_table(source_conn, target_conn, source_db_type, target_db_type,
+                                  table_name, target_name, columns, key_columns)
+        except Exception as e:
+            return {"table": table_name, "status": "error", "reason": str(e)}
+    
+    pairs = [(name, target_tables[name.lower()]) for name in sorted(source_schemas) if name.lower() in target_tables]
+    with ThreadPoolExecutor(max_workers=min(source_pool.size, target_pool.size)) as executor:
+        return list(executor.map(lambda pair: diff_one(*pair), pairs))
+
+def validate_column_fingerprints(source_pool: ConnectionPool, target_pool: ConnectionPool, source_db_type: str, target_db_type: str,
+                                 source_schemas: Dict[str, List[Dict[str, Any]]], target_schemas: Dict[str, List[Dict[str, Any]]],
+                                 skip_targets: Optional[set] = None) -> List[Dict[str, Any]]:
+    """
+    Compare per-column aggregates (null count, min/max, sums, lengths) of every table both sides have.
+    
+    One scan per table per side, several tables at a time; catches truncation,
+    rounding and NULL handling drift that matching row counts hide. Target
+    tables in skip_targets (those validated on a sample) are not scanned.
+    """
+    target_tables = {name.lower(): name for name in target_schemas if name not in (skip_targets or set())}
+    
+    def fingerprint_one(table_name, target_name):
+        target_columns = {column["name"].lower(): column for column in target_schemas[target_name]}
+        columns = [
+            {
+                "source_name": column["name"],
+                "target_name": target_columns[column["name"].lower()]["name"],
+                "source_type": column["type"],
+                "target_type": target_columns[column["name"].lower()]["type"]
+            }
+            for column in source_schemas[table_name] if column["name"].lower() in target_columns
+        ]
+        try:
+            with source_pool.connection() as source_conn, target_pool.connection() as target_conn:
+                fingerprint = fingerprint_table(source_conn, target_conn, source_db_type, target_db_type,
+                                                table_name, target_name, columns, are_equivalent_types)
+        except Exception as e:
+            return {
+                "category": f"Column Fingerprint - {table_name}",
+                "status": "Warning",
+                "errorDetails": str(e),
+                "suggestedFix": "Check that the table can be read on both sides",
+                "confidenceScore": 0.5
+            }
+        differences = fingerprint["differences"]
+        return {
+            "category": f"Column Fingerprint - {table_name}",
+            "status": "Fail" if differences else "Pass",
+            "errorDetails": ("; ".join(differences[:10]) + (f" and {len(differences) - 10} more" if len(differences) > 10 else "")) if differences else None,
+            "suggestedFix": "Check type mappings and value conversion for the listed columns" if differences else None,
+            "confidenceScore": 0.9 if differences else 0.95
+        }
+    
+    pairs = [(name, target_tables[name.lower()]) for name in sorted(source_schemas) if name.lower() in target_tables]
+    with ThreadPoolExecutor(max_workers=min(source_pool.size, target_pool.size)) as executor:
+        return list(executor.map(lambda pair: fingerprint_one(*pair), pairs))
+
+def sample_data_comparison(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any],
+                           data_diffs: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Report example rows that differ between source and target, found by the checksum diff"""
+    results = []
+    
+    try:
+        if data_diffs is None:
+            data_diffs = run_data_diff(source_conn_info, target_conn_info)
+        
+        differing = [diff for diff in data_diffs if diff["status"] == "differs"]
+        for diff in differing:
+            examples = []
+            for label in ("missing", "extra", "changed"):
+                if diff[label]:
+                    keys = ", ".join(str(key[0] if len(key) == 1 else key) for key in diff[label][:5])
+                    examples.append(f"{label} on target: {keys}")
+            results.append({
+                "category": f"Data Sampling - {diff['table']}",
+                "status": "Fail",
+                "errorDetails": "Differing rows by key: " + "; ".join(examples),
+                "suggestedFix": "Re-run data migration for this table; in upsert mode only the differing rows are rewritten",
+                "confidenceScore": 0.9
+            })
+        
+        if not differing:
+            results.append({
+                "category": "Data Sampling",
+                "status": "Pass",
+                "errorDetails": None,
+                "suggestedFix": None,
+                "confidenceScore": 1.0
+            })
         
     except Exception as e:
         results.append({
@@ -462,20 +722,38 @@ def sample_data_comparison(source_conn_info: Dict[str, Any], target_conn_info: D
     
     return results
 
-def content_analysis(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Analyze content differences between source and target databases"""
+def content_analysis(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any],
+                     data_diffs: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Compare table contents by range checksums computed inside each database"""
     results = []
     
     try:
-        # This would implement actual content analysis in a real implementation
-        # For now, we'll add a placeholder result
-        results.append({
-            "category": "Content Analysis",
-            "status": "Pass",
-            "errorDetails": None,
-            "suggestedFix": None,
-            "confidenceScore": 1.0
-        })
+        if data_diffs is None:
+            data_diffs = run_data_diff(source_conn_info, target_conn_info)
+        
+        for diff in data_diffs:
+            if diff["status"] in ("skipped", "error"):
+                results.append({
+                    "category": f"Content Analysis - {diff['table']}",
+                    "status": "Warning",
+                    "errorDetails": f"Checksum diff not run: {diff['reason']}",
+                    "suggestedFix": "Add a primary key to compare this table row by row" if diff["status"] == "skipped" else "Check column types and permissions on both databases",
+                    "confidenceScore": 0.5
+                })
+                continue
+            
+            details = (f"{diff['source_rows']} source / {diff['target_rows']} target rows, "
+                       f"{diff['mismatched_segments']}/{diff['segments']} segments differ, "
+                       f"{len(diff['missing'])} missing, {len(diff['extra'])} extra, {len(diff['changed'])} changed"
+                       + (" (stopped early)" if diff["truncated"] else "")
+                       + f"; {diff['hashes_transferred']} hashes in {diff['seconds']}s")
+            results.append({
+                "category": f"Content Analysis - {diff['table']}",
+                "status": "Pass" if diff["status"] == "match" else "Fail",
+                "errorDetails": None if diff["status"] == "match" else details,
+                "suggestedFix": None if diff["status"] == "match" else "Re-run data migration for this table and check the dead-letter files",
+                "confidenceScore": 1.0 if diff["status"] == "match" else 0.95
+            })
         
     except Exception as e:
         results.append({
@@ -488,19 +766,142 @@ def content_analysis(source_conn_info: Dict[str, Any], target_conn_info: Dict[st
     
     return results
 
-def run_performance_benchmark(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Run performance benchmarks on both databases"""
+def load_extraction_bundle() -> Dict[str, Any]:
+    """The last extraction bundle, or an empty one when extraction has not run"""
+    if not os.path.exists("artifacts/extraction_bundle.json"):
+        return {}
+    with open("artifacts/extraction_bundle.json", "r") as f:
+        return json.load(f)
+
+def validate_referential_integrity(target_pool: ConnectionPool, target_db_type: str, target_schemas: Dict[str, List[Dict[str, Any]]],
+                                   target_row_counts: Dict[str, int]) -> List[Dict[str, Any]]:
+    """
+    Anti-join every extracted relationship on the target and report orphaned child rows.
+    
+    Needed because fast loads (see load_profile) run with FK checks off.
+    """
+    target_tables = {
+        name.lower(): {"name": name, "columns": {column["name"].lower(): column["name"] for column in columns}}
+        for name, columns in target_schemas.items()
+    }
+    
     results = []
+    foreign_keys = []
+    for relationship in load_extraction_bundle().get("relationships", []) or []:
+        child = target_tables.get(str(relationship.get("source_table") or "").lower())
+        parent = target_tables.get(str(relationship.get("target_table") or "").lower())
+        columns = relationship.get("source_columns") or []
+        parent_columns = relationship.get("target_columns") or []
+        name = relationship.get("constraint_name") or f"{relationship.get('source_table')} -> {relationship.get('target_table')}"
+        if (child is None or parent is None or not columns or len(columns) != len(parent_columns)
+                or any(column.lower() not in child["columns"] for column in columns)
+                or any(column.lower() not in parent["columns"] for column in parent_columns)):
+            results.append({
+                "category": f"Referential Integrity - {name}",
+                "status": "Warning",
+                "errorDetails": f"Cannot check: {relationship.get('source_table')} or {relationship.get('target_table')} is missing on the target or lacks the key columns",
+                "suggestedFix": "Check the table structure validation results",
+                "confidenceScore": 0.5
+            })
+            continue
+        foreign_keys.append({
+            "name": name,
+            "table": child["name"],
+            "columns": [child["columns"][column.lower()] for column in columns],
+            "parent": parent["name"],
+            "parent_columns": [parent["columns"][column.lower()] for column in parent_columns]
+        })
     
-    try:
-        # Simple benchmark - count all rows in all tables
+    if not foreign_keys and not results:
+        return [{
+            "category": "Referential Integrity",
+            "status": "Warning",
+            "errorDetails": "No relationships in the extraction bundle to check",
+            "suggestedFix": "Run extraction first",
+            "confidenceScore": 0.5
+        }]
+    
+    for checked in verify_referential_integrity(target_pool, target_db_type, foreign_keys, target_row_counts):
+        category = f"Referential Integrity - {checked['name']}"
+        if checked["error"]:
+            results.append({
+                "category": category,
+                "status": "Warning",
+                "errorDetails": checked["error"],
+                "suggestedFix": "Check that both tables can be read on the target",
+                "confidenceScore": 0.5
+            })
+            continue
+        reference = f"{checked['table']}({', '.join(checked['columns'])}) -> {checked['parent']}({', '.join(checked['parent_columns'])})"
+        sample_note = f" (estimated from a {RI_SAMPLE_PERCENT}% sample)" if checked["sampled"] else ""
+        if not checked["orphans"]:
+            results.append({
+                "category": category,
+                "status": "Pass",
+                "errorDetails": f"No orphaned rows in a {RI_SAMPLE_PERCENT}% sample of {reference}" if checked["sampled"] else None,
+                "suggestedFix": None,
+                "confidenceScore": 0.8 if checked["sampled"] else 1.0
+            })
+            continue
         results.append({
-            "category": "Performance Benchmark",
-            "status": "Pass",
-            "errorDetails": None,
-            "suggestedFix": None,
-            "confidenceScore": 1.0
+            "category": category,
+            "status": "Fail",
+            "errorDetails": f"{checked['orphans']} orphaned rows in {reference}{sample_note}; missing parent keys include {', '.join(str(example) for example in checked['examples'])}",
+            "suggestedFix": f"Migrate the missing {checked['parent']} rows or remove the orphaned {checked['table']} rows",
+            "confidenceScore": 0.85 if checked["sampled"] else 0.95
         })
+    
+    return results
+
+def run_performance_benchmark(source_pool: ConnectionPool, target_pool: ConnectionPool, source_conn_info: Dict[str, Any],
+                              target_conn_info: Dict[str, Any], target_schemas: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Replay a query workload on both databases and compare latencies per query shape.
+    
+    The workload is artifacts/benchmark_workload.json when present, otherwise
+    PK lookups, FK joins and index range scans generated from the extraction bundle.
+    """
+    results = []
+    source_db_type = str(source_conn_info.get("dbType", ""))
+    target_db_type = str(target_conn_info.get("dbType", ""))
+    
+    try:
+        shapes = load_workload()
+        if shapes is None:
+            with source_pool.connection() as connection:
+                shapes = WorkloadGenerator(connection, source_db_type, target_db_type, load_extraction_bundle(), target_schemas).generate()
+        if not shapes:
+            return [{
+                "category": "Performance Benchmark",
+                "status": "Warning",
+                "errorDetails": "No benchmark workload: no workload file and no keyed tables or indexes to generate one from",
+                "suggestedFix": "Run extraction first or provide artifacts/benchmark_workload.json",
+                "confidenceScore": 0.5
+            }]
+        
+        report = benchmark_workload(source_pool, target_pool, shapes)
+        for shape in report["shapes"]:
+            category = f"Performance Benchmark - {shape['name']}"
+            if shape["error"]:
+                results.append({
+                    "category": category,
+                    "status": "Fail",
+                    "errorDetails": shape["error"],
+                    "suggestedFix": "Check that the query runs on both databases",
+                    "confidenceScore": 0.7
+                })
+                continue
+            source, target = shape["source"], shape["target"]
+            results.append({
+                "category": category,
+                "status": "Fail" if shape["regression"] else "Pass",
+                "errorDetails": (
+                    f"p50/p95/p99 {source['p50_ms']}/{source['p95_ms']}/{source['p99_ms']} ms at {source['qps']} QPS on the source, "
+                    f"{target['p50_ms']}/{target['p95_ms']}/{target['p99_ms']} ms at {target['qps']} QPS on the target"
+                ),
+                "suggestedFix": "Check indexes and refresh statistics on the target" if shape["regression"] else None,
+                "confidenceScore": 0.8
+            })
         
     except Exception as e:
         results.append({
@@ -525,8 +926,7 @@ def automated_testing_framework(source_conn_info: Dict[str, Any], target_conn_in
             "Data Tests", 
             "Performance Tests",
             "Constraint Validation",
-            "Index Validation",
-            "Referential Integrity"
+            "Index Validation"
         ]
         
         for category in test_categories:
@@ -549,36 +949,111 @@ def automated_testing_framework(source_conn_info: Dict[str, Any], target_conn_in
     
     return results
 
-def create_rollback_checkpoint(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Create rollback checkpoint for the migration"""
+def check_rollback_checkpoint(target_pool: ConnectionPool, target_db_type: str) -> List[Dict[str, Any]]:
+    """Report whether the target has a rollback checkpoint to swap back to"""
     results = []
     
     try:
-        # This would implement actual rollback checkpoint creation in a real implementation
-        # For now, we'll add a placeholder result
-        results.append({
-            "category": "Rollback Checkpoint",
-            "status": "Pass",
-            "errorDetails": None,
-            "suggestedFix": None,
-            "confidenceScore": 1.0
-        })
+        with target_pool.connection() as connection:
+            checkpoints = list_checkpoints(connection, target_db_type)
+        if checkpoints:
+            latest = checkpoints[0]
+            results.append({
+                "category": "Rollback Checkpoint",
+                "status": "Pass",
+                "errorDetails": f"Latest checkpoint {latest['name']} ({latest['tables']} tables, taken {latest['created']}); {len(checkpoints)} kept",
+                "suggestedFix": None,
+                "confidenceScore": 1.0
+            })
+        else:
+            results.append({
+                "category": "Rollback Checkpoint",
+                "status": "Warning",
+                "errorDetails": "No rollback checkpoint on the target",
+                "suggestedFix": "Create one with POST /api/validate/checkpoints before re-running migrations",
+                "confidenceScore": 0.7
+            })
         
     except Exception as e:
         results.append({
             "category": "Rollback Checkpoint",
             "status": "Fail",
             "errorDetails": str(e),
-            "suggestedFix": "Check rollback checkpoint implementation",
+            "suggestedFix": "Check that the target user can create schemas or databases",
             "confidenceScore": 0.7
         })
     
     return results
 
+def build_validation_graph(source_conn_info: Dict[str, Any], target_conn_info: Dict[str, Any],
+                           source_pool: ConnectionPool, target_pool: ConnectionPool,
+                           manifest: Optional[Dict[str, Any]] = None) -> CheckGraph:
+    """
+    Validation as a graph of checks.
+
+    Each side's reads are separate checks on that side's pool, so the
+    source and target are read at the same time; comparisons start as soon
+    as both of their inputs are in.
+    """
+    source_db_type = str(source_conn_info.get("dbType", ""))
+    target_db_type = str(target_conn_info.get("dbType", ""))
+    graph = CheckGraph()
+    
+    # Tables the last migration run finished take their source counts from its manifest
+    source_counts_from_manifest = manifest_row_counts(manifest)
+    graph.add("source_row_counts", lambda: read_with_pool(source_pool, source_conn_info, functools.partial(
+        get_table_row_counts, known=source_counts_from_manifest
+    )))
+    graph.add("target_row_counts", lambda: read_with_pool(target_pool, target_conn_info, get_table_row_counts))
+    graph.add("source_schemas", lambda: read_with_pool(source_pool, source_conn_info, get_table_schemas))
+    graph.add("target_schemas", lambda: read_with_pool(target_pool, target_conn_info, get_table_schemas))
+    
+    graph.add("row_counts", lambda source_row_counts, target_row_counts: compare_row_counts(source_row_counts, target_row_counts),
+              ["source_row_counts", "target_row_counts"])
+    graph.add("table_structure", lambda source_schemas, target_schemas: compare_table_structures(source_schemas, target_schemas),
+              ["source_schemas", "target_schemas"])
+    graph.add("manifest_checksums", lambda: validate_manifest_checksums(target_pool, target_db_type, manifest))
+    graph.add("sampled_validation", lambda source_schemas, target_schemas, source_row_counts, manifest_checksums: validate_sampled_tables(
+        source_pool, target_pool, source_db_type, target_db_type, source_schemas, target_schemas, source_row_counts,
+        manifest_checksums["verified"]
+    ), ["source_schemas", "target_schemas", "source_row_counts", "manifest_checksums"])
+    graph.add("data_diff", lambda source_schemas, target_schemas, manifest_checksums, sampled_validation: diff_databases(
+        source_pool, target_pool, source_db_type, target_db_type, source_schemas, target_schemas,
+        manifest_checksums["verified"] | sampled_validation["sampled"]
+    ), ["source_schemas", "target_schemas", "manifest_checksums", "sampled_validation"])
+    graph.add("column_fingerprints", lambda source_schemas, target_schemas, sampled_validation: validate_column_fingerprints(
+        source_pool, target_pool, source_db_type, target_db_type, source_schemas, target_schemas, sampled_validation["sampled"]
+    ), ["source_schemas", "target_schemas", "sampled_validation"])
+    graph.add("data_sampling", lambda data_diff: sample_data_comparison(source_conn_info, target_conn_info, data_diff), ["data_diff"])
+    graph.add("content_analysis", lambda data_diff: content_analysis(source_conn_info, target_conn_info, data_diff), ["data_diff"])
+    
+    graph.add("referential_integrity", lambda target_schemas, target_row_counts: validate_referential_integrity(
+        target_pool, target_db_type, target_schemas, target_row_counts
+    ), ["target_schemas", "target_row_counts"])
+    graph.add("automated_tests", lambda: automated_testing_framework(source_conn_info, target_conn_info))
+    graph.add("rollback_checkpoint", lambda: check_rollback_checkpoint(target_pool, target_db_type))
+    return graph
+
+# Checks whose results go into the report, in report order
+REPORTED_CHECKS = [
+    ("row_counts", "Row Count Validation"),
+    ("table_structure", "Table Structure Validation"),
+    ("manifest_checksums", "Manifest Checksums"),
+    ("sampled_validation", "Sampled Validation"),
+    ("column_fingerprints", "Column Fingerprints"),
+    ("data_sampling", "Data Sampling"),
+    ("content_analysis", "Content Analysis"),
+    ("referential_integrity", "Referential Integrity"),
+    ("automated_tests", "Automated Testing Framework"),
+    ("rollback_checkpoint", "Rollback Checkpoint")
+]
+
 def run_comprehensive_validation():
     """Run comprehensive validation including all features"""
     global validation_status
     results = []
+    source_pool = None
+    target_pool = None
     
     try:
         # Get active session
@@ -593,10 +1068,13 @@ def run_comprehensive_validation():
         if not source_conn_info or not target_conn_info:
             raise Exception("Failed to retrieve connection details")
         
+        source_pool = ConnectionPool(functools.partial(connect_to_database, source_conn_info))
+        target_pool = ConnectionPool(functools.partial(connect_to_database, target_conn_info))
+        
         # Phase 1: Connection validation (5%)
         validation_status["phase"] = "Validating database connections"
         validation_status["percent"] = 5
-        connection_results = validate_connections(source_conn_info, target_conn_info)
+        connection_results = validate_connections(source_conn_info, target_conn_info, source_pool, target_pool)
         results.extend(connection_results)
         
         # Check if connections are valid before proceeding
@@ -604,51 +1082,64 @@ def run_comprehensive_validation():
         if connection_failed:
             return results
         
-        # Phase 2: Row count validation (15%)
-        validation_status["phase"] = "Validating row counts"
-        validation_status["percent"] = 15
-        row_count_results = validate_row_counts(source_conn_info, target_conn_info)
-        results.extend(row_count_results)
-        
-        # Phase 3: Table structure validation (30%)
-        validation_status["phase"] = "Validating table structures"
-        validation_status["percent"] = 30
-        structure_results = validate_table_structure(source_conn_info, target_conn_info)
-        results.extend(structure_results)
-        
-        # Phase 4: Data sampling (40%)
-        validation_status["phase"] = "Comparing sample data"
-        validation_status["percent"] = 40
-        sampling_results = sample_data_comparison(source_conn_info, target_conn_info)
-        results.extend(sampling_results)
-        
-        # Phase 5: Content analysis (50%)
-        validation_status["phase"] = "Analyzing content differences"
-        validation_status["percent"] = 50
-        content_results = content_analysis(source_conn_info, target_conn_info)
-        results.extend(content_results)
-        
-        # Phase 6: Automated testing framework (70%)
-        validation_status["phase"] = "Running automated tests"
-        validation_status["percent"] = 70
-        testing_results = automated_testing_framework(source_conn_info, target_conn_info)
-        results.extend(testing_results)
-        
-        # Phase 7: Performance metrics (85%)
-        validation_status["phase"] = "Performance benchmarking"
-        validation_status["percent"] = 85
-        performance_results = run_performance_benchmark(source_conn_info, target_conn_info)
-        results.extend(performance_results)
+        # Phase 2: Every check, as soon as its inputs are ready (5-85%)
+        validation_status["phase"] = "Running validation checks"
+        
+        def on_check_done(name, done, total):
+            validation_status["percent"] = 5 + int(done / total * 80)
+            validation_status["phase"] = f"Finished {name.replace('_', ' ')} ({done}/{total})"
+        
+        manifest = load_manifest(session["source"].get("id"), session["target"].get("id"))
+        if manifest:
+            print(f"Using run manifest from {manifest.get('finished')} for {len(manifest.get('tables', {}))} tables")
+        graph = build_validation_graph(source_conn_info, target_conn_info, source_pool, target_pool, manifest)
+        outcome = graph.run(workers=len(graph.checks), on_check_done=on_check_done)
+        
+        for name, category in REPORTED_CHECKS:
+            if name in ("manifest_checksums", "sampled_validation") and name in outcome["results"]:
+                results.extend(outcome["results"][name]["results"])
+            elif name in outcome["results"]:
+                results.extend(outcome["results"][name])
+            else:
+                results.append({
+                    "category": category,
+                    "status": "Fail",
+                    "errorDetails": outcome["errors"].get(name),
+                    "suggestedFix": "Check database connections and permissions",
+                    "confidenceScore": 0.6
+                })
+        if "data_diff" in outcome["results"]:
+            validation_status["data_diff"] = outcome["results"]["data_diff"]
         
-        # Phase 8: Rollback checkpoint creation (95%)
-        validation_status["phase"] = "Creating rollback checkpoint"
-        validation_status["percent"] = 95
-        checkpoint_results = create_rollback_checkpoint(source_conn_info, target_conn_info)
-        results.extend(checkpoint_results)
+        # Phase 3: Workload benchmark (85-95%), alone so other checks do not skew its latencies
+        validation_status["phase"] = "Benchmarking query workload"
+        validation_status["percent"] = 85
+        if "target_schemas" in outcome["results"]:
+            results.extend(run_performance_benchmark(source_pool, target_pool, source_conn_info, target_conn_info,
+                                                     outcome["results"]["target_schemas"]))
+        else:
+            results.append({
+                "category": "Performance Benchmark",
+                "status": "Fail",
+                "errorDetails": outcome["errors"].get("target_schemas"),
+                "suggestedFix": "Check database connections and permissions",
+                "confidenceScore": 0.6
+            })
         
-        # Phase 9: Generating report (100%)
+        # Phase 4: Generating report (100%)
         validation_status["phase"] = "Generating validation report"
         validation_status["percent"] = 100
+        timings = outcome["timings"]
+        validation_status["timings"] = timings
+        breakdown = ", ".join(f"{name} {timing['seconds']}s" for name, timing in sorted(
+            timings["checks"].items(), key=lambda item: -item[1]["seconds"]))
+        results.append({
+            "category": "Validation Timing",
+            "status": "Pass",
+            "errorDetails": f"{timings['wall_seconds']}s wall time for {timings['check_seconds']}s of checks: {breakdown}",
+            "suggestedFix": None,
+            "confidenceScore": 1.0
+        })
         
     except Exception as e:
         results.append({
@@ -658,6 +1149,10 @@ def run_comprehensive_validation():
             "suggestedFix": "Check validation process implementation",
             "confidenceScore": 0.5
         })
+    finally:
+        for pool in (source_pool, target_pool):
+            if pool is not None:
+                pool.close()
     
     return results
 
@@ -706,7 +1201,73 @@ async def run_validation(background_tasks: BackgroundTasks):
 @router.get("/status")
 async def get_validation_status():
     global validation_status
-    return validation_status
+    return {**validation_status, "ai_metrics": get_ai_metrics()}
+
+@router.post("/fixes")
+async def suggest_validation_fixes():
+    """Generate AI fix suggestions for the failed and warning checks of the last report"""
+    if not os.path.exists("artifacts/validation_report.json"):
+        return {"error": "No validation report found"}
+    
+    with open("artifacts/validation_report.json", "r") as f:
+        results = json.load(f)
+    
+    failures = [result for result in results if result.get("status") in ("Fail", "Warning")]
+    
+    # Batches run on the pooled AI client; keep the event loop free meanwhile
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, suggest_fixes, {"failures": failures})
+
+def run_on_target(action):
+    """Run action(connection, db_type) on a fresh connection to the session's target"""
+    session = get_active_session()
+    if not session.get("target"):
+        raise Exception("Target connection not set")
+    target_conn_info = get_connection_by_id(session["target"]["id"])
+    if not target_conn_info:
+        raise Exception("Failed to retrieve connection details")
+    connection = connect_to_database(target_conn_info)
+    try:
+        return action(connection, str(target_conn_info.get("dbType", "")))
+    finally:
+        connection.close()
+
+@router.get("/checkpoints")
+async def get_rollback_checkpoints():
+    """Rollback checkpoints on the target, newest first"""
+    loop = asyncio.get_event_loop()
+    try:
+        return {"checkpoints": await loop.run_in_executor(None, run_on_target, list_checkpoints)}
+    except Exception as e:
+        return {"error": str(e)}
+
+@router.post("/checkpoints")
+async def create_rollback_checkpoint():
+    """Copy the target's tables into a new checkpoint"""
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(None, run_on_target, create_checkpoint)
+    except Exception as e:
+        return {"error": str(e)}
+
+@router.post("/checkpoints/{name}/restore")
+async def restore_rollback_checkpoint(name: str):
+    """Swap a checkpoint's tables back in for the target's current ones"""
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(None, run_on_target, lambda connection, db_type: restore_checkpoint(connection, db_type, name))
+    except Exception as e:
+        return {"error": str(e)}
+
+@router.delete("/checkpoints/{name}")
+async def delete_rollback_checkpoint(name: str):
+    """Drop a checkpoint that is no longer needed"""
+    loop = asyncio.get_event_loop()
+    try:
+        await loop.run_in_executor(None, run_on_target, lambda connection, db_type: delete_checkpoint(connection, db_type, name))
+        return CommonResponse(ok=True, message=f"Checkpoint {name} deleted")
+    except Exception as e:
+        return CommonResponse(ok=False, message=str(e))
 
 @router.get("/report")
 async def get_validation_report():
@@ -0,0 +1,119 @@
+import datetime
+import json
+import os
+import threading
+from typing import Dict, Any, List, Optional
+
+from backend.data_diff import column_category, build_row_hasher
+
+MANIFEST_PATH = os.path.join("artifacts", "run_manifest.json")
+
+# Hash rows while copying so validation can skip rescanning the source ("false" disables)
+RUN_MANIFEST = os.getenv("STRATA_RUN_MANIFEST", "true").lower() != "false"
+
+class RunManifest:
+    """
+    What a data migration run read and wrote, per table and per chunk.
+
+    Each table records the rows read from the source, the rows rejected,
+    and, when every column type allows it, the content hash of the rows
+    written: the same SUM of 60-bit row hashes the validation checksum diff
+    computes inside the database (see row_hash_number_sql). Chunks carry
+    their upper key, so a mismatch can be narrowed to key ranges on the
+    target alone.
+    """
+
+    def __init__(self, source: Dict[str, Any], target: Dict[str, Any], path: str = MANIFEST_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {
+            "started": datetime.datetime.now().isoformat(),
+            "finished": None,
+            "source": {"id": source.get("id"), "dbType": source.get("dbType")},
+            "target": {"id": target.get("id"), "dbType": target.get("dbType")},
+            "tables": {}
+        }
+
+    def start_table(self, table: Dict[str, Any]):
+        """Hasher for the table's rows (None when they cannot be hashed) and an empty entry"""
+        categories = [column_category(type_text) for type_text in table.get("target_types") or []]
+        hasher = build_row_hasher(categories) if categories else None
+        entry = {
+            "source_name": table["source_name"],
+            "target_name": table["target_name"],
+            "columns": table["target_columns"],
+            "categories": categories,
+            "key": None,
+            "rows_read": 0,
+            "rows_written": 0,
+            "rejected": 0,
+            "hash": 0 if hasher else None,
+            "chunks": [],
+            "complete": False
+        }
+        with self.lock:
+            self.data["tables"][table["target_name"]] = entry
+        return entry, hasher
+
+    def record_chunk(self, entry: Dict[str, Any], rows_read: int, rows_written: int, content_hash: Optional[int], upper: Optional[tuple]):
+        with self.lock:
+            entry["rows_read"] += rows_read
+            entry["rows_written"] += rows_written
+            entry["rejected"] += rows_read - rows_written
+            if entry["hash"] is not None and content_hash is not None:
+                entry["hash"] += content_hash
+            entry["chunks"].append({
+                "rows": rows_written,
+                "hash": content_hash,
+                "upper": list(upper) if upper is not None else None
+            })
+
+    def finish_table(self, entry: Dict[str, Any]):
+        with self.lock:
+            entry["complete"] = True
+
+    def save(self):
+        with self.lock:
+            self.data["finished"] = datetime.datetime.now().isoformat()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w") as f:
+                json.dump(self.data, f, indent=2, default=str)
+
+def load_manifest(source_id=None, target_id=None, path: str = MANIFEST_PATH) -> Optional[Dict[str, Any]]:
+    """The last run manifest, if it was written for this source and target"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except Exception as e:
+        print(f"Could not read run manifest: {e}")
+        return None
+    if source_id is not None and manifest.get("source", {}).get("id") != source_id:
+        return None
+    if target_id is not None and manifest.get("target", {}).get("id") != target_id:
+        return None
+    return manifest
+
+def manifest_row_counts(manifest: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Source row counts of the tables the run finished, keyed by source table name"""
+    if not manifest:
+        return {}
+    return {
+        entry["source_name"]: entry["rows_read"]
+        for entry in manifest.get("tables", {}).values()
+        if entry.get("complete")
+    }
+
+def chunk_ranges(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Chunks as (lower, upper] key ranges; empty when the table was not read by key"""
+    if not entry.get("key") or any(chunk["upper"] is None for chunk in entry["chunks"]):
+        return []
+    ranges = []
+    lower = None
+    for index, chunk in enumerate(entry["chunks"]):
+        # The last chunk runs to the end of the table
+        upper = tuple(chunk["upper"]) if index < len(entry["chunks"]) - 1 else None
+        ranges.append({"lower": lower, "upper": upper, "rows": chunk["rows"], "hash": chunk["hash"]})
+        lower = upper
+    return ranges
@@ -0,0 +1,140 @@
+import math
+import os
+import random
+from typing import Dict, Any, List, Optional, Tuple
+
+from backend.schema_diff import quote_identifier
+from backend.data_diff import column_category, normalized_value_sql, execute
+
+# Tables with more source rows are validated on a random key sample instead of a full diff (0 = always diff fully)
+SAMPLE_TABLE_ROWS = int(os.getenv("STRATA_SAMPLE_TABLE_ROWS", "10000000"))
+# Keys sampled per table
+SAMPLE_KEYS = int(os.getenv("STRATA_SAMPLE_KEYS", "1000"))
+
+# Keys per IN-list lookup
+LOOKUP_BATCH = 500
+# Integer keys spanning more values per row than this are sampled with RAND() instead of probes
+PROBE_MAX_SPAN = 4
+# Two-sided 95% confidence
+Z_95 = 1.96
+
+INTEGER_KEY_TYPES = ("int", "bigint", "smallint", "tinyint", "mediumint", "integer", "serial", "bigserial")
+
+def wilson_interval(failures: int, trials: int, z: float = Z_95) -> Tuple[float, float]:
+    """Wilson score interval for a proportion; stays inside [0, 1] even with no failures"""
+    if trials <= 0:
+        return 0.0, 1.0
+    proportion = failures / trials
+    denominator = 1 + z * z / trials
+    center = (proportion + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(proportion * (1 - proportion) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def fetch_all(connection, query: str, parameters: tuple = ()) -> List[tuple]:
+    cursor = connection.cursor()
+    try:
+        execute(cursor, query, parameters)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+def sample_keys(connection, db_type: str, table_name: str, key_columns: List[str], key_type: Optional[str],
+                row_count: int, sample_size: int = SAMPLE_KEYS) -> List[tuple]:
+    """
+    Up to sample_size random keys of a table.
+
+    PostgreSQL draws a TABLESAMPLE BERNOULLI share of the rows sized for
+    twice the sample; unlike SYSTEM, which takes whole pages, rows are
+    picked independently, as the Wilson interval assumes. On MySQL a single
+    integer key that is dense enough (see PROBE_MAX_SPAN) is sampled by
+    probing distinct random values between its MIN and MAX with batched
+    IN-lists, so every row is equally likely; other keys fall back to a
+    RAND() filter over a scan of the key.
+    """
+    table = quote_identifier(table_name, db_type)
+    keys = ", ".join(quote_identifier(column, db_type) for column in key_columns)
+    fraction = min(1.0, 2.0 * sample_size / max(row_count, 1))
+
+    if db_type == "PostgreSQL":
+        rows = fetch_all(connection, f"SELECT {keys} FROM {table} TABLESAMPLE BERNOULLI ({fraction * 100}) ORDER BY random() LIMIT {int(sample_size)}")
+        return [tuple(row) for row in rows]
+
+    if len(key_columns) == 1 and (key_type or "").lower().startswith(INTEGER_KEY_TYPES):
+        lowest, highest = fetch_all(connection, f"SELECT MIN({keys}), MAX({keys}) FROM {table}")[0]
+        if lowest is None:
+            return []
+        span = int(highest) - int(lowest) + 1
+        if span <= PROBE_MAX_SPAN * max(row_count, 1):
+            # A quarter more probes than the expected hits, so a slightly stale row count still fills the sample
+            probes = random.sample(range(int(lowest), int(highest) + 1),
+                                   min(span, math.ceil(1.25 * sample_size * span / max(row_count, 1))))
+            found = []
+            for start in range(0, len(probes), LOOKUP_BATCH):
+                batch = probes[start:start + LOOKUP_BATCH]
+                found += [tuple(row) for row in fetch_all(
+                    connection, f"SELECT {keys} FROM {table} WHERE {keys} IN ({', '.join(['%s'] * len(batch))})", tuple(batch)
+                )]
+            return random.sample(found, min(sample_size, len(found)))
+
+    rows = [tuple(row) for row in fetch_all(connection, f"SELECT {keys} FROM {table} WHERE RAND() < %s", (fraction,))]
+    return random.sample(rows, min(sample_size, len(rows)))
+
+def lookup_rows(connection, db_type: str, table_name: str, key_columns: List[str], columns: List[Tuple[str, str]],
+                keys: List[tuple]) -> Dict[tuple, tuple]:
+    """Normalized column values of the rows with the given keys, in batched IN-list lookups, keyed by key text"""
+    table = quote_identifier(table_name, db_type)
+    key_list = ", ".join(quote_identifier(column, db_type) for column in key_columns)
+    values = ", ".join(normalized_value_sql(column, category, db_type) for column, category in columns)
+    width = len(key_columns)
+    rows = {}
+    for start in range(0, len(keys), LOOKUP_BATCH):
+        batch = keys[start:start + LOOKUP_BATCH]
+        if width == 1:
+            condition = f"{key_list} IN ({', '.join(['%s'] * len(batch))})"
+        else:
+            condition = f"({key_list}) IN ({', '.join(['(' + ', '.join(['%s'] * width) + ')'] * len(batch))})"
+        parameters = tuple(value for key in batch for value in key)
+        for row in fetch_all(connection, f"SELECT {key_list}, {values} FROM {table} WHERE {condition}", parameters):
+            rows[tuple(str(value) for value in row[:width])] = tuple(row[width:])
+    return rows
+
+def sample_table(source_connection, target_connection, source_type: str, target_type: str, table_name: str,
+                 target_table_name: str, columns: List[Dict[str, str]], key_columns: List[str], row_count: int,
+                 sample_size: int = SAMPLE_KEYS) -> Dict[str, Any]:
+    """
+    Compare a random sample of a table's rows on both sides.
+
+    columns are {"name", "source_type", "target_type"}, as for diff_table.
+    Values are compared in the normalized text form the checksum diff
+    hashes. Returns {"table", "sampled", "mismatches", "mismatch_rate",
+    "interval", "missing", "changed"}, interval being the 95% Wilson bounds
+    on the table-wide mismatch rate.
+    """
+    key_type = next((column["source_type"] for column in columns if column["name"].lower() == key_columns[0].lower()), None)
+    keys = sample_keys(source_connection, source_type, table_name, key_columns, key_type, row_count, sample_size)
+    source_rows = lookup_rows(source_connection, source_type, table_name, key_columns,
+                              [(column["name"], column_category(column["source_type"])) for column in columns], keys)
+    target_rows = lookup_rows(target_connection, target_type, target_table_name, key_columns,
+                              [(column["name"], column_category(column["target_type"])) for column in columns], keys)
+
+    missing, changed = [], {}
+    for key, values in source_rows.items():
+        if key not in target_rows:
+            missing.append(key)
+            continue
+        differing = [column["name"] for column, source_value, target_value in zip(columns, values, target_rows[key])
+                     if source_value != target_value]
+        if differing:
+            changed[key] = differing
+
+    sampled = len(source_rows)
+    mismatches = len(missing) + len(changed)
+    return {
+        "table": table_name,
+        "sampled": sampled,
+        "mismatches": mismatches,
+        "mismatch_rate": mismatches / sampled if sampled else 0.0,
+        "interval": wilson_interval(mismatches, sampled),
+        "missing": missing,
+        "changed": changed
+    }
@@ -0,0 +1,327 @@
+import re
+from typing import Dict, Any, List, Optional
+
+from backend.dependency_planner import get_table_name, normalize_table_name, split_top_level, get_ddl_references
+
+# Words that end the data type part of a column definition
+COLUMN_CONSTRAINT_WORDS = {
+    "NOT", "NULL", "DEFAULT", "PRIMARY", "UNIQUE", "REFERENCES", "CHECK", "CONSTRAINT",
+    "GENERATED", "AUTO_INCREMENT", "COLLATE", "COMMENT", "ON", "IDENTITY", "CHARSET"
+}
+
+TABLE_CONSTRAINT_PATTERN = re.compile(r'^(CONSTRAINT\s+\S+\s+)?(PRIMARY\s+KEY|UNIQUE|FOREIGN\s+KEY|CHECK|KEY|INDEX|FULLTEXT|SPATIAL)\b', re.IGNORECASE)
+INDEX_NAME_PATTERN = re.compile(r'^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?([`"\[]?[\w$]+[`"\]]?)', re.IGNORECASE)
+ALTER_ADD_PATTERN = re.compile(r'^\s*ALTER\s+TABLE\s+(?:ONLY\s+)?(\S+)\s+ADD\s+(CONSTRAINT\s+(\S+)\s+)?', re.IGNORECASE)
+
+# Spellings of the same type across dialects, mapped to one canonical name
+TYPE_ALIASES = {
+    "int": "integer", "int4": "integer", "serial": "integer", "serial4": "integer", "mediumint": "integer",
+    "int8": "bigint", "bigserial": "bigint", "serial8": "bigint",
+    "int2": "smallint", "smallserial": "smallint", "tinyint": "smallint",
+    "character varying": "varchar", "character": "char", "bpchar": "char",
+    "decimal": "numeric",
+    "datetime": "timestamp", "timestamp without time zone": "timestamp",
+    "timestamp with time zone": "timestamptz",
+    "double precision": "double", "float8": "double", "float4": "real",
+    "bool": "boolean",
+    "longtext": "text", "mediumtext": "text", "tinytext": "text"
+}
+
+# Types whose display width MySQL reports but which do not change storage
+DISPLAY_WIDTH_TYPES = {"integer", "bigint", "smallint"}
+
+def quote_identifier(name: str, db_type: str) -> str:
+    if db_type == "MySQL":
+        return f"`{name}`"
+    return f'"{name}"'
+
+def strip_identifier(name: str) -> str:
+    return name.strip().strip('`"[]')
+
+def canonical_type(type_text: str) -> str:
+    """Normalize a column type so equivalent spellings compare equal"""
+    text = re.sub(r'\s+', ' ', (type_text or "").strip().lower())
+    text = re.sub(r'\s*([(),])\s*', r'\1', text)
+    if re.fullmatch(r'tinyint\(1\)', text):
+        return "boolean"
+
+    # Precision written inside "timestamp(6) without time zone"
+    match = re.fullmatch(r'(timestamp|time)(\(\d+\))? (with|without) time zone', text)
+    if match:
+        return (match.group(1) + ("tz" if match.group(3) == "with" else "")) + (match.group(2) or "")
+
+    match = re.fullmatch(r'([a-z][a-z0-9_ ]*?)(\([^)]*\))?( unsigned)?', text)
+    if not match:
+        return text
+    base = TYPE_ALIASES.get(match.group(1), match.group(1))
+    size = match.group(2) or ""
+    if base in DISPLAY_WIDTH_TYPES:
+        size = ""
+    return base + size + (match.group(3) or "")
+
+def parse_column_definition(element: str) -> Optional[Dict[str, Any]]:
+    """Split "name TYPE constraints..." into its parts"""
+    element = element.strip()
+    match = re.match(r'([`"\[][^`"\]]+[`"\]]|\S+)\s+(.*)$', element, re.DOTALL)
+    if not match:
+        return None
+    raw_name, rest = match.group(1), match.group(2)
+
+    # The type runs until the first constraint keyword outside parentheses
+    depth = 0
+    type_end = len(rest)
+    for word in re.finditer(r'\(|\)|CHARACTER\s+SET\b|[A-Za-z_]+', rest, re.IGNORECASE):
+        token = word.group(0)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth == 0 and (token.upper() in COLUMN_CONSTRAINT_WORDS or token.upper().startswith("CHARACTER ")):
+            type_end = word.start()
+            break
+
+    upper_rest = rest.upper()
+    return {
+        "name": strip_identifier(raw_name),
+        "raw_name": raw_name,
+        "type": rest[:type_end].strip(),
+        "nullable": not re.search(r'\bNOT\s+NULL\b|\bPRIMARY\s+KEY\b', upper_rest),
+        "definition": element
+    }
+
+def parse_create_table(ddl: str) -> Optional[Dict[str, Any]]:
+    """Columns and table-level constraints of a CREATE TABLE statement"""
+    raw_name = get_table_name(ddl)
+    open_paren = ddl.find('(')
+    close_paren = ddl.rfind(')')
+    if not raw_name or open_paren < 0 or close_paren < open_paren:
+        return None
+
+    columns = []
+    constraints = []
+    for element in split_top_level(ddl[open_paren + 1:close_paren]):
+        element = element.strip()
+        if not element:
+            continue
+        if TABLE_CONSTRAINT_PATTERN.match(element):
+            constraints.append(element)
+        else:
+            column = parse_column_definition(element)
+            if column:
+                columns.append(column)
+
+    # Columns of a table-level PRIMARY KEY (...) are NOT NULL even without saying so
+    key_columns = set()
+    for constraint in constraints:
+        primary_key = re.match(r'(?:CONSTRAINT\s+\S+\s+)?PRIMARY\s+KEY\s*\(([^)]*)\)', constraint, re.IGNORECASE)
+        if primary_key:
+            key_columns.update(strip_identifier(column).lower() for column in primary_key.group(1).split(","))
+    for column in columns:
+        if column["name"].lower() in key_columns:
+            column["nullable"] = False
+
+    return {"name": normalize_table_name(raw_name), "raw_name": raw_name, "columns": columns, "constraints": constraints}
+
+def get_target_catalog(connection, db_type: str) -> Dict[str, Any]:
+    """
+    Read the target's current tables, columns, indexes and constraints.
+
+    Returns {"tables": {table: {"name", "columns": {column: {"name", "type", "nullable"}}}},
+    "indexes", "constraints", "foreign_keys"} with lowercased keys.
+    """
+    cursor = connection.cursor()
+    catalog = {"tables": {}, "indexes": set(), "constraints": set(), "foreign_keys": set()}
+
+    try:
+        if db_type == "MySQL":
+            cursor.execute("""
+                SELECT c.TABLE_NAME, c.COLUMN_NAME, c.COLUMN_TYPE, c.IS_NULLABLE = 'YES'
+                FROM information_schema.COLUMNS c
+                JOIN information_schema.TABLES t
+                  ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+                WHERE c.TABLE_SCHEMA = DATABASE() AND t.TABLE_TYPE = 'BASE TABLE'
+                ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+            """)
+            column_rows = cursor.fetchall()
+            cursor.execute("""
+                SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()
+            """)
+            index_rows = cursor.fetchall()
+            cursor.execute("""
+                SELECT tc.CONSTRAINT_NAME, tc.TABLE_NAME, kcu.REFERENCED_TABLE_NAME
+                FROM information_schema.TABLE_CONSTRAINTS tc
+                LEFT JOIN information_schema.KEY_COLUMN_USAGE kcu
+                  ON kcu.CONSTRAINT_SCHEMA = tc.CONSTRAINT_SCHEMA
+                 AND kcu.CONSTRAINT_NAME = tc.CONSTRAINT_NAME
+                 AND kcu.TABLE_NAME = tc.TABLE_NAME
+                 AND kcu.REFERENCED_TABLE_NAME IS NOT NULL
+                WHERE tc.CONSTRAINT_SCHEMA = DATABASE()
+            """)
+            constraint_rows = cursor.fetchall()
+        else:
+            cursor.execute("""
+                SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod), NOT a.attnotnull
+                FROM pg_attribute a
+                JOIN pg_class c ON c.oid = a.attrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = current_schema()
+                  AND c.relkind IN ('r', 'p')
+                  AND a.attnum > 0
+                  AND NOT a.attisdropped
+                ORDER BY c.relname, a.attnum
+            """)
+            column_rows = cursor.fetchall()
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()")
+            index_rows = cursor.fetchall()
+            cursor.execute("""
+                SELECT con.conname, src.relname, tgt.relname
+                FROM pg_constraint con
+                JOIN pg_class src ON src.oid = con.conrelid
+                JOIN pg_namespace n ON n.oid = src.relnamespace
+                LEFT JOIN pg_class tgt ON tgt.oid = con.confrelid
+                WHERE n.nspname = current_schema()
+            """)
+            constraint_rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    for table_name, column_name, column_type, nullable in column_rows:
+        table = catalog["tables"].setdefault(table_name.lower(), {"name": table_name, "columns": {}})
+        table["columns"][column_name.lower()] = {"name": column_name, "type": column_type, "nullable": bool(nullable)}
+    catalog["indexes"] = {row[0].lower() for row in index_rows if row[0]}
+    for constraint_name, table_name, referenced_table in constraint_rows:
+        catalog["constraints"].add(constraint_name.lower())
+        if referenced_table:
+            catalog["foreign_keys"].add((table_name.lower(), referenced_table.lower()))
+
+    print(f"Target catalog: {len(catalog['tables'])} tables, {len(catalog['indexes'])} indexes, {len(catalog['constraints'])} constraints")
+    return catalog
+
+def modifiable_definition(column: Dict[str, Any]) -> str:
+    """Column definition without the inline constraints MODIFY COLUMN cannot repeat"""
+    definition = re.sub(r'\s+PRIMARY\s+KEY\b|\s+UNIQUE(\s+KEY)?\b', '', column["definition"], flags=re.IGNORECASE)
+    return re.sub(r'\s+REFERENCES\s+.*$', '', definition, flags=re.IGNORECASE | re.DOTALL)
+
+def diff_table(desired: Dict[str, Any], current: Dict[str, Any], catalog: Dict[str, Any], db_type: str, prune: bool = False) -> List[str]:
+    """ALTER statements that bring an existing table to the desired definition"""
+    table = desired["raw_name"]
+    statements = []
+
+    desired_names = set()
+    for column in desired["columns"]:
+        key = column["name"].lower()
+        desired_names.add(key)
+        existing = current["columns"].get(key)
+        if existing is None:
+            statements.append(f"ALTER TABLE {table} ADD COLUMN {column['definition']}")
+            continue
+
+        type_changed = canonical_type(column["type"]) != canonical_type(existing["type"])
+        nullability_changed = column["nullable"] != existing["nullable"]
+        if not (type_changed or nullability_changed):
+            continue
+
+        if db_type == "MySQL":
+            statements.append(f"ALTER TABLE {table} MODIFY COLUMN {modifiable_definition(column)}")
+            continue
+        if type_changed:
+            # SERIAL is a CREATE-time shorthand; the column type itself is the integer
+            new_type = re.sub(r'^(small|big)?serial\b', lambda m: {"small": "smallint", "big": "bigint"}.get(m.group(1), "integer"), column["type"], flags=re.IGNORECASE)
+            statements.append(f"ALTER TABLE {table} ALTER COLUMN {column['raw_name']} TYPE {new_type} USING {column['raw_name']}::{new_type}")
+        if nullability_changed:
+            statements.append(f"ALTER TABLE {table} ALTER COLUMN {column['raw_name']} {'DROP' if column['nullable'] else 'SET'} NOT NULL")
+
+    for constraint in desired["constraints"]:
+        named = re.match(r'CONSTRAINT\s+(\S+)', constraint, re.IGNORECASE)
+        if named:
+            if strip_identifier(named.group(1)).lower() not in catalog["constraints"]:
+                statements.append(f"ALTER TABLE {table} ADD {constraint}")
+        elif re.match(r'FOREIGN\s+KEY\b', constraint, re.IGNORECASE):
+            references = get_ddl_references(constraint)
+            if references and (desired["name"], references[0]) not in catalog["foreign_keys"]:
+                statements.append(f"ALTER TABLE {table} ADD {constraint}")
+        # Unnamed keys and checks on an existing table cannot be matched reliably; leave them
+
+    if prune:
+        for key, existing in current["columns"].items():
+            if key not in desired_names:
+                statements.append(f"ALTER TABLE {table} DROP COLUMN {quote_identifier(existing['name'], db_type)}")
+
+    return statements
+
+def prune_tables_statement(catalog: Dict[str, Any], desired_tables: set, db_type: str) -> Optional[str]:
+    """One DROP TABLE for every target table the translated schema no longer has"""
+    obsolete = sorted(key for key in catalog["tables"] if key not in desired_tables)
+    if not obsolete:
+        return None
+    names = ", ".join(quote_identifier(catalog["tables"][key]["name"], db_type) for key in obsolete)
+    return f"DROP TABLE IF EXISTS {names}" + ("" if db_type == "MySQL" else " CASCADE")
+
+def diff_schema(statements: List[str], catalog: Dict[str, Any], db_type: str, prune: bool = False) -> Dict[str, Any]:
+    """
+    Turn the translated DDL into the statements needed to converge the target.
+
+    Missing tables are created, existing ones get ALTERs for added or
+    changed columns and constraints, and objects that already exist are
+    skipped. Tables and columns the target has but the translation does
+    not are only dropped when `prune` is set.
+
+    Returns {"statements", "summary"}.
+    """
+    result = []
+    summary = {"create": [], "alter": [], "unchanged": [], "drop": [], "skipped": 0}
+    desired_tables = set()
+
+    for statement in statements:
+        statement = statement.strip().rstrip(';').strip()
+        if not statement:
+            continue
+
+        if re.match(r'CREATE\s+(?:(?:GLOBAL\s+|LOCAL\s+)?(?:TEMPORARY|TEMP|UNLOGGED)\s+)?TABLE\b', statement, re.IGNORECASE):
+            desired = parse_create_table(statement)
+            if desired is None:
+                result.append(statement)
+                continue
+            desired_tables.add(desired["name"])
+            current = catalog["tables"].get(desired["name"])
+            if current is None:
+                result.append(statement)
+                summary["create"].append(desired["name"])
+                continue
+            alters = diff_table(desired, current, catalog, db_type, prune)
+            if alters:
+                result.extend(alters)
+                summary["alter"].append(desired["name"])
+            else:
+                summary["unchanged"].append(desired["name"])
+            continue
+
+        index_match = INDEX_NAME_PATTERN.match(statement)
+        if index_match and strip_identifier(index_match.group(1)).lower() in catalog["indexes"]:
+            summary["skipped"] += 1
+            continue
+
+        alter_match = ALTER_ADD_PATTERN.match(statement)
+        if alter_match:
+            table_key = normalize_table_name(alter_match.group(1))
+            if alter_match.group(3) and strip_identifier(alter_match.group(3)).lower() in catalog["constraints"]:
+                summary["skipped"] += 1
+                continue
+            references = get_ddl_references(statement)
+            if not alter_match.group(3) and references and (table_key, references[0]) in catalog["foreign_keys"]:
+                summary["skipped"] += 1
+                continue
+
+        # Views are replaced in place so re-runs pick up definition changes
+        statement = re.sub(r'^CREATE\s+VIEW\b', 'CREATE OR REPLACE VIEW', statement, flags=re.IGNORECASE)
+        result.append(statement)
+
+    if prune:
+        drop_statement = prune_tables_statement(catalog, desired_tables, db_type)
+        if drop_statement:
+            result.append(drop_statement)
+            summary["drop"] = sorted(key for key in catalog["tables"] if key not in desired_tables)
+
+    print(f"Schema diff: {len(summary['create'])} to create, {len(summary['alter'])} to alter, "
+          f"{len(summary['unchanged'])} unchanged, {len(summary['drop'])} to drop")
+    return {"statements": result, "summary": summary}
@@ -0,0 +1,127 @@
+import os
+import queue
+import threading
+from typing import Optional
+
+# Read every table from one point in time when copying in parallel ("false" disables)
+CONSISTENT_SNAPSHOT = os.getenv("STRATA_CONSISTENT_SNAPSHOT", "true").lower() != "false"
+
+class SourceSnapshot:
+    """
+    Hand out source connections that all read the same point in time.
+
+    PostgreSQL: a coordinator connection opens a REPEATABLE READ
+    transaction and exports its snapshot with pg_export_snapshot(); every
+    worker imports it with SET TRANSACTION SNAPSHOT before each table. The
+    coordinator transaction stays open until close().
+
+    MySQL has no snapshot export, so the worker connections are opened up
+    front and each starts a transaction WITH CONSISTENT SNAPSHOT while the
+    coordinator briefly holds FLUSH TABLES WITH READ LOCK. Without the
+    RELOAD privilege the lock is skipped and the snapshots are only started
+    back to back.
+
+    Other engines, or STRATA_CONSISTENT_SNAPSHOT=false, get plain connections.
+    """
+
+    def __init__(self, connect_source, db_type: str, workers: int, enabled: bool = CONSISTENT_SNAPSHOT):
+        self.connect_source = connect_source
+        self.db_type = db_type
+        self.workers = max(1, workers)
+        self.enabled = enabled and db_type in ("PostgreSQL", "MySQL")
+        self.coordinator = None
+        self.snapshot_id = None
+        self.pool = queue.Queue()
+        self.local = threading.local()
+        self.opened = []
+        self.opened_lock = threading.Lock()
+        self.mode = "none"
+
+    def track(self, connection):
+        with self.opened_lock:
+            self.opened.append(connection)
+        return connection
+
+    def open(self):
+        if not self.enabled:
+            return self
+        try:
+            self.open_snapshot()
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def open_snapshot(self):
+        if self.db_type == "PostgreSQL":
+            self.coordinator = self.track(self.connect_source())
+            self.coordinator.set_session(isolation_level="REPEATABLE READ", readonly=True)
+            cursor = self.coordinator.cursor()
+            cursor.execute("SELECT pg_export_snapshot()")
+            self.snapshot_id = cursor.fetchone()[0]
+            cursor.close()
+            self.mode = "exported"
+            print(f"Exported source snapshot {self.snapshot_id}")
+        else:
+            self.open_mysql_snapshots()
+
+    def open_mysql_snapshots(self):
+        connections = [self.track(self.connect_source()) for _ in range(self.workers)]
+        self.coordinator = self.track(self.connect_source())
+        coordinator_cursor = self.coordinator.cursor()
+        locked = False
+        try:
+            coordinator_cursor.execute("FLUSH TABLES WITH READ LOCK")
+            locked = True
+        except Exception as e:
+            print(f"Could not take FLUSH TABLES WITH READ LOCK ({e}); starting snapshots without it")
+
+        try:
+            for connection in connections:
+                cursor = connection.cursor()
+                cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+                cursor.close()
+                self.pool.put(connection)
+        finally:
+            if locked:
+                coordinator_cursor.execute("UNLOCK TABLES")
+            coordinator_cursor.close()
+        self.mode = "synchronized" if locked else "best_effort"
+
+    def acquire(self):
+        """Source connection owned by the calling worker thread"""
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            if self.enabled and self.db_type == "MySQL":
+                connection = self.pool.get_nowait()
+            else:
+                connection = self.track(self.connect_source())
+            self.local.connection = connection
+        return connection
+
+    def begin_table(self, connection):
+        """Put the connection on the shared snapshot before reading the next table"""
+        if not self.enabled or self.db_type != "PostgreSQL":
+            return
+        # Each table gets a fresh transaction importing the coordinator's snapshot
+        connection.rollback()
+        connection.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        cursor = connection.cursor()
+        cursor.execute("SET TRANSACTION SNAPSHOT %s", (self.snapshot_id,))
+        cursor.close()
+
+    def close(self):
+        for connection in self.opened:
+            try:
+                connection.rollback()
+            except Exception:
+                pass
+            try:
+                connection.close()
+            except Exception:
+                pass
+        self.opened = []
+
+def open_source_snapshot(connect_source, db_type: str, workers: int, enabled: Optional[bool] = None) -> SourceSnapshot:
+    return SourceSnapshot(connect_source, db_type, workers, CONSISTENT_SNAPSHOT if enabled is None else enabled).open()
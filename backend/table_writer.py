@@ -0,0 +1,161 @@
+import os
+import json
+import re
+from typing import List, Optional
+
+from backend.schema_diff import quote_identifier
+
+# "upsert" (default) makes reloads idempotent on tables with a key; "insert" appends
+LOAD_MODE = os.getenv("STRATA_LOAD_MODE", "upsert").lower()
+
+# Rows per multi-row INSERT statement
+WRITE_BATCH_ROWS = int(os.getenv("STRATA_WRITE_BATCH_ROWS", "1000"))
+
+# Rows the target rejects are written here, one NDJSON file per table
+DEAD_LETTER_DIR = os.path.join("artifacts", "dead_letter")
+
+class DeadLetterFile:
+    """Per-table NDJSON file of rejected rows, created on the first rejection"""
+
+    def __init__(self, table_name: str, columns: List[str], directory: str = DEAD_LETTER_DIR):
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", table_name)
+        self.path = os.path.join(directory, f"{safe_name}.ndjson")
+        self.columns = list(columns)
+        self.count = 0
+        self.file = None
+        # A rerun starts a fresh file for the table
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def write(self, row: tuple, error: Exception):
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.file = open(self.path, "a", encoding="utf-8")
+        record = {"row": dict(zip(self.columns, row)), "error": str(error).strip()}
+        self.file.write(json.dumps(record, default=str) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+def conflict_clause(columns: List[str], key_columns: List[str], db_type: str) -> str:
+    """ON CONFLICT / ON DUPLICATE KEY tail that overwrites the non-key columns"""
+    keys = {column.lower() for column in key_columns}
+    updates = [column for column in columns if column.lower() not in keys]
+
+    if db_type == "MySQL":
+        # Re-assigning a key column to itself is MySQL's "do nothing"
+        targets = updates or key_columns[:1]
+        assignments = ", ".join(f"{quote_identifier(column, db_type)} = VALUES({quote_identifier(column, db_type)})" for column in targets)
+        return f" ON DUPLICATE KEY UPDATE {assignments}"
+
+    conflict_target = ", ".join(quote_identifier(column, db_type) for column in key_columns)
+    if not updates:
+        return f" ON CONFLICT ({conflict_target}) DO NOTHING"
+    assignments = ", ".join(f"{quote_identifier(column, db_type)} = EXCLUDED.{quote_identifier(column, db_type)}" for column in updates)
+    return f" ON CONFLICT ({conflict_target}) DO UPDATE SET {assignments}"
+
+class TableWriter:
+    """
+    Write rows to one target table as multi-row INSERT batches.
+
+    In upsert mode, with a primary key or unique key on the target, rows
+    that already exist are overwritten (ON CONFLICT DO UPDATE on PostgreSQL,
+    ON DUPLICATE KEY UPDATE on MySQL), so a retried chunk or a re-run after
+    a partial failure converges instead of duplicating or failing.
+
+    Each batch runs under a savepoint. When the target rejects it, the batch
+    is rolled back to the savepoint and split in half until the offending
+    rows are isolated; those go to the dead-letter file (when one is given)
+    and the rest are written. One bad row costs about log2(batch) retries.
+    Without a dead-letter file the error is raised as before.
+    """
+
+    def __init__(self, connection, db_type: str, table_sql: str, columns: List[str],
+                 key_columns: Optional[List[str]] = None, mode: str = LOAD_MODE, batch_rows: int = WRITE_BATCH_ROWS,
+                 dead_letter: Optional[DeadLetterFile] = None):
+        self.connection = connection
+        self.db_type = db_type
+        self.table_sql = table_sql
+        self.columns = list(columns)
+        self.key_columns = list(key_columns or [])
+        self.upsert = mode == "upsert" and bool(self.key_columns)
+        self.batch_rows = max(1, batch_rows)
+        self.dead_letter = dead_letter
+        self.rejected = 0
+        self.rejected_rows = []
+        self.retries = 0
+        self.full_statement = None
+
+        column_list = ", ".join(quote_identifier(column, db_type) for column in self.columns)
+        self.insert_prefix = f"INSERT INTO {table_sql} ({column_list}) VALUES "
+        self.row_placeholder = "(" + ", ".join(["%s"] * len(self.columns)) + ")"
+        self.suffix = conflict_clause(self.columns, self.key_columns, db_type) if self.upsert else ""
+
+    def statement_for(self, row_count: int) -> str:
+        return self.insert_prefix + ", ".join([self.row_placeholder] * row_count) + self.suffix
+
+    def write(self, rows: List[tuple]) -> int:
+        """Send rows in batches of batch_rows; the caller commits. Returns the rows written."""
+        if self.dead_letter is not None and self.db_type == "MySQL" and not self.connection.in_transaction:
+            # MySQL targets run in autocommit, where a savepoint ends with its own statement
+            self.connection.start_transaction()
+        cursor = self.connection.cursor()
+        # Rows of this call that went to the dead-letter file
+        self.rejected_rows = []
+        try:
+            written = 0
+            for start in range(0, len(rows), self.batch_rows):
+                written += self.write_batch(cursor, rows[start:start + self.batch_rows])
+            return written
+        finally:
+            cursor.close()
+
+    def execute_batch(self, cursor, batch: List[tuple]):
+        if len(batch) == self.batch_rows:
+            self.full_statement = self.full_statement or self.statement_for(self.batch_rows)
+            statement = self.full_statement
+        else:
+            statement = self.statement_for(len(batch))
+        cursor.execute(statement, [value for row in batch for value in row])
+
+    def write_batch(self, cursor, batch: List[tuple], depth: int = 0) -> int:
+        if self.dead_letter is None:
+            self.execute_batch(cursor, batch)
+            return len(batch)
+
+        savepoint = f"strata_batch_{depth}"
+        cursor.execute(f"SAVEPOINT {savepoint}")
+        try:
+            self.execute_batch(cursor, batch)
+            written = len(batch)
+        except Exception as e:
+            # On a dead connection this fails too, and that error propagates
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+            if len(batch) == 1:
+                self.dead_letter.write(batch[0], e)
+                self.rejected += 1
+                self.rejected_rows.append(batch[0])
+                written = 0
+            else:
+                self.retries += 1
+                middle = len(batch) // 2
+                written = (self.write_batch(cursor, batch[:middle], depth + 1)
+                           + self.write_batch(cursor, batch[middle:], depth + 1))
+        cursor.execute(f"RELEASE SAVEPOINT {savepoint}")
+        return written
+
+def merge_from_staging(connection, table_sql: str, staging_sql: str, columns: List[str], key_columns: List[str]) -> int:
+    """PostgreSQL: move staged rows into the target with one INSERT ... SELECT ... ON CONFLICT"""
+    column_list = ", ".join(quote_identifier(column, "PostgreSQL") for column in columns)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            f"INSERT INTO {table_sql} ({column_list}) SELECT {column_list} FROM {staging_sql}"
+            + conflict_clause(columns, key_columns, "PostgreSQL")
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
@@ -0,0 +1,143 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from typing import Dict, Any, List, Callable, Optional
+
+# Connections kept per database while validation checks run
+VALIDATION_POOL_SIZE = int(os.getenv("STRATA_VALIDATION_POOL_SIZE", "4"))
+
+class ConnectionPool:
+    """Up to size connections opened on demand and handed out one check at a time"""
+
+    def __init__(self, connect, size: int = VALIDATION_POOL_SIZE):
+        self.connect = connect
+        self.size = max(1, size)
+        self.idle = queue.Queue()
+        self.opened = []
+        self.reserved = 0
+        self.lock = threading.Lock()
+
+    def checkout(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            # Reserve the slot before connecting so concurrent callers do not overshoot
+            can_open = self.reserved < self.size
+            if can_open:
+                self.reserved += 1
+        if not can_open:
+            return self.idle.get()
+        try:
+            connection = self.connect()
+        except Exception:
+            with self.lock:
+                self.reserved -= 1
+            raise
+        with self.lock:
+            self.opened.append(connection)
+        return connection
+
+    @contextmanager
+    def connection(self):
+        connection = self.checkout()
+        try:
+            yield connection
+        finally:
+            try:
+                # Leave no open (or, on PostgreSQL, aborted) transaction for the next check
+                connection.rollback()
+            except Exception:
+                pass
+            self.idle.put(connection)
+
+    def close(self):
+        with self.lock:
+            opened, self.opened = self.opened, []
+        for connection in opened:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+class CheckGraph:
+    """
+    Validation checks with dependencies, run concurrently.
+
+    A check starts as soon as every check it depends on has finished and
+    receives their results as keyword arguments. A failing check marks its
+    dependents as skipped; independent checks keep running. run() returns
+    the results plus a per-check timing breakdown.
+    """
+
+    def __init__(self):
+        self.checks = {}
+
+    def add(self, name: str, function: Callable, depends: Optional[List[str]] = None):
+        self.checks[name] = {"function": function, "depends": list(depends or [])}
+        return self
+
+    def run(self, workers: int, on_check_done=None) -> Dict[str, Any]:
+        results, errors, timings = {}, {}, {}
+        pending = {name: set(check["depends"]) for name, check in self.checks.items()}
+        start = time.perf_counter()
+
+        def run_check(name):
+            started = time.perf_counter()
+            try:
+                check = self.checks[name]
+                return check["function"](**{dependency: results[dependency] for dependency in check["depends"]})
+            finally:
+                timings[name] = {
+                    "started": round(started - start, 3),
+                    "seconds": round(time.perf_counter() - started, 3)
+                }
+
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            while True:
+                # Dependents of failed checks can never start; skipping one may skip its own dependents
+                skipped = True
+                while skipped:
+                    skipped = False
+                    for name, waiting in list(pending.items()):
+                        failed = waiting & set(errors)
+                        if failed:
+                            del pending[name]
+                            errors[name] = f"skipped: depends on failed check {', '.join(sorted(failed))}"
+                            timings[name] = {"started": None, "seconds": 0.0}
+                            skipped = True
+
+                for name in [name for name, waiting in pending.items() if not waiting]:
+                    del pending[name]
+                    running[executor.submit(run_check, name)] = name
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        for waiting in pending.values():
+                            waiting.discard(name)
+                    except Exception as e:
+                        errors[name] = str(e)
+                        print(f"Validation check {name} failed: {e}")
+                    if on_check_done:
+                        on_check_done(name, len(results) + len(errors), len(self.checks))
+
+        wall_seconds = round(time.perf_counter() - start, 3)
+        return {
+            "results": results,
+            "errors": errors,
+            "timings": {
+                "wall_seconds": wall_seconds,
+                "check_seconds": round(sum(timing["seconds"] for timing in timings.values()), 3),
+                "checks": timings
+            }
+        }
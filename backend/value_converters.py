@@ -0,0 +1,113 @@
+import datetime
+import json
+import re
+from typing import Callable, List, Optional
+
+from backend.schema_diff import canonical_type
+
+DATE_TYPES = {"date", "timestamp", "timestamptz"}
+JSON_TYPES = {"json", "jsonb"}
+
+def base_type(type_text: Optional[str]) -> str:
+    """Canonical type without size or unsigned: "varchar(20)" -> "varchar", "text[]" stays "text[]" """
+    canonical = canonical_type(type_text or "")
+    return canonical.split("(")[0].replace(" unsigned", "")
+
+def to_boolean(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        # BIT(1) arrives as bytes from some drivers
+        return int.from_bytes(value, "big") != 0
+    if isinstance(value, str):
+        return value.strip().lower() not in ("", "0", "f", "false", "n", "no")
+    return bool(value)
+
+def zero_date_to_null(value):
+    # MySQL "zero" dates have no equivalent anywhere else
+    if isinstance(value, str) and value.startswith("0000-00-00"):
+        return None
+    return value
+
+def set_to_list(value):
+    if value is None:
+        return None
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return [item for item in str(value).split(",") if item]
+
+def set_to_text(value):
+    if isinstance(value, (set, frozenset)):
+        return ",".join(sorted(value))
+    return value
+
+def time_of_day(value):
+    # MySQL TIME comes back as a timedelta; render it HH:MM:SS[.ffffff] like the database does
+    if isinstance(value, datetime.timedelta):
+        seconds = int(value.total_seconds())
+        text = f"{'-' if seconds < 0 else ''}{abs(seconds) // 3600:02d}:{abs(seconds) % 3600 // 60:02d}:{abs(seconds) % 60:02d}"
+        return text + (f".{value.microseconds:06d}" if value.microseconds else "")
+    return value
+
+def to_json_text(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+def compile_converter(source_type: Optional[str], target_type: Optional[str], source_db: Optional[str] = None) -> Optional[Callable]:
+    """
+    Converter for one column, or None when the driver can pass values through as they are.
+
+    Chosen from the extracted source type and the target catalog type, so
+    the per-value work in the copy loop is a single call, and only for
+    columns that need it. Unsigned integers need nothing: drivers hand them
+    over as Python ints, which fit any wide enough target type.
+    """
+    source_text = re.sub(r'\s+', '', (source_type or "").lower())
+    source = base_type(source_type)
+    target = base_type(target_type)
+    if not target:
+        return None
+
+    # PostgreSQL drivers decode JSON into dicts, which no driver binds back
+    if source in JSON_TYPES or (target in JSON_TYPES and not source):
+        return to_json_text
+    # TINYINT(1) canonicalizes to boolean but still arrives as 0/1
+    if target == "boolean" and source_text not in ("boolean", "bool"):
+        return to_boolean
+
+    if source_db == "MySQL":
+        if target in DATE_TYPES and source in DATE_TYPES:
+            return zero_date_to_null
+        if source == "set":
+            return set_to_list if target.endswith("[]") else set_to_text
+        if source == "time" and target == "time":
+            return time_of_day
+    return None
+
+def compile_converters(source_types: List[Optional[str]], target_types: List[Optional[str]],
+                       source_db: Optional[str] = None) -> List[Optional[Callable]]:
+    return [compile_converter(source, target, source_db) for source, target in zip(source_types, target_types)]
+
+def build_batch_converter(source_types: List[Optional[str]], target_types: List[Optional[str]],
+                          source_db: Optional[str] = None) -> Optional[Callable]:
+    """
+    One function converting a whole batch of rows, compiled once per table.
+
+    Converted columns are mapped column-wise over the transposed batch;
+    untouched columns are passed along as they are. Returns None when no
+    column needs converting, so callers can skip the stage entirely.
+    """
+    converters = [(position, converter) for position, converter in enumerate(compile_converters(source_types, target_types, source_db)) if converter]
+    if not converters:
+        return None
+
+    def convert(rows):
+        if not rows:
+            return rows
+        columns = list(zip(*rows))
+        for position, converter in converters:
+            columns[position] = map(converter, columns[position])
+        return list(zip(*columns))
+
+    return convert
@@ -0,0 +1,311 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from backend.schema_diff import quote_identifier
+from backend.chunk_reader import get_chunk_key
+
+# User-supplied workload; generated from the extraction bundle when absent
+WORKLOAD_PATH = os.path.join("artifacts", "benchmark_workload.json")
+BENCHMARK_REPORT_PATH = os.path.join("artifacts", "benchmark_report.json")
+
+# Sessions running each query shape at the same time, per database
+BENCHMARK_CONCURRENCY = int(os.getenv("STRATA_BENCHMARK_CONCURRENCY", "4"))
+# Timed executions of each query shape, per database
+BENCHMARK_EXECUTIONS = int(os.getenv("STRATA_BENCHMARK_EXECUTIONS", "200"))
+# Target p95 latency over source p95 latency that counts as a regression
+BENCHMARK_REGRESSION = float(os.getenv("STRATA_BENCHMARK_REGRESSION", "1.5"))
+
+# Latency differences below this are noise, whatever the ratio
+REGRESSION_FLOOR_MS = 1.0
+# Generated shapes per kind (PK lookup, FK join, index range scan)
+MAX_SHAPES_PER_KIND = 5
+# Key values sampled from the source to parameterize generated shapes
+SAMPLE_VALUES = 50
+
+def load_workload(path: str = WORKLOAD_PATH) -> Optional[List[Dict[str, Any]]]:
+    """
+    Query shapes from a workload file, or None when there is none.
+
+    The file is a JSON list of {"name", "sql"} (or "source_sql" and
+    "target_sql" when the dialects need different text) with optional
+    "params": a list of parameter lists cycled through the executions.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        entries = json.load(f)
+    shapes = []
+    for index, entry in enumerate(entries):
+        source_sql = entry.get("source_sql") or entry.get("sql")
+        target_sql = entry.get("target_sql") or entry.get("sql")
+        if not source_sql or not target_sql:
+            raise Exception(f"Workload entry {index} has no SQL")
+        shapes.append({
+            "name": entry.get("name") or f"query {index + 1}",
+            "kind": "user",
+            "source_sql": source_sql,
+            "target_sql": target_sql,
+            "params": [tuple(params) for params in entry.get("params") or []]
+        })
+    return shapes
+
+def sample_values(connection, db_type: str, table_name: str, columns: List[str], limit: int = SAMPLE_VALUES) -> List[tuple]:
+    """Up to limit distinct non-NULL value tuples of columns"""
+    names = [quote_identifier(column, db_type) for column in columns]
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            f"SELECT DISTINCT {', '.join(names)} FROM {quote_identifier(table_name, db_type)} "
+            f"WHERE {' AND '.join(f'{name} IS NOT NULL' for name in names)} LIMIT {int(limit)}"
+        )
+        return [tuple(row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def index_columns(index: Dict[str, Any]) -> List[str]:
+    """Index columns from the bundle, parsed out of the DDL when only that was extracted"""
+    if index.get("columns"):
+        return list(index["columns"])
+    match = re.search(r'\(([^()]*)\)\s*$', index.get("ddl") or "")
+    if not match:
+        return []
+    return [column.strip().strip('`"') for column in match.group(1).split(",")]
+
+class WorkloadGenerator:
+    """
+    Representative query shapes for a migrated database.
+
+    PK lookups on the largest tables, joins along the extracted foreign
+    keys and range scans over the extracted secondary indexes, each
+    parameterized with values sampled from the source. Shapes whose tables
+    or columns the target lacks are left out.
+    """
+
+    def __init__(self, source_connection, source_type: str, target_type: str,
+                 extraction_data: Dict[str, Any], target_schemas: Dict[str, List[Dict[str, Any]]]):
+        self.connection = source_connection
+        self.source_type = source_type
+        self.target_type = target_type
+        self.extraction_data = extraction_data or {}
+        self.target_tables = {
+            name.lower(): {"name": name, "columns": {column["name"].lower(): column["name"] for column in columns}}
+            for name, columns in target_schemas.items()
+        }
+
+    def target_names(self, table_name: str, columns: List[str]):
+        """Target table name and column names, or None when the target lacks any of them"""
+        table = self.target_tables.get((table_name or "").lower())
+        if table is None or any(column.lower() not in table["columns"] for column in columns):
+            return None
+        return table["name"], [table["columns"][column.lower()] for column in columns]
+
+    def shape(self, name: str, kind: str, template, table_name: str, columns: List[str], params: List[tuple],
+              extra_tables: Optional[List[tuple]] = None):
+        """
+        SQL for both sides, or None when the target lacks a table or column or there are no parameters.
+
+        template gets one (quoted table, quoted columns) pair per table:
+        the main table, then extra_tables, given as (table, columns) pairs.
+        """
+        tables = [(table_name, columns)] + list(extra_tables or [])
+        target = [self.target_names(table, table_columns) for table, table_columns in tables]
+        if not params or any(names is None for names in target):
+            return None
+
+        def render(db_type, names):
+            quoted = [(quote_identifier(table, db_type), [quote_identifier(column, db_type) for column in table_columns])
+                      for table, table_columns in names]
+            return template(*quoted)
+
+        return {
+            "name": name,
+            "kind": kind,
+            "source_sql": render(self.source_type, tables),
+            "target_sql": render(self.target_type, target),
+            "params": params
+        }
+
+    def largest_tables(self) -> List[str]:
+        profile = self.extraction_data.get("data_profile", {}) or {}
+        names = [table["name"] for table in (self.extraction_data.get("ddl_scripts", {}) or {}).get("tables", [])
+                 if isinstance(table, dict) and table.get("name")] or list(profile)
+        return sorted(names, key=lambda name: -((profile.get(name) or {}).get("row_count") or 0))
+
+    def pk_lookups(self) -> List[Dict[str, Any]]:
+        shapes = []
+        for table_name in self.largest_tables():
+            if len(shapes) >= MAX_SHAPES_PER_KIND:
+                break
+            key = get_chunk_key(self.connection, self.source_type, table_name)
+            if key["kind"] not in ("pk", "unique"):
+                continue
+            shape = self.shape(
+                f"PK lookup {table_name}", "pk_lookup",
+                lambda table: f"SELECT * FROM {table[0]} WHERE {' AND '.join(f'{column} = %s' for column in table[1])}",
+                table_name, key["columns"], sample_values(self.connection, self.source_type, table_name, key["columns"])
+            )
+            if shape:
+                shapes.append(shape)
+        return shapes
+
+    def fk_joins(self) -> List[Dict[str, Any]]:
+        shapes = []
+        for relationship in self.extraction_data.get("relationships", []) or []:
+            if len(shapes) >= MAX_SHAPES_PER_KIND:
+                break
+            child, parent = relationship.get("source_table"), relationship.get("target_table")
+            child_columns = relationship.get("source_columns") or []
+            parent_columns = relationship.get("target_columns") or []
+            if not child or not parent or not child_columns or len(child_columns) != len(parent_columns):
+                continue
+
+            def join(child_table, parent_table):
+                joined = " AND ".join(f"c.{column} = p.{referenced}" for column, referenced in zip(child_table[1], parent_table[1]))
+                filtered = " AND ".join(f"p.{referenced} = %s" for referenced in parent_table[1])
+                return f"SELECT c.* FROM {child_table[0]} c JOIN {parent_table[0]} p ON {joined} WHERE {filtered}"
+
+            shape = self.shape(
+                f"FK join {child} -> {parent}", "fk_join", join, child, child_columns,
+                sample_values(self.connection, self.source_type, child, child_columns), [(parent, parent_columns)]
+            )
+            if shape:
+                shapes.append(shape)
+        return shapes
+
+    def range_scans(self) -> List[Dict[str, Any]]:
+        shapes = []
+        indexes = self.extraction_data.get("indexes") or (self.extraction_data.get("ddl_scripts", {}) or {}).get("indexes", [])
+        for index in indexes:
+            if len(shapes) >= MAX_SHAPES_PER_KIND:
+                break
+            name = index.get("name") or ""
+            columns = index_columns(index)
+            if not columns or not index.get("table") or name == "PRIMARY" or name.endswith("_pkey"):
+                continue
+            values = sorted(value[0] for value in sample_values(self.connection, self.source_type, index["table"], columns[:1]))
+            # Ranges spanning a few sampled values, so each scan reads more than one index entry
+            step = max(1, len(values) // 10)
+            params = [(values[position], values[min(position + step, len(values) - 1)]) for position in range(len(values))]
+            shape = self.shape(
+                f"Range scan {index['table']}.{columns[0]}", "range_scan",
+                lambda table: f"SELECT * FROM {table[0]} WHERE {table[1][0]} BETWEEN %s AND %s ORDER BY {table[1][0]} LIMIT 1000",
+                index["table"], columns[:1], params
+            )
+            if shape:
+                shapes.append(shape)
+        return shapes
+
+    def generate(self) -> List[Dict[str, Any]]:
+        shapes = []
+        for generate_kind in (self.pk_lookups, self.fk_joins, self.range_scans):
+            try:
+                shapes.extend(generate_kind())
+            except Exception as e:
+                print(f"Could not generate {generate_kind.__name__} benchmark queries: {e}")
+        return shapes
+
+def percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def execute_query(cursor, sql: str, values: Optional[tuple]):
+    if values is None:
+        cursor.execute(sql)
+    else:
+        cursor.execute(sql, values)
+    if cursor.description:
+        cursor.fetchall()
+
+def run_shape(pool, sql: str, params: List[tuple], executions: int = BENCHMARK_EXECUTIONS,
+              concurrency: int = BENCHMARK_CONCURRENCY) -> Dict[str, Any]:
+    """
+    Execute one query shape executions times across concurrency sessions.
+
+    Each session runs one untimed warm-up execution, then the sessions
+    start timing together. Returns latencies in milliseconds (p50/p95/p99)
+    and throughput in queries per second over the timed executions.
+    """
+    executions = max(1, executions)
+    sessions = max(1, min(concurrency, pool.size, executions))
+    latencies = []
+    lock = threading.Lock()
+    clock = {}
+    ready = threading.Barrier(sessions, action=lambda: clock.setdefault("started", time.perf_counter()))
+
+    def values_for(index):
+        return params[index % len(params)] if params else None
+
+    def session(offset):
+        with pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                execute_query(cursor, sql, values_for(offset))
+                ready.wait()
+                timings = []
+                for index in range(offset, executions, sessions):
+                    started = time.perf_counter()
+                    execute_query(cursor, sql, values_for(index))
+                    timings.append((time.perf_counter() - started) * 1000)
+                with lock:
+                    latencies.extend(timings)
+            except Exception:
+                # Release the sessions waiting on this one
+                ready.abort()
+                raise
+            finally:
+                cursor.close()
+
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        futures = [executor.submit(session, offset) for offset in range(sessions)]
+        errors = [future.exception() for future in futures]
+    # Report the session that failed, not the ones it released
+    failures = [error for error in errors if error is not None and not isinstance(error, threading.BrokenBarrierError)]
+    if failures or any(errors):
+        raise failures[0] if failures else errors[0]
+    wall_seconds = time.perf_counter() - clock["started"]
+
+    latencies.sort()
+    return {
+        "executions": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "qps": round(len(latencies) / wall_seconds, 1) if wall_seconds > 0 else None
+    }
+
+def is_regression(source: Dict[str, Any], target: Dict[str, Any], threshold: float = BENCHMARK_REGRESSION) -> bool:
+    return (target["p95_ms"] > source["p95_ms"] * threshold
+            and target["p95_ms"] - source["p95_ms"] > REGRESSION_FLOOR_MS)
+
+def benchmark_workload(source_pool, target_pool, shapes: List[Dict[str, Any]], executions: int = BENCHMARK_EXECUTIONS,
+                       concurrency: int = BENCHMARK_CONCURRENCY, threshold: float = BENCHMARK_REGRESSION) -> Dict[str, Any]:
+    """
+    Replay every shape on the source, then on the target, and compare.
+
+    Shapes run one at a time so their latencies do not interfere. The
+    report is also written to BENCHMARK_REPORT_PATH.
+    """
+    report = {"concurrency": concurrency, "executions": executions, "threshold": threshold, "shapes": []}
+    for shape in shapes:
+        entry = {"name": shape["name"], "kind": shape["kind"], "source": None, "target": None, "regression": False, "error": None}
+        try:
+            entry["source"] = run_shape(source_pool, shape["source_sql"], shape["params"], executions, concurrency)
+            entry["target"] = run_shape(target_pool, shape["target_sql"], shape["params"], executions, concurrency)
+            entry["regression"] = is_regression(entry["source"], entry["target"], threshold)
+        except Exception as e:
+            entry["error"] = str(e)
+        report["shapes"].append(entry)
+
+    os.makedirs(os.path.dirname(BENCHMARK_REPORT_PATH), exist_ok=True)
+    with open(BENCHMARK_REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    return report
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+"""
+Local mock of the OpenAI chat-completions endpoint for exercising the AI client
+
+Usage:
+    python mock_openai_server.py [--port 8090] [--fail-first 2] [--delay 0.5]
+
+Then set OPENAI_BASE_URL=http://127.0.0.1:8090/v1 and any OPENAI_API_KEY.
+--fail-first answers the first N requests with HTTP 500 to exercise retries,
+--delay adds latency before every response to exercise timeouts.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend.ai import DEMO_TRANSLATED_TABLES
+
+settings = {"fail_first": 0, "delay": 0.0}
+request_counter = {"count": 0}
+counter_lock = threading.Lock()
+
+def build_reply(messages):
+    """Return a canned JSON reply matching the prompt type"""
+    system_prompt = messages[0].get("content", "") if messages else ""
+    if "translation" in system_prompt:
+        return json.dumps({
+            "translated_ddl": {"tables": DEMO_TRANSLATED_TABLES},
+            "notes": "Translated by mock server"
+        })
+    user_prompt = messages[-1].get("content", "") if messages else ""
+    signature_ids = re.findall(r'"id": "([^"]+)"', user_prompt) or ["1"]
+    return json.dumps({
+        "fixes": [{
+            "id": signature_id,
+            "issue": f"Mock issue for signature {signature_id}",
+            "solution": "Mock solution",
+            "precautions": "None"
+        } for signature_id in signature_ids]
+    })
+
+class MockChatCompletionsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        with counter_lock:
+            request_counter["count"] += 1
+            request_number = request_counter["count"]
+
+        if settings["delay"]:
+            time.sleep(settings["delay"])
+
+        if request_number <= settings["fail_first"]:
+            self.send_json(500, {"error": {"message": f"Injected failure {request_number}"}})
+            return
+
+        reply = build_reply(body.get("messages", []))
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        completion_tokens = len(reply.split())
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        model = body.get("model", "mock-model")
+
+        if body.get("stream"):
+            self.send_stream(model, reply, usage)
+        else:
+            self.send_json(200, {
+                "id": f"chatcmpl-mock-{request_number}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_stream(self, model, reply, usage):
+        """Send the reply as server-sent events in small chunks"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        base = {"id": "chatcmpl-mock-stream", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        for i in range(0, len(reply), 40):
+            chunk = dict(base, choices=[{"index": 0, "delta": {"content": reply[i:i + 40]}, "finish_reason": None}])
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        final = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        self.wfile.write(f"data: {json.dumps(final)}\n\n".encode())
+        self.wfile.write(f"data: {json.dumps(dict(base, choices=[], usage=usage))}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        print(f"[mock-openai] {format % args}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI chat-completions server")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    settings["fail_first"] = args.fail_first
+    settings["delay"] = args.delay
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), MockChatCompletionsHandler)
+    print(f"Mock OpenAI server listening on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
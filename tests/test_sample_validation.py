@@ -0,0 +1,84 @@
+import random
+import re
+import sqlite3
+
+from backend.sample_validation import lookup_rows, sample_keys
+
+# mysql-connector binds parameters by substituting every %s it finds, with no %% unescaping
+MYSQL_PARAMETER = re.compile(r'%s')
+
+class RecordingCursor:
+    def __init__(self, queries):
+        self.queries = queries
+
+    def execute(self, query, parameters=None):
+        self.queries.append((query, parameters))
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+class RecordingConnection:
+    def __init__(self):
+        self.queries = []
+
+    def cursor(self):
+        return RecordingCursor(self.queries)
+
+class SqliteCursor:
+    """Runs the MySQL-dialect sampling queries on sqlite, recording them"""
+
+    def __init__(self, connection, queries):
+        self.cursor = connection.cursor()
+        self.queries = queries
+
+    def execute(self, query, parameters=()):
+        self.queries.append(query)
+        self.cursor.execute(query.replace("%s", "?").replace("`", '"'), parameters)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        self.cursor.close()
+
+class SqliteConnection:
+    def __init__(self, keys):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.create_function("RAND", 0, random.random)
+        self.connection.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+        self.connection.executemany("INSERT INTO t VALUES (?)", [(key,) for key in keys])
+        self.queries = []
+
+    def cursor(self):
+        return SqliteCursor(self.connection, self.queries)
+
+def test_dense_integer_keys_are_probed_in_batches():
+    connection = SqliteConnection(range(1, 10001))
+    keys = sample_keys(connection, "MySQL", "t", ["id"], "int", 10000, 1000)
+    assert len(keys) == len(set(keys)) == 1000
+    assert not any("RAND()" in query for query in connection.queries)
+    assert len(connection.queries) < 10
+
+def test_sparse_integer_keys_fall_back_to_random_filter():
+    connection = SqliteConnection(list(range(1, 1001)) + [10 ** 9])
+    keys = sample_keys(connection, "MySQL", "t", ["id"], "int", 1001, 100)
+    assert len(keys) == len(set(keys)) == 100
+    assert "RAND()" in connection.queries[-1]
+
+def test_mysql_timestamp_lookup_binds_every_parameter():
+    connection = RecordingConnection()
+    keys = [(1,), (2,), (3,)]
+    lookup_rows(connection, "MySQL", "events", ["id"], [("id", "integer"), ("created_at", "timestamp")], keys)
+    query, parameters = connection.queries[0]
+    assert "%%" not in query
+    assert len(MYSQL_PARAMETER.findall(query)) == len(parameters) == len(keys)
+
+def test_composite_key_lookup_binds_every_parameter():
+    connection = RecordingConnection()
+    keys = [(1, "a"), (2, "b")]
+    lookup_rows(connection, "MySQL", "events", ["id", "kind"], [("created_at", "timestamp")], keys)
+    query, parameters = connection.queries[0]
+    assert len(MYSQL_PARAMETER.findall(query)) == len(parameters) == 4
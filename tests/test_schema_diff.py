@@ -0,0 +1,40 @@
+from backend.schema_diff import parse_create_table, diff_table
+
+CREATE_WITH_TABLE_LEVEL_KEY = "CREATE TABLE t (id INTEGER, name VARCHAR(50), PRIMARY KEY (id))"
+
+def current_table():
+    return {
+        "name": "t",
+        "columns": {
+            "id": {"name": "id", "type": "integer", "nullable": False},
+            "name": {"name": "name", "type": "character varying(50)", "nullable": True}
+        }
+    }
+
+def empty_catalog():
+    return {"tables": {}, "indexes": set(), "constraints": set(), "foreign_keys": set()}
+
+def test_table_level_primary_key_columns_are_not_null():
+    table = parse_create_table(CREATE_WITH_TABLE_LEVEL_KEY)
+    nullable = {column["name"]: column["nullable"] for column in table["columns"]}
+    assert nullable == {"id": False, "name": True}
+
+def test_named_table_level_primary_key_columns_are_not_null():
+    table = parse_create_table('CREATE TABLE t ("a" INTEGER, b INTEGER, c TEXT, CONSTRAINT t_pk PRIMARY KEY ("a", b))')
+    nullable = {column["name"]: column["nullable"] for column in table["columns"]}
+    assert nullable == {"a": False, "b": False, "c": True}
+
+def test_rerun_against_existing_table_emits_nothing_postgresql():
+    desired = parse_create_table(CREATE_WITH_TABLE_LEVEL_KEY)
+    assert diff_table(desired, current_table(), empty_catalog(), "PostgreSQL") == []
+
+def test_rerun_against_existing_table_emits_nothing_mysql():
+    desired = parse_create_table("CREATE TABLE t (id INT, name VARCHAR(50), PRIMARY KEY (`id`))")
+    current = {
+        "name": "t",
+        "columns": {
+            "id": {"name": "id", "type": "int(11)", "nullable": False},
+            "name": {"name": "name", "type": "varchar(50)", "nullable": True}
+        }
+    }
+    assert diff_table(desired, current, empty_catalog(), "MySQL") == []